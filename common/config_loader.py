@@ -5,10 +5,11 @@ Reads config/city_config.json and provides helper methods to access
 grid layout, sensor mappings, ZMQ ports, traffic rules, and timings.
 """
 
-import json
 import os
 from typing import Any
 
+from common.models import from_json
+
 # Default config path (relative to project root)
 DEFAULT_CONFIG_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "city_config.json"
@@ -18,165 +19,105 @@ DEFAULT_CONFIG_PATH = os.path.join(
 class CityConfig:
     """
     Loads and provides structured access to the city configuration file.
+
+    Every section is resolved once at load time and stored as a plain
+    attribute, and sensors are indexed by intersection, so lookups made in
+    hot loops never re-walk the raw config dict.
     """
 
     def __init__(self, config_path: str = DEFAULT_CONFIG_PATH):
-        """Load configuration from JSON file."""
-        with open(config_path, encoding="utf-8") as f:
-            self._config = json.load(f)
-
-    # =========================================================================
-    # Grid
-    # =========================================================================
-
-    @property
-    def rows(self) -> list[str]:
-        """Grid row labels (e.g., ['A', 'B', 'C', 'D'])."""
-        return self._config["city"]["grid"]["rows"]
-
-    @property
-    def columns(self) -> list[int]:
-        """Grid column numbers (e.g., [1, 2, 3, 4])."""
-        return self._config["city"]["grid"]["columns"]
-
-    @property
-    def intersections(self) -> list[str]:
-        """All intersection IDs (e.g., ['INT-A1', ..., 'INT-D4'])."""
-        return self._config["intersections"]
+        """Load configuration from JSON file and precompute derived structures."""
+        # Read raw bytes: orjson (via from_json) parses UTF-8 directly
+        with open(config_path, "rb") as f:
+            self._config = from_json(f.read())
+        config = self._config
+
+        # -- Grid --
+        self.rows: list[str] = config["city"]["grid"]["rows"]  # e.g. ['A', 'B', 'C', 'D']
+        self.columns: list[int] = config["city"]["grid"]["columns"]  # e.g. [1, 2, 3, 4]
+        self.intersections: list[str] = config["intersections"]  # 'INT-A1' .. 'INT-D4'
+        # One semaphore per intersection, so semaphore IDs are the intersection IDs
+        self.semaphores: list[str] = self.intersections
+
+        # -- Sensors --
+        # Tuples: the config is a process-wide singleton (see get_config), so
+        # callers cannot add, drop or reorder its sensors. The sensor dicts
+        # themselves are still plain dicts and must be treated as read-only
+        self.cameras: tuple[dict[str, str], ...] = tuple(config["sensors"]["cameras"])
+        self.inductive_loops: tuple[dict[str, str], ...] = tuple(
+            config["sensors"]["inductive_loops"]
+        )
+        self.gps_sensors: tuple[dict[str, str], ...] = tuple(config["sensors"]["gps"])
+        self._all_sensors = self.cameras + self.inductive_loops + self.gps_sensors
+        # Every intersection gets its tuple up front (possibly empty), so lookups
+        # always hand back the same object for a given intersection
+        by_int: dict[str, list[dict[str, str]]] = {
+            intersection: [] for intersection in self.intersections
+        }
+        for sensor in self._all_sensors:
+            by_int.setdefault(sensor["interseccion"], []).append(sensor)
+        self._sensors_by_int: dict[str, tuple[dict[str, str], ...]] = {
+            intersection: tuple(sensors) for intersection, sensors in by_int.items()
+        }
+
+        # -- Rules --
+        self.rules: dict[str, Any] = config["rules"]
+        self.normal_rule: dict[str, Any] = config["rules"]["normal"]["conditions"]
+        self.congestion_rule: dict[str, Any] = config["rules"]["congestion"]["conditions"]
+
+        # -- Timings --
+        self.timings: dict[str, int] = config["timings"]
+        self.normal_cycle_sec: int = self.timings["normal_cycle_sec"]
+        self.congestion_extension_sec: int = self.timings["congestion_extension_sec"]
+        self.green_wave_duration_sec: int = self.timings["green_wave_duration_sec"]
+        self.sensor_default_interval_sec: int = self.timings["sensor_default_interval_sec"]
+        self.inductive_interval_sec: int = self.timings["inductive_interval_sec"]
+        self.health_check_interval_sec: int = self.timings["health_check_interval_sec"]
+        self.health_check_timeout_ms: int = self.timings["health_check_timeout_ms"]
+        self.health_check_max_retries: int = self.timings["health_check_max_retries"]
+
+        # -- ZMQ --
+        self.zmq_ports: dict[str, int] = config["zmq_ports"]
+        self.zmq_topics: dict[str, str] = config["zmq_topics"]
+
+        # -- Network --
+        self.pc1_host: str = config["network"]["pc1_host"]
+        self.pc2_host: str = config["network"]["pc2_host"]
+        self.pc3_host: str = config["network"]["pc3_host"]
+
+        # -- Prebuilt ZMQ addresses (ports and hosts are static) --
+        self._addresses: dict[tuple[str, str], str] = {
+            (host, name): f"tcp://{host}:{port}"
+            for name, port in self.zmq_ports.items()
+            for host in (self.pc1_host, self.pc2_host, self.pc3_host)
+        }
+        self._bind_addresses: dict[str, str] = {
+            name: f"tcp://*:{port}" for name, port in self.zmq_ports.items()
+        }
 
     # =========================================================================
     # Sensors
     # =========================================================================
 
-    @property
-    def cameras(self) -> list[dict[str, str]]:
-        """Camera sensor definitions."""
-        return self._config["sensors"]["cameras"]
-
-    @property
-    def inductive_loops(self) -> list[dict[str, str]]:
-        """Inductive loop sensor definitions."""
-        return self._config["sensors"]["inductive_loops"]
-
-    @property
-    def gps_sensors(self) -> list[dict[str, str]]:
-        """GPS sensor definitions."""
-        return self._config["sensors"]["gps"]
-
-    def get_all_sensors(self) -> list[dict[str, str]]:
+    def get_all_sensors(self) -> tuple[dict[str, str], ...]:
         """Return all sensors across all types."""
-        return self.cameras + self.inductive_loops + self.gps_sensors
+        return self._all_sensors
 
-    def get_sensors_at_intersection(self, intersection: str) -> list[dict[str, str]]:
-        """Get all sensors located at a given intersection."""
-        return [s for s in self.get_all_sensors() if s["interseccion"] == intersection]
+    def get_sensors_at_intersection(self, intersection: str) -> tuple[dict[str, str], ...]:
+        """
+        Get all sensors located at a given intersection.
 
-    # =========================================================================
-    # Semaphores
-    # =========================================================================
-
-    @property
-    def semaphores(self) -> list[str]:
-        """Semaphore IDs (same as intersection IDs -- one semaphore per intersection)."""
-        return self.intersections
-
-    # =========================================================================
-    # Rules
-    # =========================================================================
-
-    @property
-    def rules(self) -> dict[str, Any]:
-        """Full rules configuration."""
-        return self._config["rules"]
-
-    @property
-    def normal_rule(self) -> dict[str, Any]:
-        """Normal traffic conditions."""
-        return self._config["rules"]["normal"]["conditions"]
-
-    @property
-    def congestion_rule(self) -> dict[str, Any]:
-        """Congestion detection conditions."""
-        return self._config["rules"]["congestion"]["conditions"]
-
-    # =========================================================================
-    # Timings
-    # =========================================================================
-
-    @property
-    def timings(self) -> dict[str, int]:
-        """All timing parameters."""
-        return self._config["timings"]
-
-    @property
-    def normal_cycle_sec(self) -> int:
-        return self._config["timings"]["normal_cycle_sec"]
-
-    @property
-    def congestion_extension_sec(self) -> int:
-        return self._config["timings"]["congestion_extension_sec"]
-
-    @property
-    def green_wave_duration_sec(self) -> int:
-        return self._config["timings"]["green_wave_duration_sec"]
-
-    @property
-    def sensor_default_interval_sec(self) -> int:
-        return self._config["timings"]["sensor_default_interval_sec"]
-
-    @property
-    def inductive_interval_sec(self) -> int:
-        return self._config["timings"]["inductive_interval_sec"]
-
-    @property
-    def health_check_interval_sec(self) -> int:
-        return self._config["timings"]["health_check_interval_sec"]
-
-    @property
-    def health_check_timeout_ms(self) -> int:
-        return self._config["timings"]["health_check_timeout_ms"]
-
-    @property
-    def health_check_max_retries(self) -> int:
-        return self._config["timings"]["health_check_max_retries"]
+        The same tuple is returned on every call for a configured intersection.
+        """
+        return self._sensors_by_int.get(intersection, ())
 
     # =========================================================================
     # ZMQ Ports
     # =========================================================================
 
-    @property
-    def zmq_ports(self) -> dict[str, int]:
-        """All ZMQ port assignments."""
-        return self._config["zmq_ports"]
-
     def get_port(self, name: str) -> int:
         """Get a specific ZMQ port by name."""
-        return self._config["zmq_ports"][name]
-
-    # =========================================================================
-    # ZMQ Topics
-    # =========================================================================
-
-    @property
-    def zmq_topics(self) -> dict[str, str]:
-        """ZMQ topic strings for PUB/SUB."""
-        return self._config["zmq_topics"]
-
-    # =========================================================================
-    # Network
-    # =========================================================================
-
-    @property
-    def pc1_host(self) -> str:
-        return self._config["network"]["pc1_host"]
-
-    @property
-    def pc2_host(self) -> str:
-        return self._config["network"]["pc2_host"]
-
-    @property
-    def pc3_host(self) -> str:
-        return self._config["network"]["pc3_host"]
+        return self.zmq_ports[name]
 
     # =========================================================================
     # Convenience: Build ZMQ addresses
@@ -184,22 +125,31 @@ class CityConfig:
 
     def zmq_address(self, host: str, port_name: str) -> str:
         """Build a tcp:// ZMQ address string."""
-        port = self.get_port(port_name)
-        return f"tcp://{host}:{port}"
+        address = self._addresses.get((host, port_name))
+        if address is None:  # Host outside the configured network section
+            address = f"tcp://{host}:{self.get_port(port_name)}"
+        return address
 
     def zmq_bind_address(self, port_name: str) -> str:
         """Build a tcp://*: ZMQ bind address string."""
-        port = self.get_port(port_name)
-        return f"tcp://*:{port}"
+        return self._bind_addresses[port_name]
+
+
+# Parsed configs, keyed by path and invalidated when the file's mtime changes
+_config_cache: dict[str, tuple[int, CityConfig]] = {}
 
 
-# Singleton-like convenience: load once and reuse
-_config_instance: CityConfig | None = None
+def _load_cached(config_path: str) -> CityConfig:
+    """Return the parsed CityConfig for a path, re-parsing only if the file changed."""
+    mtime_ns = os.stat(config_path).st_mtime_ns
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    config = CityConfig(config_path)
+    _config_cache[config_path] = (mtime_ns, config)
+    return config
 
 
 def get_config(config_path: str = DEFAULT_CONFIG_PATH) -> CityConfig:
-    """Get or create the global CityConfig instance."""
-    global _config_instance
-    if _config_instance is None:
-        _config_instance = CityConfig(config_path)
-    return _config_instance
+    """Get or create the shared CityConfig instance for a config file."""
+    return _load_cached(config_path)
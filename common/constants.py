@@ -3,23 +3,35 @@ constants.py - Shared constants for the distributed traffic management system.
 
 Defines ZMQ topics, congestion thresholds, sensor types, semaphore states,
 and system-wide enumerations used across all components.
+
+String labels are interned so that comparisons against strings interned on
+receipt (e.g. ZMQ topics) short-circuit on identity.
 """
 
+import sys
+from enum import IntEnum
+
 # =============================================================================
 # ZMQ Topics - Used for PUB/SUB filtering
 # =============================================================================
-TOPIC_CAMERA = "camara"
-TOPIC_INDUCTIVE = "espira"
-TOPIC_GPS = "gps"
+TOPIC_CAMERA = sys.intern("camara")
+TOPIC_INDUCTIVE = sys.intern("espira")
+TOPIC_GPS = sys.intern("gps")
 
 ALL_SENSOR_TOPICS = [TOPIC_CAMERA, TOPIC_INDUCTIVE, TOPIC_GPS]
 
+# Sensor messages travel as two ZMQ frames: [topic, JSON payload]. The topic
+# frame is what SUB sockets match their subscriptions against.
+TOPIC_CAMERA_BYTES = TOPIC_CAMERA.encode()
+TOPIC_INDUCTIVE_BYTES = TOPIC_INDUCTIVE.encode()
+TOPIC_GPS_BYTES = TOPIC_GPS.encode()
+
 # =============================================================================
 # Sensor Types
 # =============================================================================
-SENSOR_TYPE_CAMERA = "camara"
-SENSOR_TYPE_INDUCTIVE = "espira_inductiva"
-SENSOR_TYPE_GPS = "gps"
+SENSOR_TYPE_CAMERA = sys.intern("camara")
+SENSOR_TYPE_INDUCTIVE = sys.intern("espira_inductiva")
+SENSOR_TYPE_GPS = sys.intern("gps")
 
 # =============================================================================
 # Congestion Level Thresholds (based on average speed - km/h)
@@ -32,16 +44,16 @@ CONGESTION_BAJA_MIN_SPEED = 40  # velocidad_promedio > 40 -> BAJA
 # =============================================================================
 # Congestion Level Labels
 # =============================================================================
-CONGESTION_ALTA = "ALTA"
-CONGESTION_NORMAL = "NORMAL"
-CONGESTION_BAJA = "BAJA"
+CONGESTION_ALTA = sys.intern("ALTA")
+CONGESTION_NORMAL = sys.intern("NORMAL")
+CONGESTION_BAJA = sys.intern("BAJA")
 
 # =============================================================================
 # Traffic State Labels
 # =============================================================================
-TRAFFIC_NORMAL = "NORMAL"
-TRAFFIC_CONGESTION = "CONGESTION"
-TRAFFIC_GREEN_WAVE = "GREEN_WAVE"
+TRAFFIC_NORMAL = sys.intern("NORMAL")
+TRAFFIC_CONGESTION = sys.intern("CONGESTION")
+TRAFFIC_GREEN_WAVE = sys.intern("GREEN_WAVE")
 
 # =============================================================================
 # Traffic Rule Thresholds (default values, also defined in config)
@@ -59,8 +71,8 @@ RULE_CONGESTION_D_MIN = 40  # Min density to trigger congestion (veh/km)
 # =============================================================================
 # Semaphore States
 # =============================================================================
-SEMAPHORE_GREEN = "GREEN"
-SEMAPHORE_RED = "RED"
+SEMAPHORE_GREEN = sys.intern("GREEN")
+SEMAPHORE_RED = sys.intern("RED")
 
 # =============================================================================
 # Semaphore Timing (seconds)
@@ -87,36 +99,101 @@ INDUCTIVE_COUNT_MAX = 30
 GPS_SPEED_MIN = 5
 GPS_SPEED_MAX = 55
 
+# Random readings drawn per numpy call by the sensors' reading streams
+READING_BATCH_SIZE = 1024
+
+# =============================================================================
+# Hot-Loop Logging
+# =============================================================================
+# Sensors and brokers log a progress line every N events at INFO; the
+# per-event detail lines are only emitted at DEBUG level.
+LOG_EVERY_N_EVENTS = 1024
+
+# =============================================================================
+# ZMQ Socket Tuning
+# =============================================================================
+# High-water marks (messages) for the sensor -> broker -> analytics path.
+# Large enough to absorb bursts without blocking or dropping under load.
+ZMQ_HWM = 10000
+# Sockets discard pending messages on close instead of blocking shutdown
+ZMQ_LINGER_MS = 0
+# TCP keepalive probes, so a peer that vanished without closing (e.g. a
+# PC2 host dropping off the network) is detected and its queue released
+# within about a minute instead of the kernel's two-hour default
+ZMQ_TCP_KEEPALIVE = 1
+ZMQ_TCP_KEEPALIVE_IDLE_SEC = 30
+ZMQ_TCP_KEEPALIVE_INTVL_SEC = 10
+
+# In-process endpoints used when sensors and broker share one process
+# (start_pc1 --inproc); messages skip the kernel TCP stack entirely.
+INPROC_SENSOR_CAMERA = sys.intern("inproc://sensor_camera")
+INPROC_SENSOR_INDUCTIVE = sys.intern("inproc://sensor_inductive")
+INPROC_SENSOR_GPS = sys.intern("inproc://sensor_gps")
+# Shared endpoint of the asyncio sensor process (start_pc1 --inproc --async-sensors)
+INPROC_SENSOR_ALL = sys.intern("inproc://sensor_all")
+
 # =============================================================================
 # Health Check Parameters
 # =============================================================================
 HEALTH_CHECK_INTERVAL_SEC = 5
 HEALTH_CHECK_TIMEOUT_MS = 2000
 HEALTH_CHECK_MAX_RETRIES = 3
-HEALTH_CHECK_MSG = "PING"
-HEALTH_CHECK_RESPONSE = "PONG"
+HEALTH_CHECK_MSG = sys.intern("PING")
+HEALTH_CHECK_RESPONSE = sys.intern("PONG")
 
 # =============================================================================
 # Monitoring Command Types
 # =============================================================================
-CMD_QUERY_INTERSECTION = "QUERY_INTERSECTION"
-CMD_QUERY_HISTORY = "QUERY_HISTORY"
-CMD_FORCE_GREEN_WAVE = "FORCE_GREEN_WAVE"
-CMD_FORCE_SEMAPHORE = "FORCE_SEMAPHORE"
-CMD_SYSTEM_STATUS = "SYSTEM_STATUS"
-CMD_HEALTH_CHECK = "HEALTH_CHECK"
+CMD_QUERY_INTERSECTION = sys.intern("QUERY_INTERSECTION")
+CMD_QUERY_HISTORY = sys.intern("QUERY_HISTORY")
+CMD_FORCE_GREEN_WAVE = sys.intern("FORCE_GREEN_WAVE")
+CMD_FORCE_SEMAPHORE = sys.intern("FORCE_SEMAPHORE")
+CMD_SYSTEM_STATUS = sys.intern("SYSTEM_STATUS")
+CMD_HEALTH_CHECK = sys.intern("HEALTH_CHECK")
 
 # =============================================================================
 # Analytics Decision Types (for logging/DB)
 # =============================================================================
-DECISION_NO_ACTION = "NO_ACTION"
-DECISION_EXTEND_GREEN = "EXTEND_GREEN"
-DECISION_GREEN_WAVE = "GREEN_WAVE"
-DECISION_FORCE_CHANGE = "FORCE_CHANGE"
+DECISION_NO_ACTION = sys.intern("NO_ACTION")
+DECISION_EXTEND_GREEN = sys.intern("EXTEND_GREEN")
+DECISION_GREEN_WAVE = sys.intern("GREEN_WAVE")
+DECISION_FORCE_CHANGE = sys.intern("FORCE_CHANGE")
 
 # =============================================================================
 # System Status
 # =============================================================================
-STATUS_OK = "OK"
-STATUS_FAILOVER = "FAILOVER"
-STATUS_ERROR = "ERROR"
+STATUS_OK = sys.intern("OK")
+STATUS_FAILOVER = sys.intern("FAILOVER")
+STATUS_ERROR = sys.intern("ERROR")
+
+# =============================================================================
+# Integer Codes
+# =============================================================================
+# Parallel IntEnum views of the string labels above for code that wants
+# integer comparisons or match-statement dispatch. Member names equal the
+# string labels, so conversion at the DB/wire boundary is Enum[label] one
+# way and member.name the other; stored and transmitted values stay strings.
+
+
+class TrafficState(IntEnum):
+    NORMAL = 0
+    CONGESTION = 1
+    GREEN_WAVE = 2
+
+
+class Decision(IntEnum):
+    NO_ACTION = 0
+    EXTEND_GREEN = 1
+    GREEN_WAVE = 2
+    FORCE_CHANGE = 3
+
+
+class SemaphoreLight(IntEnum):
+    RED = 0
+    GREEN = 1
+
+
+class Status(IntEnum):
+    OK = 0
+    FAILOVER = 1
+    ERROR = 2
@@ -6,11 +6,15 @@ state changes, analytics decisions, and query historical data. Used by
 both the primary DB (PC3) and the replica DB (PC2).
 """
 
-import json
+import functools
 import logging
 import sqlite3
+import threading
+from collections.abc import Iterator
 from typing import Any
 
+from common.models import LazyEvent, dumpb, dumps, from_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +22,10 @@ logger = logging.getLogger(__name__)
 # Schema Definition
 # =============================================================================
 
+# Stored in PRAGMA user_version once SCHEMA_SQL has been applied. Bump it
+# whenever SCHEMA_SQL changes so existing databases re-run the script.
+SCHEMA_VERSION = 1
+
 SCHEMA_SQL = """
 -- Sensor events table: stores all raw events from cameras, inductive loops, GPS
 CREATE TABLE IF NOT EXISTS sensor_events (
@@ -25,16 +33,20 @@ CREATE TABLE IF NOT EXISTS sensor_events (
     sensor_id TEXT NOT NULL,
     tipo_sensor TEXT NOT NULL,
     interseccion TEXT NOT NULL,
-    event_data TEXT NOT NULL,           -- Full event JSON
+    event_data BLOB NOT NULL,           -- Full event JSON as UTF-8 bytes (older rows: TEXT)
     timestamp TEXT NOT NULL,
     created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
--- Index for querying by intersection and time range
-CREATE INDEX IF NOT EXISTS idx_sensor_events_intersection
-    ON sensor_events(interseccion);
-CREATE INDEX IF NOT EXISTS idx_sensor_events_timestamp
-    ON sensor_events(timestamp);
+-- Indexes for querying by intersection and time range. The composite
+-- (interseccion, timestamp DESC) index serves "latest N for an intersection"
+-- as a pure index range scan with no sort step.
+DROP INDEX IF EXISTS idx_sensor_events_intersection;
+CREATE INDEX IF NOT EXISTS idx_sensor_events_int_ts
+    ON sensor_events(interseccion, timestamp DESC);
+DROP INDEX IF EXISTS idx_sensor_events_timestamp;
+CREATE INDEX IF NOT EXISTS idx_sensor_events_ts_int
+    ON sensor_events(timestamp DESC, interseccion);
 CREATE INDEX IF NOT EXISTS idx_sensor_events_tipo
     ON sensor_events(tipo_sensor);
 
@@ -50,8 +62,9 @@ CREATE TABLE IF NOT EXISTS semaphore_states (
     created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
-CREATE INDEX IF NOT EXISTS idx_semaphore_states_intersection
-    ON semaphore_states(interseccion);
+DROP INDEX IF EXISTS idx_semaphore_states_intersection;
+CREATE INDEX IF NOT EXISTS idx_semaphore_states_int_ts
+    ON semaphore_states(interseccion, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_semaphore_states_timestamp
     ON semaphore_states(timestamp);
 
@@ -67,12 +80,16 @@ CREATE TABLE IF NOT EXISTS congestion_history (
     created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
-CREATE INDEX IF NOT EXISTS idx_congestion_history_intersection
-    ON congestion_history(interseccion);
+DROP INDEX IF EXISTS idx_congestion_history_intersection;
+CREATE INDEX IF NOT EXISTS idx_congestion_int_ts
+    ON congestion_history(interseccion, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_congestion_history_timestamp
     ON congestion_history(timestamp);
-CREATE INDEX IF NOT EXISTS idx_congestion_history_state
-    ON congestion_history(traffic_state);
+-- Partial index: only CONGESTION rows are indexed, so counting them walks
+-- just that subset and NORMAL inserts (the vast majority) skip index upkeep
+DROP INDEX IF EXISTS idx_congestion_history_state;
+CREATE INDEX IF NOT EXISTS idx_congestion_only
+    ON congestion_history(id) WHERE traffic_state = 'CONGESTION';
 
 -- Priority actions: records green wave / forced changes by users
 CREATE TABLE IF NOT EXISTS priority_actions (
@@ -81,15 +98,187 @@ CREATE TABLE IF NOT EXISTS priority_actions (
     target TEXT NOT NULL,               -- Row, column, or specific intersection
     reason TEXT DEFAULT '',
     requested_by TEXT DEFAULT 'system',
-    affected_intersections TEXT DEFAULT '',  -- JSON list of affected intersections
+    affected_intersections TEXT DEFAULT '',  -- Comma-separated intersection IDs
     timestamp TEXT NOT NULL,
     created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
 );
 
 CREATE INDEX IF NOT EXISTS idx_priority_actions_timestamp
     ON priority_actions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_greenwave_only
+    ON priority_actions(id) WHERE action_type = 'GREEN_WAVE';
+
+-- Running counters for get_system_summary, kept current by the triggers below
+-- so the summary never scans the event tables. Seeded from a one-off COUNT(*)
+-- the first time a database without the table is opened.
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO stats (name, value)
+    SELECT 'total_sensor_events', (SELECT COUNT(*) FROM sensor_events)
+    WHERE NOT EXISTS (SELECT 1 FROM stats WHERE name = 'total_sensor_events');
+INSERT INTO stats (name, value)
+    SELECT 'total_congestion_detections',
+           (SELECT COUNT(*) FROM congestion_history WHERE traffic_state = 'CONGESTION')
+    WHERE NOT EXISTS (SELECT 1 FROM stats WHERE name = 'total_congestion_detections');
+INSERT INTO stats (name, value)
+    SELECT 'total_green_waves',
+           (SELECT COUNT(*) FROM priority_actions WHERE action_type = 'GREEN_WAVE')
+    WHERE NOT EXISTS (SELECT 1 FROM stats WHERE name = 'total_green_waves');
+INSERT INTO stats (name, value)
+    SELECT 'total_semaphore_changes', (SELECT COUNT(*) FROM semaphore_states)
+    WHERE NOT EXISTS (SELECT 1 FROM stats WHERE name = 'total_semaphore_changes');
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_sensor_events AFTER INSERT ON sensor_events
+BEGIN
+    UPDATE stats SET value = value + 1 WHERE name = 'total_sensor_events';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_congestion AFTER INSERT ON congestion_history
+    WHEN NEW.traffic_state = 'CONGESTION'
+BEGIN
+    UPDATE stats SET value = value + 1 WHERE name = 'total_congestion_detections';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_green_waves AFTER INSERT ON priority_actions
+    WHEN NEW.action_type = 'GREEN_WAVE'
+BEGIN
+    UPDATE stats SET value = value + 1 WHERE name = 'total_green_waves';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_semaphore_states AFTER INSERT ON semaphore_states
+BEGIN
+    UPDATE stats SET value = value + 1 WHERE name = 'total_semaphore_changes';
+END;
 """
 
+# =============================================================================
+# Batched Writes
+# =============================================================================
+# High-rate records (sensor events, semaphore states, congestion records) are
+# queued in memory and written with executemany + a single COMMIT, so one
+# fsync is amortized over the whole batch instead of paid per row.
+
+FLUSH_MAX_ROWS = 256  # Flush as soon as this many rows are queued
+FLUSH_INTERVAL_SEC = 0.2  # Background flush period
+
+# Size of sqlite3's per-connection prepared-statement cache. Every statement
+# below is a module-level constant, so each one is compiled once per
+# connection and then reused from the cache.
+STATEMENT_CACHE_SIZE = 256
+
+# Rows pulled per fetchmany() when streaming query results
+STREAM_BATCH_SIZE = 64
+
+# =============================================================================
+# Connection Tuning
+# =============================================================================
+# synchronous=NORMAL is safe under WAL: the database always stays consistent,
+# but the last committed transactions may be lost on power loss or an OS
+# crash (not on a process crash). For a replicated sensor stream that is an
+# acceptable trade for skipping the fsync on every commit.
+#
+# Each connection keeps its own page cache: shared-cache mode
+# (cache=shared URIs) would serialize readers behind table-level locks,
+# undoing the concurrent reads WAL allows, and SQLite discourages it.
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Readers never block the writer
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped reads
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache (negative = KiB)
+    "PRAGMA wal_autocheckpoint=1000",  # Checkpoint every 1000 WAL pages
+)
+
+# =============================================================================
+# SQL Statements
+# =============================================================================
+
+SQL_INSERT_SENSOR_EVENT = """INSERT INTO sensor_events
+    (sensor_id, tipo_sensor, interseccion, event_data, timestamp)
+    VALUES (?, ?, ?, ?, ?)"""
+
+SQL_INSERT_SEMAPHORE_STATE = """INSERT INTO semaphore_states
+    (interseccion, state_ns, state_ew, reason, cycle_duration_sec, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_INSERT_CONGESTION_RECORD = """INSERT INTO congestion_history
+    (interseccion, traffic_state, decision, details, sensor_data, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_INSERT_PRIORITY_ACTION = """INSERT INTO priority_actions
+    (action_type, target, reason, requested_by, affected_intersections, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_EVENTS_BY_INTERSECTION = """SELECT * FROM sensor_events
+    WHERE interseccion = ?
+    ORDER BY timestamp DESC
+    LIMIT ?"""
+
+SQL_EVENTS_BY_TIME_RANGE = """SELECT * FROM sensor_events
+    WHERE timestamp >= ? AND timestamp <= ?
+    ORDER BY timestamp DESC
+    LIMIT ?"""
+
+SQL_EVENTS_BY_TIME_RANGE_AND_INTERSECTION = """SELECT * FROM sensor_events
+    WHERE timestamp >= ? AND timestamp <= ?
+    AND interseccion = ?
+    ORDER BY timestamp DESC
+    LIMIT ?"""
+
+SQL_SEMAPHORE_STATE = """SELECT * FROM semaphore_states
+    WHERE interseccion = ?
+    ORDER BY timestamp DESC
+    LIMIT 1"""
+
+# Single pass over idx_semaphore_states_int_ts: row 1 of each partition is
+# the latest state (requires SQLite >= 3.25)
+SQL_ALL_SEMAPHORE_STATES = """WITH latest AS (
+        SELECT *, ROW_NUMBER() OVER (
+            PARTITION BY interseccion ORDER BY timestamp DESC
+        ) AS rn
+        FROM semaphore_states
+    )
+    SELECT id, interseccion, state_ns, state_ew, reason,
+           cycle_duration_sec, timestamp, created_at
+    FROM latest
+    WHERE rn = 1
+    ORDER BY interseccion"""
+
+SQL_PRIORITY_ACTIONS = """SELECT * FROM priority_actions
+    ORDER BY timestamp DESC
+    LIMIT ?"""
+
+SQL_COUNT_EVENTS_IN_INTERVAL = """SELECT COUNT(*) as cnt FROM sensor_events
+    WHERE timestamp >= ? AND timestamp <= ?"""
+
+SQL_SYSTEM_STATS = "SELECT name, value FROM stats"
+
+
+def _split_intersections(value: str | None) -> list[str]:
+    """Decode a stored affected_intersections column into a list of IDs."""
+    if not value:
+        return []
+    if value.startswith("["):  # Rows written before the comma-separated format
+        return from_json(value)
+    return value.split(",")
+
+
+@functools.lru_cache(maxsize=8)
+def _congestion_history_sql(has_start: bool, has_end: bool, has_int: bool) -> str:
+    """Build (once per filter combination) the SQL for query_congestion_history."""
+    query = "SELECT * FROM congestion_history WHERE 1=1"
+    if has_start:
+        query += " AND timestamp >= ?"
+    if has_end:
+        query += " AND timestamp <= ?"
+    if has_int:
+        query += " AND interseccion = ?"
+    return query + " ORDER BY timestamp DESC LIMIT ?"
+
 
 # =============================================================================
 # Database Connection Management
@@ -100,6 +289,10 @@ class TrafficDB:
     """
     SQLite database wrapper for the traffic management system.
     Handles connection management, schema creation, and all CRUD operations.
+
+    The ``enqueue_*`` methods buffer rows and write them in batches (see
+    FLUSH_MAX_ROWS / FLUSH_INTERVAL_SEC). Queries flush the buffer first, so
+    reads always see every row enqueued before them.
     """
 
     def __init__(self, db_path: str):
@@ -110,23 +303,182 @@ class TrafficDB:
             db_path: Path to the SQLite database file.
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(
+            db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
         self.conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
-        self.conn.execute("PRAGMA journal_mode=WAL")  # Better concurrent access
+        for pragma in CONNECTION_PRAGMAS:
+            self.conn.execute(pragma)
         self._create_schema()
+
+        # Guards both the pending buffers and every use of self.conn
+        self._lock = threading.Lock()
+        self._pending: dict[str, list[tuple]] = {
+            SQL_INSERT_SENSOR_EVENT: [],
+            SQL_INSERT_SEMAPHORE_STATE: [],
+            SQL_INSERT_CONGESTION_RECORD: [],
+        }
+        self._pending_count = 0
+        self._stop_flusher = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="TrafficDB-Flusher", daemon=True
+        )
+        self._flusher.start()
         logger.info(f"Database initialized at {db_path}")
 
     def _create_schema(self):
-        """Create all tables and indices if they don't exist."""
+        """Create (or migrate) tables and indices unless already at SCHEMA_VERSION."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
         self.conn.executescript(SCHEMA_SQL)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.conn.commit()
 
     def close(self):
-        """Close the database connection."""
+        """Flush pending rows, stop the background flusher and close the connection."""
         if self.conn:
+            self._stop_flusher.set()
+            self._flusher.join(timeout=2)
+            self.flush()
             self.conn.close()
             logger.info(f"Database closed: {self.db_path}")
 
+    # =========================================================================
+    # Batched Writes
+    # =========================================================================
+
+    def _flush_loop(self) -> None:
+        """Background thread: flush pending rows every FLUSH_INTERVAL_SEC."""
+        while not self._stop_flusher.wait(FLUSH_INTERVAL_SEC):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Batched flush failed: {e}")
+
+    def _flush_locked(self) -> None:
+        """Write all pending rows in one transaction. Caller must hold self._lock."""
+        if not self._pending_count:
+            return
+        for sql, rows in self._pending.items():
+            if rows:
+                self.conn.executemany(sql, rows)
+                rows.clear()
+        self._pending_count = 0
+        self.conn.commit()
+
+    def flush(self) -> None:
+        """Write all pending rows to the database now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _enqueue(self, sql: str, row: tuple) -> None:
+        """Buffer a row for batched insertion, flushing if the buffer is full."""
+        with self._lock:
+            self._pending[sql].append(row)
+            self._pending_count += 1
+            if self._pending_count >= FLUSH_MAX_ROWS:
+                self._flush_locked()
+
+    def _fetch_all(self, sql: str, params: tuple | list = ()) -> list[dict[str, Any]]:
+        """Flush pending rows, run a SELECT and return every row as a dict."""
+        with self._lock:
+            self._flush_locked()
+            # Plain tuples zipped against the column names once per query are
+            # cheaper than building a sqlite3.Row per row and copying it
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row, strict=True)) for row in cursor.fetchall()]
+
+    def _fetch_events(self, sql: str, params: tuple | list = ()) -> list[dict[str, Any]]:
+        """Like _fetch_all for sensor_events, deferring event_data parsing to first access."""
+        rows = self._fetch_all(sql, params)
+        for row in rows:
+            row["event_data"] = LazyEvent(row["event_data"])
+        return rows
+
+    def _iter_events(
+        self, sql: str, params: tuple | list, batch_size: int
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream sensor_events rows in fetchmany() batches.
+
+        The lock is held per batch, not across yields, so a slow consumer
+        never blocks writers or the background flusher.
+        """
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                event = dict(zip(columns, row, strict=True))
+                event["event_data"] = LazyEvent(event["event_data"])
+                yield event
+
+    def _fetch_one(self, sql: str, params: tuple | list = ()) -> sqlite3.Row | None:
+        """Flush pending rows, run a SELECT and return the first row."""
+        with self._lock:
+            self._flush_locked()
+            return self.conn.execute(sql, params).fetchone()
+
+    def _insert(self, sql: str, row: tuple) -> int:
+        """Insert a single row immediately and return its row ID."""
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.execute(sql, row)
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def enqueue_sensor_event(
+        self, sensor_id: str, tipo_sensor: str, interseccion: str, event_data: dict, timestamp: str
+    ) -> None:
+        """Queue a raw sensor event for batched insertion (see insert_sensor_event)."""
+        self._enqueue(
+            SQL_INSERT_SENSOR_EVENT,
+            (sensor_id, tipo_sensor, interseccion, dumpb(event_data), timestamp),
+        )
+
+    def enqueue_semaphore_state(
+        self,
+        interseccion: str,
+        state_ns: str,
+        state_ew: str,
+        reason: str,
+        cycle_duration_sec: int,
+        timestamp: str,
+    ) -> None:
+        """Queue a semaphore state change for batched insertion."""
+        self._enqueue(
+            SQL_INSERT_SEMAPHORE_STATE,
+            (interseccion, state_ns, state_ew, reason, cycle_duration_sec, timestamp),
+        )
+
+    def enqueue_congestion_record(
+        self,
+        interseccion: str,
+        traffic_state: str,
+        decision: str,
+        details: str,
+        sensor_data: dict | None,
+        timestamp: str,
+    ) -> None:
+        """Queue a congestion record for batched insertion."""
+        sensor_json = dumps(sensor_data) if sensor_data else ""
+        self._enqueue(
+            SQL_INSERT_CONGESTION_RECORD,
+            (interseccion, traffic_state, decision, details, sensor_json, timestamp),
+        )
+
     # =========================================================================
     # Insert Operations
     # =========================================================================
@@ -147,20 +499,10 @@ class TrafficDB:
         Returns:
             The row ID of the inserted record.
         """
-        cursor = self.conn.execute(
-            """INSERT INTO sensor_events
-               (sensor_id, tipo_sensor, interseccion, event_data, timestamp)
-               VALUES (?, ?, ?, ?, ?)""",
-            (
-                sensor_id,
-                tipo_sensor,
-                interseccion,
-                json.dumps(event_data, ensure_ascii=False),
-                timestamp,
-            ),
+        return self._insert(
+            SQL_INSERT_SENSOR_EVENT,
+            (sensor_id, tipo_sensor, interseccion, dumpb(event_data), timestamp),
         )
-        self.conn.commit()
-        return cursor.lastrowid
 
     def insert_semaphore_state(
         self,
@@ -177,14 +519,10 @@ class TrafficDB:
         Returns:
             The row ID of the inserted record.
         """
-        cursor = self.conn.execute(
-            """INSERT INTO semaphore_states
-               (interseccion, state_ns, state_ew, reason, cycle_duration_sec, timestamp)
-               VALUES (?, ?, ?, ?, ?, ?)""",
+        return self._insert(
+            SQL_INSERT_SEMAPHORE_STATE,
             (interseccion, state_ns, state_ew, reason, cycle_duration_sec, timestamp),
         )
-        self.conn.commit()
-        return cursor.lastrowid
 
     def insert_congestion_record(
         self,
@@ -201,15 +539,11 @@ class TrafficDB:
         Returns:
             The row ID of the inserted record.
         """
-        sensor_json = json.dumps(sensor_data, ensure_ascii=False) if sensor_data else ""
-        cursor = self.conn.execute(
-            """INSERT INTO congestion_history
-               (interseccion, traffic_state, decision, details, sensor_data, timestamp)
-               VALUES (?, ?, ?, ?, ?, ?)""",
+        sensor_json = dumps(sensor_data) if sensor_data else ""
+        return self._insert(
+            SQL_INSERT_CONGESTION_RECORD,
             (interseccion, traffic_state, decision, details, sensor_json, timestamp),
         )
-        self.conn.commit()
-        return cursor.lastrowid
 
     def insert_priority_action(
         self,
@@ -226,16 +560,12 @@ class TrafficDB:
         Returns:
             The row ID of the inserted record.
         """
-        affected_json = json.dumps(affected_intersections)
-        cursor = self.conn.execute(
-            """INSERT INTO priority_actions
-               (action_type, target, reason, requested_by,
-                affected_intersections, timestamp)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (action_type, target, reason, requested_by, affected_json, timestamp),
+        # Intersection IDs never contain commas, so a plain join is enough
+        affected = ",".join(affected_intersections)
+        return self._insert(
+            SQL_INSERT_PRIORITY_ACTION,
+            (action_type, target, reason, requested_by, affected, timestamp),
         )
-        self.conn.commit()
-        return cursor.lastrowid
 
     # =========================================================================
     # Query Operations
@@ -252,16 +582,12 @@ class TrafficDB:
             limit: Maximum number of results.
 
         Returns:
-            List of event dictionaries.
+            List of event dictionaries (event_data as a LazyEvent).
         """
-        cursor = self.conn.execute(
-            """SELECT * FROM sensor_events
-               WHERE interseccion = ?
-               ORDER BY timestamp DESC
-               LIMIT ?""",
+        return self._fetch_events(
+            SQL_EVENTS_BY_INTERSECTION,
             (interseccion, limit),
         )
-        return [dict(row) for row in cursor.fetchall()]
 
     def query_events_by_time_range(
         self,
@@ -280,26 +606,43 @@ class TrafficDB:
             limit: Maximum number of results.
 
         Returns:
-            List of event dictionaries.
+            List of event dictionaries (event_data as a LazyEvent).
         """
         if interseccion:
-            cursor = self.conn.execute(
-                """SELECT * FROM sensor_events
-                   WHERE timestamp >= ? AND timestamp <= ?
-                   AND interseccion = ?
-                   ORDER BY timestamp DESC
-                   LIMIT ?""",
+            return self._fetch_events(
+                SQL_EVENTS_BY_TIME_RANGE_AND_INTERSECTION,
                 (timestamp_inicio, timestamp_fin, interseccion, limit),
             )
-        else:
-            cursor = self.conn.execute(
-                """SELECT * FROM sensor_events
-                   WHERE timestamp >= ? AND timestamp <= ?
-                   ORDER BY timestamp DESC
-                   LIMIT ?""",
-                (timestamp_inicio, timestamp_fin, limit),
+        return self._fetch_events(
+            SQL_EVENTS_BY_TIME_RANGE,
+            (timestamp_inicio, timestamp_fin, limit),
+        )
+
+    def iter_events_by_time_range(
+        self,
+        timestamp_inicio: str,
+        timestamp_fin: str,
+        interseccion: str | None = None,
+        limit: int = 200,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streaming variant of query_events_by_time_range.
+
+        Yields events as they are fetched instead of building the full list,
+        for callers that encode or aggregate results one at a time.
+        """
+        if interseccion:
+            return self._iter_events(
+                SQL_EVENTS_BY_TIME_RANGE_AND_INTERSECTION,
+                (timestamp_inicio, timestamp_fin, interseccion, limit),
+                batch_size,
             )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._iter_events(
+            SQL_EVENTS_BY_TIME_RANGE,
+            (timestamp_inicio, timestamp_fin, limit),
+            batch_size,
+        )
 
     def query_congestion_history(
         self,
@@ -314,24 +657,12 @@ class TrafficDB:
         Returns:
             List of congestion record dictionaries.
         """
-        query = "SELECT * FROM congestion_history WHERE 1=1"
-        params = []
-
-        if timestamp_inicio:
-            query += " AND timestamp >= ?"
-            params.append(timestamp_inicio)
-        if timestamp_fin:
-            query += " AND timestamp <= ?"
-            params.append(timestamp_fin)
-        if interseccion:
-            query += " AND interseccion = ?"
-            params.append(interseccion)
-
-        query += " ORDER BY timestamp DESC LIMIT ?"
+        params = [p for p in (timestamp_inicio, timestamp_fin, interseccion) if p]
         params.append(limit)
-
-        cursor = self.conn.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        query = _congestion_history_sql(
+            bool(timestamp_inicio), bool(timestamp_fin), bool(interseccion)
+        )
+        return self._fetch_all(query, params)
 
     def query_semaphore_state(self, interseccion: str) -> dict[str, Any] | None:
         """
@@ -340,14 +671,10 @@ class TrafficDB:
         Returns:
             Dictionary with latest state, or None if no records.
         """
-        cursor = self.conn.execute(
-            """SELECT * FROM semaphore_states
-               WHERE interseccion = ?
-               ORDER BY timestamp DESC
-               LIMIT 1""",
+        row = self._fetch_one(
+            SQL_SEMAPHORE_STATE,
             (interseccion,),
         )
-        row = cursor.fetchone()
         return dict(row) if row else None
 
     def query_all_semaphore_states(self) -> list[dict[str, Any]]:
@@ -357,32 +684,22 @@ class TrafficDB:
         Returns:
             List of the most recent state for each intersection.
         """
-        cursor = self.conn.execute(
-            """SELECT s1.* FROM semaphore_states s1
-               INNER JOIN (
-                   SELECT interseccion, MAX(timestamp) as max_ts
-                   FROM semaphore_states
-                   GROUP BY interseccion
-               ) s2 ON s1.interseccion = s2.interseccion
-               AND s1.timestamp = s2.max_ts
-               ORDER BY s1.interseccion"""
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_all(SQL_ALL_SEMAPHORE_STATES)
 
     def query_priority_actions(self, limit: int = 50) -> list[dict[str, Any]]:
         """
         Get recent priority actions (green waves, forced changes).
 
         Returns:
-            List of priority action dictionaries.
+            List of priority action dictionaries, with affected_intersections
+            decoded to a list of intersection IDs.
         """
-        cursor = self.conn.execute(
-            """SELECT * FROM priority_actions
-               ORDER BY timestamp DESC
-               LIMIT ?""",
-            (limit,),
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        actions = self._fetch_all(SQL_PRIORITY_ACTIONS, (limit,))
+        for action in actions:
+            action["affected_intersections"] = _split_intersections(
+                action["affected_intersections"]
+            )
+        return actions
 
     def get_event_count_in_interval(self, timestamp_inicio: str, timestamp_fin: str) -> int:
         """
@@ -392,12 +709,10 @@ class TrafficDB:
         Returns:
             Number of events in the interval.
         """
-        cursor = self.conn.execute(
-            """SELECT COUNT(*) as cnt FROM sensor_events
-               WHERE timestamp >= ? AND timestamp <= ?""",
+        row = self._fetch_one(
+            SQL_COUNT_EVENTS_IN_INTERVAL,
             (timestamp_inicio, timestamp_fin),
         )
-        row = cursor.fetchone()
         return row["cnt"] if row else 0
 
     def get_system_summary(self) -> dict[str, Any]:
@@ -407,25 +722,5 @@ class TrafficDB:
         Returns:
             Dictionary with counts and recent activity.
         """
-        total_events = self.conn.execute("SELECT COUNT(*) as cnt FROM sensor_events").fetchone()[
-            "cnt"
-        ]
-
-        total_congestion = self.conn.execute(
-            "SELECT COUNT(*) as cnt FROM congestion_history WHERE traffic_state = 'CONGESTION'"
-        ).fetchone()["cnt"]
-
-        total_green_waves = self.conn.execute(
-            "SELECT COUNT(*) as cnt FROM priority_actions WHERE action_type = 'GREEN_WAVE'"
-        ).fetchone()["cnt"]
-
-        total_semaphore_changes = self.conn.execute(
-            "SELECT COUNT(*) as cnt FROM semaphore_states"
-        ).fetchone()["cnt"]
-
-        return {
-            "total_sensor_events": total_events,
-            "total_congestion_detections": total_congestion,
-            "total_green_waves": total_green_waves,
-            "total_semaphore_changes": total_semaphore_changes,
-        }
+        # Counters maintained by triggers: one read of a four-row table
+        return {row["name"]: row["value"] for row in self._fetch_all(SQL_SYSTEM_STATS)}
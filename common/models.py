@@ -9,7 +9,11 @@ transmission over ZMQ sockets.
 import json
 import time
 from dataclasses import asdict, dataclass, field
-from datetime import UTC, datetime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, stdlib json is the fallback
+    orjson = None
 
 from common.constants import (
     CONGESTION_ALTA,
@@ -27,34 +31,170 @@ from common.constants import (
 # =============================================================================
 
 
+def iso_from_epoch(seconds: float) -> str:
+    """
+    Format a Unix timestamp as ISO 8601 UTC (second precision).
+
+    Formats the time.gmtime() fields directly, skipping both the datetime
+    allocation and strftime's format parsing.
+    """
+    t = time.gmtime(seconds)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+    )
+
+
+# (epoch second, formatted string) of the last now_iso() call. Replaced as a
+# whole tuple so concurrent readers never see a mismatched pair.
+_now_iso_cache: tuple[int, str] = (-1, "")
+
+
 def now_iso() -> str:
-    """Return current UTC timestamp in ISO 8601 format."""
-    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+    """Return current UTC timestamp in ISO 8601 format (formatted once per second)."""
+    global _now_iso_cache
+    sec = int(time.time())
+    cached_sec, cached = _now_iso_cache
+    if sec != cached_sec:
+        cached = iso_from_epoch(sec)
+        _now_iso_cache = (sec, cached)
+    return cached
+
+
+# The stdlib fallback writes the same compact JSON as orjson
+_SEPARATORS = (",", ":")
+
+
+def dumps(data) -> str:
+    """Serialize a plain Python value (dict, list, ...) to a JSON string."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=_SEPARATORS)
+
+
+def dumpb(data) -> bytes:
+    """Serialize a plain Python value to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=_SEPARATORS).encode()
+
+
+def _fields_dict(obj) -> dict:
+    """
+    Shallow {field: value} dict of a model, in declaration order.
+
+    For models whose fields are all plain values this is what asdict()
+    returns, without its recursive deep copy.
+    """
+    return {name: getattr(obj, name) for name in obj._field_order}
 
 
 def to_json(obj) -> str:
-    """Serialize a dataclass instance to a JSON string."""
-    return json.dumps(asdict(obj), ensure_ascii=False)
+    """Serialize a flat model instance to a JSON string."""
+    if orjson is not None:
+        # orjson walks dataclasses natively, skipping asdict()'s recursive copy
+        return orjson.dumps(obj).decode()
+    return json.dumps(_fields_dict(obj), ensure_ascii=False, separators=_SEPARATORS)
+
+
+def to_json_bytes(obj) -> bytes:
+    """Serialize a flat model instance to UTF-8 JSON bytes (e.g. for a ZMQ frame)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(_fields_dict(obj), ensure_ascii=False, separators=_SEPARATORS).encode()
+
+
+def _to_json_any(obj) -> str:
+    """Serialize a dataclass whose fields may hold arbitrary values (str() fallback)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(asdict(obj), ensure_ascii=False, default=str, separators=_SEPARATORS)
 
 
-def from_json(json_str: str) -> dict:
-    """Deserialize a JSON string to a dictionary."""
+def _to_json_any_bytes(obj) -> bytes:
+    """Like _to_json_any, but returns UTF-8 bytes ready to send as a ZMQ frame."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(asdict(obj), ensure_ascii=False, default=str, separators=_SEPARATORS).encode()
+
+
+def from_json(json_str: str | bytes) -> dict:
+    """Deserialize a JSON string (or UTF-8 bytes) to a dictionary."""
+    if orjson is not None:
+        return orjson.loads(json_str)
     return json.loads(json_str)
 
 
+class LazyEvent:
+    """
+    Stored event_data JSON blob that is only parsed when a field is read.
+
+    Query results usually get counted or forwarded untouched, so parsing is
+    deferred to the first field access and then cached. str() returns the
+    original JSON text, so responses serialized with default=str are unchanged.
+    """
+
+    __slots__ = ("_data", "raw")
+
+    def __init__(self, raw: str | bytes):
+        self.raw = raw
+        self._data: dict | None = None
+
+    def data(self) -> dict:
+        """Parse the blob (once) and return it as a dictionary."""
+        if self._data is None:
+            self._data = from_json(self.raw)
+        return self._data
+
+    def __getitem__(self, key: str):
+        return self.data()[key]
+
+    def get(self, key: str, default=None):
+        return self.data().get(key, default)
+
+    def __str__(self) -> str:
+        return self.raw.decode() if isinstance(self.raw, bytes) else self.raw
+
+    def __repr__(self) -> str:
+        return f"LazyEvent({self.raw!r})"
+
+
+def _cache_fields(cls):
+    """
+    Class decorator: store the dataclass field names, as a frozenset for
+    from_dict and as an ordered tuple for the stdlib JSON fallback.
+    """
+    cls._field_names = frozenset(cls.__dataclass_fields__)
+    cls._field_order = tuple(cls.__dataclass_fields__)
+    return cls
+
+
+def _from_dict(cls, data: dict):
+    """Build a dataclass instance from a dict, ignoring keys that are not fields."""
+    fields = cls._field_names
+    if data.keys() <= fields:  # Common case: nothing to filter out
+        return cls(**data)
+    return cls(**{k: v for k, v in data.items() if k in fields})
+
+
+# Thresholds and classifier table bound once at import. The table is indexed
+# by (speed < ALTA max) - (speed > BAJA min): 1 is ALTA, -1 wraps to BAJA and
+# 0 is NORMAL, which NaN also lands on since both comparisons are False. The
+# comparisons keep it exact for fractional speeds, which a table indexed by
+# int(speed) would not be (40.1 km/h is BAJA, int(40.1) is not > 40); the GPS
+# sensor's per-event lookup is its own pre-serialized _SPEED_FRAGMENTS table
+_ALTA, _BAJA = CONGESTION_ALTA_MAX_SPEED, CONGESTION_BAJA_MIN_SPEED
+_L = (CONGESTION_NORMAL, CONGESTION_ALTA, CONGESTION_BAJA)
+
+
 def get_congestion_level(velocidad_promedio: float) -> str:
     """
     Determine congestion level based on average speed.
     - ALTA: speed < 10 km/h
-    - NORMAL: 11 <= speed <= 39 km/h
+    - NORMAL: 11 <= speed <= 39 km/h (and NaN, an unusable reading)
     - BAJA: speed > 40 km/h
     """
-    if velocidad_promedio < CONGESTION_ALTA_MAX_SPEED:
-        return CONGESTION_ALTA
-    elif velocidad_promedio > CONGESTION_BAJA_MIN_SPEED:
-        return CONGESTION_BAJA
-    else:
-        return CONGESTION_NORMAL
+    return _L[(velocidad_promedio < _ALTA) - (velocidad_promedio > _BAJA)]
 
 
 # =============================================================================
@@ -62,7 +202,8 @@ def get_congestion_level(velocidad_promedio: float) -> str:
 # =============================================================================
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class CameraEvent:
     """
     Event from a camera sensor (EVENTO_LONGITUD_COLA - Lq).
@@ -81,10 +222,11 @@ class CameraEvent:
 
     @classmethod
     def from_dict(cls, data: dict) -> "CameraEvent":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class InductiveEvent:
     """
     Event from an inductive loop sensor (EVENTO_CONTEO_VEHICULAR - Cv).
@@ -104,10 +246,11 @@ class InductiveEvent:
 
     @classmethod
     def from_dict(cls, data: dict) -> "InductiveEvent":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class GPSEvent:
     """
     Event from a GPS sensor (EVENTO_DENSIDAD_DE_TRAFICO - Dt).
@@ -130,7 +273,7 @@ class GPSEvent:
 
     @classmethod
     def from_dict(cls, data: dict) -> "GPSEvent":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
 # =============================================================================
@@ -138,7 +281,8 @@ class GPSEvent:
 # =============================================================================
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class SemaphoreCommand:
     """
     Command sent from the analytics service to the semaphore control service.
@@ -157,7 +301,7 @@ class SemaphoreCommand:
 
     @classmethod
     def from_dict(cls, data: dict) -> "SemaphoreCommand":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
 # =============================================================================
@@ -165,7 +309,8 @@ class SemaphoreCommand:
 # =============================================================================
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class MonitoringQuery:
     """
     Query sent from the monitoring service (PC3) to the analytics service (PC2).
@@ -186,10 +331,11 @@ class MonitoringQuery:
 
     @classmethod
     def from_dict(cls, data: dict) -> "MonitoringQuery":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class MonitoringResponse:
     """
     Response sent from the analytics service (PC2) back to monitoring (PC3).
@@ -202,13 +348,15 @@ class MonitoringResponse:
     timestamp: str = field(default_factory=now_iso)
 
     def to_json(self) -> str:
-        # Custom serialization because 'data' can be complex
-        d = asdict(self)
-        return json.dumps(d, ensure_ascii=False, default=str)
+        # 'data' can hold complex values (e.g. LazyEvent), serialized via str()
+        return _to_json_any(self)
+
+    def to_json_bytes(self) -> bytes:
+        return _to_json_any_bytes(self)
 
     @classmethod
     def from_dict(cls, data: dict) -> "MonitoringResponse":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
 # =============================================================================
@@ -216,7 +364,8 @@ class MonitoringResponse:
 # =============================================================================
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class AnalyticsDecision:
     """
     Record of a decision made by the analytics service.
@@ -231,12 +380,11 @@ class AnalyticsDecision:
     timestamp: str = field(default_factory=now_iso)
 
     def to_json(self) -> str:
-        d = asdict(self)
-        return json.dumps(d, ensure_ascii=False, default=str)
+        return _to_json_any(self)
 
     @classmethod
     def from_dict(cls, data: dict) -> "AnalyticsDecision":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
 
 
 # =============================================================================
@@ -244,7 +392,8 @@ class AnalyticsDecision:
 # =============================================================================
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class SemaphoreState:
     """
     Current state of a semaphore at a given intersection.
@@ -261,4 +410,4 @@ class SemaphoreState:
 
     @classmethod
     def from_dict(cls, data: dict) -> "SemaphoreState":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return _from_dict(cls, data)
@@ -24,7 +24,7 @@ from common.constants import (
     CMD_QUERY_INTERSECTION,
     CMD_SYSTEM_STATUS,
 )
-from common.models import MonitoringQuery, MonitoringResponse, from_json
+from common.models import MonitoringQuery, MonitoringResponse, from_json, to_json_bytes
 
 logger = logging.getLogger("Monitoring")
 
@@ -198,9 +198,8 @@ def send_query(req_socket: zmq.Socket, query: MonitoringQuery) -> MonitoringResp
     """
     try:
         logger.info("[SEND] command=%s", query.command)
-        req_socket.send_string(query.to_json())
-        resp_str = req_socket.recv_string()
-        resp_data = from_json(resp_str)
+        req_socket.send(to_json_bytes(query))
+        resp_data = from_json(req_socket.recv())
         response = MonitoringResponse.from_dict(resp_data)
         logger.info("[RECV] status=%s, message=%s", response.status, response.message)
         return response
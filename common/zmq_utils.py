@@ -0,0 +1,87 @@
+"""
+zmq_utils.py - Shared ZMQ context setup for the PC1 ingestion path.
+
+libzmq already disables Nagle's algorithm (TCP_NODELAY) on every TCP
+connection, so the tuning applied here is queue depth, linger and TCP
+keepalive. SO_SNDBUF is left to the kernel, whose send-buffer autotuning
+would be disabled by a fixed size, and CONFLATE is never set: one PUB
+carries many sensors (and two-frame messages), so last-value-only
+queueing would drop other sensors' events.
+
+A PUB socket never blocks in send(): once a subscriber's SNDHWM queue is
+full, libzmq drops that subscriber's copy. Sensors therefore send without
+DONTWAIT, and a slow subscriber cannot stall them.
+
+Sensors publish each event as two direct send() calls, the topic frame
+with SNDMORE and then the payload, which skips send_multipart()'s
+per-call Python overhead. The topic frame is a precomputed TOPIC_*_BYTES
+constant, so nothing is re-encoded per event.
+
+Sensor processes can optionally pin their publishing thread and the
+context's single IO thread to two CPUs (--pin-cpus, Linux only), so
+neither migrates away from its warm caches.
+"""
+
+import os
+
+import zmq
+
+from common.constants import (
+    ZMQ_HWM,
+    ZMQ_LINGER_MS,
+    ZMQ_TCP_KEEPALIVE,
+    ZMQ_TCP_KEEPALIVE_IDLE_SEC,
+    ZMQ_TCP_KEEPALIVE_INTVL_SEC,
+)
+
+
+def validate_cpus(cpus: tuple[int, int]) -> None:
+    """
+    Check that a (main_cpu, io_cpu) pair can be pinned to by this process.
+
+    libzmq aborts the whole process when asked to pin its IO thread to a
+    CPU outside the allowed set, so this is checked up front.
+
+    Raises:
+        ValueError: CPU pinning is unsupported here, or a CPU is not allowed.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        raise ValueError("CPU pinning is only supported on Linux")
+    allowed = os.sched_getaffinity(0)
+    missing = sorted(set(cpus) - allowed)
+    if missing:
+        raise ValueError(
+            f"CPUs {missing} not available to this process (allowed: {sorted(allowed)})"
+        )
+
+
+def new_context(cpus: tuple[int, int] | None = None) -> zmq.Context:
+    """
+    Create a ZMQ context whose sockets default to the tuned options.
+
+    Options set on a context apply to every socket it creates afterwards,
+    so sensors and brokers get SNDHWM/RCVHWM, LINGER and TCP keepalive
+    without repeating setsockopt calls at each socket.
+
+    Args:
+        cpus: Optional (main_cpu, io_cpu). The calling thread is pinned to
+            main_cpu and the context's IO thread, started with its first
+            socket, to io_cpu. See validate_cpus().
+
+    Returns:
+        A new zmq.Context with socket defaults applied.
+    """
+    if cpus is not None:
+        validate_cpus(cpus)
+    context = zmq.Context(io_threads=1)
+    context.setsockopt(zmq.SNDHWM, ZMQ_HWM)
+    context.setsockopt(zmq.RCVHWM, ZMQ_HWM)
+    context.setsockopt(zmq.LINGER, ZMQ_LINGER_MS)
+    context.setsockopt(zmq.TCP_KEEPALIVE, ZMQ_TCP_KEEPALIVE)
+    context.setsockopt(zmq.TCP_KEEPALIVE_IDLE, ZMQ_TCP_KEEPALIVE_IDLE_SEC)
+    context.setsockopt(zmq.TCP_KEEPALIVE_INTVL, ZMQ_TCP_KEEPALIVE_INTVL_SEC)
+    if cpus is not None:
+        main_cpu, io_cpu = cpus
+        context.set(zmq.THREAD_AFFINITY_CPU_ADD, io_cpu)
+        os.sched_setaffinity(0, {main_cpu})
+    return context
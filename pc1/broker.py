@@ -11,17 +11,27 @@ Communication pattern:
     Sensors (PUB) --[topic msg]--> Broker (SUB) --[topic msg]--> Broker (PUB) --> PC2 Analytics (SUB)
 
 Usage:
-    python -m pc1.broker [--mode standard]
+    python -m pc1.broker [--mode standard|threaded|proxy]
 """
 
 import argparse
 import logging
 import signal
+import sys
+import threading
 import time
 
 import zmq
 
 from common.config_loader import get_config
+from common.constants import (
+    INPROC_SENSOR_ALL,
+    INPROC_SENSOR_CAMERA,
+    INPROC_SENSOR_GPS,
+    INPROC_SENSOR_INDUCTIVE,
+    LOG_EVERY_N_EVENTS,
+)
+from common.zmq_utils import new_context
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -36,33 +46,87 @@ logger = logging.getLogger("Broker")
 # ---------------------------------------------------------------------------
 # Graceful shutdown
 # ---------------------------------------------------------------------------
-_running = True
+# Set once on shutdown; waiting on it costs no wakeups until then
+_shutdown = threading.Event()
 
 
 def _signal_handler(sig, frame):
-    global _running
     logger.info("Shutdown signal received, stopping broker...")
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _signal_handler)
 signal.signal(signal.SIGTERM, _signal_handler)
 
 
+def stop() -> None:
+    """Stop the broker loop (used when running as a thread inside start_pc1)."""
+    _shutdown.set()
+
+
+# Sensor PUB ports on localhost and the topic each one publishes
+SENSOR_PORTS = [
+    ("sensor_camera_pub", "camara", INPROC_SENSOR_CAMERA),
+    ("sensor_inductive_pub", "espira", INPROC_SENSOR_INDUCTIVE),
+    ("sensor_gps_pub", "gps", INPROC_SENSOR_GPS),
+]
+
+# Control channel used to stop the libzmq proxy from the main thread
+PROXY_CONTROL_ADDR = "inproc://broker_proxy_control"
+
+
+# Port of the single asyncio sensor process (pc1.sensors.all_sensors_async)
+UNIFIED_SENSOR_PORT = "sensor_all_pub"
+
+
+def _sensor_endpoints(inproc: bool, unified: bool = False) -> dict[str, list[str]]:
+    """
+    Map each sensor address to the topics read from it.
+
+    Per-type sensor processes publish one topic per port (TCP loopback, or
+    inproc in single-process mode); the asyncio sensor process publishes
+    every topic from one socket on the sensor_all_pub port (or
+    INPROC_SENSOR_ALL when it shares this process).
+    """
+    if inproc:
+        if unified:
+            return {INPROC_SENSOR_ALL: [topic for _, topic, _ in SENSOR_PORTS]}
+        return {inproc_addr: [topic] for _, topic, inproc_addr in SENSOR_PORTS}
+    config = get_config()
+    if unified:
+        addr = f"tcp://127.0.0.1:{config.get_port(UNIFIED_SENSOR_PORT)}"
+        return {addr: [topic for _, topic, _ in SENSOR_PORTS]}
+    return {
+        f"tcp://127.0.0.1:{config.get_port(port_name)}": [topic]
+        for port_name, topic, _ in SENSOR_PORTS
+    }
+
+
 # ---------------------------------------------------------------------------
 # Standard (single-threaded) broker
 # ---------------------------------------------------------------------------
 
 
-def run_broker_standard() -> None:
+def run_broker_standard(
+    context: zmq.Context | None = None, inproc: bool = False, unified: bool = False
+) -> None:
     """
     Standard single-threaded broker.
 
     Uses zmq.Poller to listen on multiple SUB sockets (one per sensor type)
     and forwards all received messages to a single PUB socket for PC2.
+
+    Args:
+        context: Shared ZMQ context (single-process PC1); created if None.
+        inproc: Connect to the sensors' inproc:// endpoints instead of TCP
+            loopback. Requires the sensors to share ``context``.
+        unified: Read all topics from the single asyncio sensor process
+            (sensor_all_pub) instead of one port per sensor type.
     """
     config = get_config()
-    context = zmq.Context()
+    owns_context = context is None
+    if owns_context:
+        context = new_context()
 
     # -- PUB socket: forwards events to PC2 --
     publisher = context.socket(zmq.PUB)
@@ -71,50 +135,53 @@ def run_broker_standard() -> None:
     logger.info("Broker PUB socket bound on %s", pub_bind)
 
     # -- SUB sockets: subscribe to each sensor type on localhost --
-    subscribers = []
-    sensor_ports = [
-        ("sensor_camera_pub", "camara"),
-        ("sensor_inductive_pub", "espira"),
-        ("sensor_gps_pub", "gps"),
-    ]
-
+    # Each SUB carries exactly one topic, so the topic is known per socket
+    subscribers: dict[zmq.Socket, str] = {}
     poller = zmq.Poller()
 
-    for port_name, topic in sensor_ports:
+    for addr, topics in _sensor_endpoints(inproc, unified).items():
         sub = context.socket(zmq.SUB)
-        addr = f"tcp://127.0.0.1:{config.get_port(port_name)}"
         sub.connect(addr)
-        # Subscribe to the specific topic
-        sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        # Subscribe to the specific topic(s) published on this address
+        for topic in topics:
+            sub.setsockopt_string(zmq.SUBSCRIBE, topic)
         poller.register(sub, zmq.POLLIN)
-        subscribers.append(sub)
-        logger.info("Broker SUB connected to %s (topic: %s)", addr, topic)
+        subscribers[sub] = ",".join(topics)
+        logger.info("Broker SUB connected to %s (topic: %s)", addr, subscribers[sub])
 
     logger.info("Broker started in STANDARD mode. Forwarding sensor events to PC2...")
 
     # Small delay for connections to establish
     time.sleep(0.5)
 
+    # Per-event lines only at DEBUG; INFO gets a progress line every N events
+    log_debug = logger.isEnabledFor(logging.DEBUG)
     event_count = 0
     try:
-        while _running:
-            # Poll with 1s timeout so we can check _running flag
-            socks = dict(poller.poll(timeout=1000))
-            for sub in subscribers:
-                if sub in socks and socks[sub] == zmq.POLLIN:
-                    message = sub.recv_string()
-                    # Forward the message as-is (topic + payload)
-                    publisher.send_string(message)
-                    event_count += 1
-
-                    # Extract topic for logging
-                    topic = message.split(" ", 1)[0]
-                    logger.info(
+        while not _shutdown.is_set():
+            # Poll with 1s timeout so we can check the shutdown flag. Under
+            # sensor traffic poll() returns far sooner anyway; the timeout
+            # only fires on an idle second
+            # Only readable sockets are returned (all are registered POLLIN-only)
+            for sub, _ in poller.poll(timeout=1000):
+                # Forward the [topic, payload] frames as-is. Copying recv/send
+                # on purpose: payloads are a few hundred bytes, and for those
+                # wrapping each frame in a zmq.Frame (copy=False) costs more
+                # than the memcpy it saves; zero-copy only wins at tens of KB
+                topic_frame, payload = sub.recv_multipart()
+                publisher.send(topic_frame, zmq.SNDMORE)
+                publisher.send(payload)
+                event_count += 1
+
+                if log_debug:
+                    logger.debug(
                         "[FORWARD #%d] topic=%s | size=%d bytes",
                         event_count,
-                        topic,
-                        len(message),
+                        topic_frame.decode(),
+                        len(payload),
                     )
+                if event_count % LOG_EVERY_N_EVENTS == 0:
+                    logger.info("[FORWARD] %d events forwarded", event_count)
     except KeyboardInterrupt:
         logger.info("Broker interrupted.")
     finally:
@@ -122,7 +189,86 @@ def run_broker_standard() -> None:
         for sub in subscribers:
             sub.close()
         publisher.close()
-        context.term()
+        if owns_context:
+            context.term()
+
+
+# ---------------------------------------------------------------------------
+# Proxy broker (forwarding loop inside libzmq)
+# ---------------------------------------------------------------------------
+
+
+def run_broker_proxy(
+    context: zmq.Context | None = None, inproc: bool = False, unified: bool = False
+) -> None:
+    """
+    Run the broker on libzmq's built-in proxy instead of a Python loop.
+
+    A single SUB socket connects to every sensor port and the SUB -> PUB copy
+    happens entirely in C, so there is no per-message Python work (and no
+    per-message logging). The proxy runs in a background thread; the main
+    thread watches the shutdown flag and stops it through a control socket.
+
+    Args:
+        context: Shared ZMQ context (single-process PC1); created if None.
+        inproc: Connect to the sensors' inproc:// endpoints instead of TCP
+            loopback. Requires the sensors to share ``context``.
+        unified: Read all topics from the single asyncio sensor process
+            (sensor_all_pub) instead of one port per sensor type.
+    """
+    config = get_config()
+    owns_context = context is None
+    if owns_context:
+        context = new_context()
+
+    # -- PUB socket: forwards events to PC2 --
+    publisher = context.socket(zmq.PUB)
+    pub_bind = config.zmq_bind_address("broker_pub")
+    publisher.bind(pub_bind)
+    logger.info("Broker PUB socket bound on %s", pub_bind)
+
+    # -- One SUB socket for all sensor types --
+    sub = context.socket(zmq.SUB)
+    for addr, topics in _sensor_endpoints(inproc, unified).items():
+        sub.connect(addr)
+        for topic in topics:
+            sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        logger.info("Broker SUB connected to %s (topic: %s)", addr, ",".join(topics))
+
+    # -- Control pair: TERMINATE sent on one end stops the proxy --
+    control = context.socket(zmq.PAIR)
+    control.bind(PROXY_CONTROL_ADDR)
+    control_client = context.socket(zmq.PAIR)
+    control_client.connect(PROXY_CONTROL_ADDR)
+
+    proxy_thread = threading.Thread(
+        target=zmq.proxy_steerable,
+        args=(sub, publisher, None, control),
+        name="Proxy",
+        daemon=True,
+    )
+    proxy_thread.start()
+    logger.info("Broker started in PROXY mode. Forwarding sensor events to PC2...")
+
+    try:
+        if sys.platform == "win32":
+            # An untimed lock wait cannot be interrupted on Windows, so Ctrl+C
+            # would never reach the signal handler; wait in bounded slices
+            while not _shutdown.wait(0.5):
+                pass
+        else:
+            _shutdown.wait()
+    except KeyboardInterrupt:
+        logger.info("Broker interrupted.")
+    finally:
+        _shutdown.set()
+        control_client.send(b"TERMINATE")
+        proxy_thread.join(timeout=3)
+        logger.info("Broker shutting down.")
+        for sock in (control_client, control, sub, publisher):
+            sock.close()
+        if owns_context:
+            context.term()
 
 
 # ---------------------------------------------------------------------------
@@ -134,9 +280,16 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="ZMQ Broker for sensor data")
     parser.add_argument(
         "--mode",
-        choices=["standard", "threaded"],
+        choices=["standard", "threaded", "proxy"],
         default="standard",
-        help="Broker mode: standard (single-thread) or threaded (multi-thread)",
+        help="Broker mode: standard (single-thread), threaded (multi-thread) "
+        "or proxy (libzmq proxy, no per-message logging)",
+    )
+    parser.add_argument(
+        "--unified-sensors",
+        action="store_true",
+        help="Read every sensor topic from the single asyncio sensor process "
+        "(sensor_all_pub port) instead of one port per sensor type",
     )
     return parser.parse_args(argv)
 
@@ -147,9 +300,11 @@ def main(argv: list[str] | None = None) -> None:
         # Import threaded variant to avoid circular dependencies at module level
         from pc1.broker_threaded import run_broker_threaded
 
-        run_broker_threaded()
+        run_broker_threaded(unified=args.unified_sensors)
+    elif args.mode == "proxy":
+        run_broker_proxy(unified=args.unified_sensors)
     else:
-        run_broker_standard()
+        run_broker_standard(unified=args.unified_sensors)
 
 
 if __name__ == "__main__":
@@ -12,9 +12,12 @@ Architecture:
     Thread-3 (SUB gps)     --> PUSH inproc://broker_pipe
                                      |
     Collector (PULL inproc) <--------+---> PUB tcp://*:5560
+    (zmq.proxy_steerable, no Python per message)
 
 This design is compared against the standard single-threaded broker for
 the performance experiments required by the project specification.
+The lowest-overhead option remains --mode proxy (one SUB socket, no
+Python worker threads); this variant is kept for that comparison.
 
 Usage:
     python -m pc1.broker --mode threaded
@@ -22,12 +25,14 @@ Usage:
 
 import logging
 import signal
+import sys
 import threading
 import time
 
 import zmq
 
 from common.config_loader import get_config
+from common.zmq_utils import new_context
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -42,13 +47,13 @@ logger = logging.getLogger("BrokerThreaded")
 # ---------------------------------------------------------------------------
 # Graceful shutdown
 # ---------------------------------------------------------------------------
-_running = True
+# Set once on shutdown; the main thread blocks on it with no periodic wakeups
+_shutdown = threading.Event()
 
 
 def _signal_handler(sig, frame):
-    global _running
     logger.info("Shutdown signal received, stopping threaded broker...")
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _signal_handler)
@@ -57,6 +62,9 @@ signal.signal(signal.SIGTERM, _signal_handler)
 # Inproc address for inter-thread communication
 INPROC_ADDR = "inproc://broker_pipe"
 
+# Control channel used to stop the collector's libzmq proxy
+COLLECTOR_CONTROL_ADDR = "inproc://broker_collector_control"
+
 
 # ---------------------------------------------------------------------------
 # Worker thread: subscribes to one sensor topic, pushes to inproc
@@ -81,21 +89,26 @@ def _subscriber_worker(
 
     # PUSH socket to forward to collector
     push = context.socket(zmq.PUSH)
+    # Only queue once the collector's PULL end is actually connected
+    push.setsockopt(zmq.IMMEDIATE, 1)
     push.connect(INPROC_ADDR)
 
     logger.info("[%s] SUB connected to %s (topic: %s)", thread_name, addr, topic)
 
+    log_debug = logger.isEnabledFor(logging.DEBUG)
     count = 0
     try:
-        while _running:
-            # Poll with timeout so thread can check _running flag
+        while not _shutdown.is_set():
+            # Poll with timeout so thread can check the shutdown flag
             if sub.poll(timeout=1000):
-                message = sub.recv_string()
-                push.send_string(message)
+                topic, payload = sub.recv_multipart()
+                push.send(topic, zmq.SNDMORE)
+                push.send(payload)
                 count += 1
-                logger.debug("[%s] Forwarded message #%d", thread_name, count)
+                if log_debug:
+                    logger.debug("[%s] Forwarded message #%d", thread_name, count)
     except zmq.ZMQError as e:
-        if _running:
+        if not _shutdown.is_set():
             logger.error("[%s] ZMQ error: %s", thread_name, e)
     finally:
         logger.info("[%s] Shutting down. Messages forwarded: %d", thread_name, count)
@@ -108,10 +121,14 @@ def _subscriber_worker(
 # ---------------------------------------------------------------------------
 
 
-def _collector_worker(context: zmq.Context, pub_bind: str) -> None:
+def _collector_worker(context: zmq.Context, pub_bind: str, control: zmq.Socket) -> None:
     """
     Collector thread that pulls messages from all subscriber worker threads
     and publishes them to the external PUB socket for PC2.
+
+    The PULL -> PUB copy runs inside libzmq's steerable proxy, so the
+    collector adds no per-message Python work (or GIL contention with the
+    workers). It returns once TERMINATE is sent on the control socket.
     """
     # PULL socket from worker threads
     pull = context.socket(zmq.PULL)
@@ -123,25 +140,13 @@ def _collector_worker(context: zmq.Context, pub_bind: str) -> None:
 
     logger.info("[Collector] PULL bound on %s, PUB bound on %s", INPROC_ADDR, pub_bind)
 
-    event_count = 0
     try:
-        while _running:
-            if pull.poll(timeout=1000):
-                message = pull.recv_string()
-                pub.send_string(message)
-                event_count += 1
-                topic = message.split(" ", 1)[0]
-                logger.info(
-                    "[FORWARD #%d] topic=%s | size=%d bytes",
-                    event_count,
-                    topic,
-                    len(message),
-                )
+        zmq.proxy_steerable(pull, pub, None, control)
     except zmq.ZMQError as e:
-        if _running:
+        if not _shutdown.is_set():
             logger.error("[Collector] ZMQ error: %s", e)
     finally:
-        logger.info("[Collector] Shutting down. Total events: %d", event_count)
+        logger.info("[Collector] Shutting down.")
         pull.close()
         pub.close()
 
@@ -151,14 +156,17 @@ def _collector_worker(context: zmq.Context, pub_bind: str) -> None:
 # ---------------------------------------------------------------------------
 
 
-def run_broker_threaded() -> None:
+def run_broker_threaded(unified: bool = False) -> None:
     """
     Launch the multithreaded broker: one subscriber thread per sensor topic
     plus a collector thread that publishes to PC2.
+
+    Args:
+        unified: Subscribe every worker to the single asyncio sensor process
+            (sensor_all_pub) instead of one port per sensor type.
     """
-    global _running
     config = get_config()
-    context = zmq.Context()
+    context = new_context()
 
     pub_bind = config.zmq_bind_address("broker_pub")
 
@@ -167,13 +175,23 @@ def run_broker_threaded() -> None:
         (config.get_port("sensor_inductive_pub"), "espira", "Thread-Inductive"),
         (config.get_port("sensor_gps_pub"), "gps", "Thread-GPS"),
     ]
+    if unified:
+        # Each worker still filters its own topic off the shared publisher
+        all_port = config.get_port("sensor_all_pub")
+        sensor_ports = [(all_port, topic, name) for _, topic, name in sensor_ports]
 
     logger.info("Starting broker in THREADED mode with %d worker threads...", len(sensor_ports))
 
+    # -- Control pair: TERMINATE sent on one end stops the collector proxy --
+    control = context.socket(zmq.PAIR)
+    control.bind(COLLECTOR_CONTROL_ADDR)
+    control_client = context.socket(zmq.PAIR)
+    control_client.connect(COLLECTOR_CONTROL_ADDR)
+
     # Start collector thread first (it binds inproc)
     collector = threading.Thread(
         target=_collector_worker,
-        args=(context, pub_bind),
+        args=(context, pub_bind, control),
         name="Collector",
         daemon=True,
     )
@@ -196,18 +214,25 @@ def run_broker_threaded() -> None:
 
     logger.info("Threaded broker fully started. %d workers + 1 collector.", len(workers))
 
-    # Main thread waits for shutdown signal
+    # Main thread waits for shutdown signal; on Windows in bounded slices so
+    # Ctrl+C is still handled (see run_broker_proxy in pc1.broker)
     try:
-        while _running:
-            time.sleep(0.5)
+        if sys.platform == "win32":
+            while not _shutdown.wait(0.5):
+                pass
+        else:
+            _shutdown.wait()
     except KeyboardInterrupt:
         pass
     finally:
-        _running = False
+        _shutdown.set()
         logger.info("Waiting for threads to finish...")
         for t in workers:
             t.join(timeout=3)
+        control_client.send(b"TERMINATE")
         collector.join(timeout=3)
+        control_client.close()
+        control.close()
         context.term()
         logger.info("Threaded broker shut down.")
 
@@ -0,0 +1,353 @@
+"""
+all_sensors_async.py - Every sensor type in a single asyncio process.
+
+Runs the camera, inductive loop and GPS simulators as three coroutines on
+one event loop, publishing through ONE shared PUB socket bound on the
+sensor_all_pub port. The broker then needs a single connection for all
+sensor traffic (python -m pc1.broker --unified-sensors) instead of three.
+
+Event generation and payloads are the same as the per-type sensor
+processes (pc1.sensors.camera_sensor / inductive_sensor / gps_sensor),
+which remain the default launch mode of start_pc1.py.
+
+When uvloop is installed the coroutines run on its libuv event loop,
+whose socket-readiness callbacks cost less than the default selector
+loop's; otherwise the standard asyncio loop is used.
+
+Usage:
+    python -m pc1.sensors.all_sensors_async [--interval 10] [--count 2]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+from collections.abc import Callable, Sequence
+
+import zmq
+import zmq.asyncio
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional
+    uvloop = None
+
+from common.config_loader import get_config
+from common.constants import (
+    INDUCTIVE_INTERVAL_SEC,
+    LOG_EVERY_N_EVENTS,
+    SENSOR_DEFAULT_INTERVAL_SEC,
+    TOPIC_CAMERA_BYTES,
+    TOPIC_GPS_BYTES,
+    TOPIC_INDUCTIVE_BYTES,
+)
+from common.models import now_iso
+from common.zmq_utils import new_context
+from pc1.sensors.camera_sensor import _reading_stream, build_payload_template
+from pc1.sensors.gps_sensor import _SPEED_FRAGMENTS, _speed_index_stream
+from pc1.sensors.gps_sensor import build_payload_template as build_gps_template
+from pc1.sensors.inductive_sensor import _count_stream, _window_iso
+from pc1.sensors.inductive_sensor import build_payload_template as build_inductive_template
+
+# ---------------------------------------------------------------------------
+# Logging
+# ---------------------------------------------------------------------------
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    datefmt="%Y-%m-%dT%H:%M:%SZ",
+)
+logger = logging.getLogger("AllSensorsAsync")
+
+
+# ---------------------------------------------------------------------------
+# Payload builders (one call per event)
+# ---------------------------------------------------------------------------
+
+
+def _cached_encoder() -> Callable[[str], bytes]:
+    """
+    str.encode() that reuses its last result while given the same object.
+
+    now_iso() and _window_iso() return the same string objects until the
+    second changes, so the timestamps are encoded once per second rather
+    than once per event, as in the per-type sensor loops.
+    """
+    last_text = ""
+    last_bytes = b""
+
+    def encode(text: str) -> bytes:
+        nonlocal last_text, last_bytes
+        if text is not last_text:
+            last_text = text
+            last_bytes = text.encode()
+        return last_bytes
+
+    return encode
+
+
+def _camera_payloads(sensors: Sequence[dict[str, str]]) -> list[Callable[[], bytes]]:
+    """Per-sensor camera payload builders using the precomputed JSON templates."""
+    readings = _reading_stream()
+    encode_ts = _cached_encoder()
+
+    def builder(template: bytes) -> Callable[[], bytes]:
+        def build() -> bytes:
+            volumen, velocidad = next(readings)
+            return template % (volumen, velocidad, encode_ts(now_iso()))
+
+        return build
+
+    return [builder(build_payload_template(s["sensor_id"], s["interseccion"])) for s in sensors]
+
+
+def _inductive_payloads(
+    sensors: Sequence[dict[str, str]], interval_sec: float
+) -> list[Callable[[], bytes]]:
+    """Per-sensor inductive loop payload builders using the precomputed JSON templates."""
+    # intervalo_segundos is an int; the shared --interval is parsed as a float
+    interval_sec = int(interval_sec)
+    counts = _count_stream()
+    encode_inicio = _cached_encoder()
+    encode_fin = _cached_encoder()
+
+    def builder(template: bytes) -> Callable[[], bytes]:
+        def build() -> bytes:
+            ts_inicio, ts_fin = _window_iso(int(time.time()), interval_sec)
+            return template % (next(counts), encode_inicio(ts_inicio), encode_fin(ts_fin))
+
+        return build
+
+    return [
+        builder(build_inductive_template(s["sensor_id"], s["interseccion"], interval_sec))
+        for s in sensors
+    ]
+
+
+def _gps_payloads(sensors: Sequence[dict[str, str]]) -> list[Callable[[], bytes]]:
+    """Per-sensor GPS payload builders using the precomputed JSON templates."""
+    speed_indexes = _speed_index_stream()
+    encode_ts = _cached_encoder()
+
+    def builder(template: bytes) -> Callable[[], bytes]:
+        def build() -> bytes:
+            return template % (_SPEED_FRAGMENTS[next(speed_indexes)], encode_ts(now_iso()))
+
+        return build
+
+    return [builder(build_gps_template(s["sensor_id"], s["interseccion"])) for s in sensors]
+
+
+# ---------------------------------------------------------------------------
+# Sensor coroutines
+# ---------------------------------------------------------------------------
+
+
+async def _publish_loop(
+    publisher: zmq.asyncio.Socket,
+    name: str,
+    topic: bytes,
+    builders: list[Callable[[], bytes]],
+    interval_sec: float,
+) -> None:
+    """
+    Cycle through one sensor type's builders, publishing one event per sensor
+    per interval, paced by absolute event-loop deadlines.
+
+    Args:
+        publisher: The shared PUB socket.
+        name: Sensor type name for logging.
+        topic: Topic frame for this sensor type.
+        builders: One payload builder per sensor.
+        interval_sec: Seconds between full cycles of event generation.
+    """
+    if not builders:
+        return
+    loop = asyncio.get_running_loop()
+    per_sensor_delay = interval_sec / len(builders)
+    deadline = loop.time()
+    published = 0
+    try:
+        while True:
+            for build in builders:
+                # send_multipart keeps the two frames together even if another
+                # coroutine gets scheduled while this send is pending
+                await publisher.send_multipart([topic, build()])
+                published += 1
+                if published % LOG_EVERY_N_EVENTS == 0:
+                    logger.info("[%s] %d events published", name, published)
+                deadline += per_sensor_delay
+                sleep_for = deadline - loop.time()
+                if sleep_for < -interval_sec:
+                    deadline = loop.time()  # Too far behind: resynchronize
+                await asyncio.sleep(max(sleep_for, 0))
+    finally:
+        logger.info("[%s] stopping. Events published: %d", name, published)
+
+
+async def _run_all(
+    cameras: Sequence[dict[str, str]],
+    inductive_loops: Sequence[dict[str, str]],
+    gps_sensors: Sequence[dict[str, str]],
+    camera_interval: float,
+    inductive_interval: float,
+    gps_interval: float,
+    pub_port: int,
+    shared_context: zmq.Context | None = None,
+    bind_addr: str | None = None,
+) -> None:
+    # Sockets of a shadow context live in the shadowed one: the caller's, or a
+    # new_context() owned here. Socket defaults are kept on the Python context
+    # object, so they are copied onto the shadow too
+    base = new_context() if shared_context is None else shared_context
+    context = zmq.asyncio.Context(base)
+    for option, value in base.sockopts.items():
+        context.setsockopt(option, value)
+    publisher = context.socket(zmq.PUB)
+    if bind_addr is None:
+        bind_addr = f"tcp://*:{pub_port}"
+    publisher.bind(bind_addr)
+    logger.info(
+        "All-sensors process started | cameras=%d inductive=%d gps=%d | PUB on %s",
+        len(cameras),
+        len(inductive_loops),
+        len(gps_sensors),
+        bind_addr,
+    )
+
+    # Small delay so subscribers can connect (ZMQ slow-joiner problem)
+    await asyncio.sleep(0.5)
+
+    tasks = [
+        asyncio.create_task(
+            _publish_loop(
+                publisher, "camera", TOPIC_CAMERA_BYTES, _camera_payloads(cameras), camera_interval
+            )
+        ),
+        asyncio.create_task(
+            _publish_loop(
+                publisher,
+                "inductive",
+                TOPIC_INDUCTIVE_BYTES,
+                _inductive_payloads(inductive_loops, inductive_interval),
+                inductive_interval,
+            )
+        ),
+        asyncio.create_task(
+            _publish_loop(
+                publisher, "gps", TOPIC_GPS_BYTES, _gps_payloads(gps_sensors), gps_interval
+            )
+        ),
+    ]
+
+    # Graceful shutdown: signals cancel the sensor coroutines. Windows loops have
+    # no add_signal_handler; there Ctrl+C raises KeyboardInterrupt, which
+    # asyncio.Runner turns into cancelling this coroutine instead
+    loop = asyncio.get_running_loop()
+    with contextlib.suppress(NotImplementedError):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: [t.cancel() for t in tasks])
+
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        logger.info("Shutdown signal received, stopping sensors...")
+    finally:
+        publisher.close()
+        if shared_context is None:
+            base.term()
+
+
+def run_all_sensors(
+    cameras: Sequence[dict[str, str]],
+    inductive_loops: Sequence[dict[str, str]],
+    gps_sensors: Sequence[dict[str, str]],
+    camera_interval: float,
+    inductive_interval: float,
+    gps_interval: float,
+    pub_port: int,
+    context: zmq.Context | None = None,
+    bind_addr: str | None = None,
+) -> None:
+    """
+    Publish events for every sensor type from one process and one PUB socket.
+
+    Args:
+        cameras: Camera sensor dicts ('sensor_id', 'interseccion').
+        inductive_loops: Inductive loop sensor dicts.
+        gps_sensors: GPS sensor dicts.
+        camera_interval: Seconds between camera cycles.
+        inductive_interval: Seconds between inductive loop cycles.
+        gps_interval: Seconds between GPS cycles.
+        pub_port: ZMQ PUB port to bind on.
+        context: Shared ZMQ context (single-process PC1); created if None.
+            It is shadowed by an asyncio context and left open for its owner.
+        bind_addr: Address to bind on instead of tcp://*:{pub_port},
+            e.g. INPROC_SENSOR_ALL when running next to the broker.
+    """
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(
+            _run_all(
+                cameras,
+                inductive_loops,
+                gps_sensors,
+                camera_interval,
+                inductive_interval,
+                gps_interval,
+                pub_port,
+                context,
+                bind_addr,
+            )
+        )
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="All sensor types in one asyncio process")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Event interval in seconds for every type (0 = per-type defaults: "
+        f"{SENSOR_DEFAULT_INTERVAL_SEC}s camera/GPS, {INDUCTIVE_INTERVAL_SEC}s inductive)",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=0,
+        help="Limit to first N sensors of each type (0 = all)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="ZMQ PUB port (default: sensor_all_pub from config)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    config = get_config()
+    count = args.count if args.count > 0 else None
+
+    run_all_sensors(
+        cameras=config.cameras[:count],
+        inductive_loops=config.inductive_loops[:count],
+        gps_sensors=config.gps_sensors[:count],
+        camera_interval=args.interval or SENSOR_DEFAULT_INTERVAL_SEC,
+        inductive_interval=args.interval or INDUCTIVE_INTERVAL_SEC,
+        gps_interval=args.interval or SENSOR_DEFAULT_INTERVAL_SEC,
+        pub_port=args.port or config.get_port("sensor_all_pub"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -21,20 +21,31 @@ import argparse
 import logging
 import random
 import signal
+import threading
 import time
+from collections.abc import Iterator, Sequence
 
 import zmq
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, the random module is the fallback
+    np = None
+
 from common.config_loader import get_config
 from common.constants import (
     CAMERA_SPEED_MAX,
     CAMERA_SPEED_MIN,
     CAMERA_VOLUME_MAX,
     CAMERA_VOLUME_MIN,
+    LOG_EVERY_N_EVENTS,
+    READING_BATCH_SIZE,
     SENSOR_DEFAULT_INTERVAL_SEC,
-    TOPIC_CAMERA,
+    SENSOR_TYPE_CAMERA,
+    TOPIC_CAMERA_BYTES,
 )
-from common.models import CameraEvent
+from common.models import CameraEvent, dumps, now_iso
+from common.zmq_utils import new_context, validate_cpus
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -49,28 +60,64 @@ logger = logging.getLogger("CameraSensor")
 # ---------------------------------------------------------------------------
 # Graceful shutdown
 # ---------------------------------------------------------------------------
-_running = True
+# An Event rather than a flag so the per-event sleep wakes immediately
+_shutdown = threading.Event()
 
 
 def _signal_handler(sig, frame):
-    global _running
     logger.info("Shutdown signal received, stopping sensor...")
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _signal_handler)
 signal.signal(signal.SIGTERM, _signal_handler)
 
 
+def stop() -> None:
+    """Stop the sensor loop (used when running as a thread inside start_pc1)."""
+    _shutdown.set()
+
+
 # ---------------------------------------------------------------------------
 # Sensor logic
 # ---------------------------------------------------------------------------
 
 
+# One generator per process, seeded from os.urandom like the random module's
+# shared one; calling its bound random() skips randint()/uniform() dispatch
+# and argument checks on the per-event fallback paths
+_random = random.Random().random
+
+
+def _random_readings() -> tuple[int, float]:
+    """Random (volumen, velocidad_promedio) pair for one camera reading."""
+    volumen = CAMERA_VOLUME_MIN + int(_random() * (CAMERA_VOLUME_MAX - CAMERA_VOLUME_MIN + 1))
+    velocidad = round(CAMERA_SPEED_MIN + (CAMERA_SPEED_MAX - CAMERA_SPEED_MIN) * _random(), 1)
+    return volumen, velocidad
+
+
+def _reading_stream(batch_size: int = READING_BATCH_SIZE) -> Iterator[tuple[int, float]]:
+    """
+    Endless stream of (volumen, velocidad_promedio) readings.
+
+    With numpy available, readings are drawn a batch at a time (one C call
+    per batch instead of two random-module calls per reading) and converted
+    to plain Python numbers with tolist(). Without numpy it falls back to
+    _random_readings().
+    """
+    if np is None:
+        while True:
+            yield _random_readings()
+    rng = np.random.default_rng()
+    while True:
+        volumes = rng.integers(CAMERA_VOLUME_MIN, CAMERA_VOLUME_MAX, size=batch_size, endpoint=True)
+        speeds = rng.uniform(CAMERA_SPEED_MIN, CAMERA_SPEED_MAX, size=batch_size).round(1)
+        yield from zip(volumes.tolist(), speeds.tolist(), strict=True)
+
+
 def generate_camera_event(sensor_id: str, intersection: str) -> CameraEvent:
     """Generate a random camera event simulating queue length and speed."""
-    volumen = random.randint(CAMERA_VOLUME_MIN, CAMERA_VOLUME_MAX)
-    velocidad = round(random.uniform(CAMERA_SPEED_MIN, CAMERA_SPEED_MAX), 1)
+    volumen, velocidad = _random_readings()
     return CameraEvent(
         sensor_id=sensor_id,
         interseccion=intersection,
@@ -79,10 +126,29 @@ def generate_camera_event(sensor_id: str, intersection: str) -> CameraEvent:
     )
 
 
+def build_payload_template(sensor_id: str, intersection: str) -> bytes:
+    """
+    Build the serialized CameraEvent for one sensor as a bytes %-template.
+
+    sensor_id, tipo_sensor and interseccion never change for a sensor, so
+    they are JSON-encoded once here. Each event only fills in
+    (volumen, velocidad_promedio, timestamp) via template % (int, float, bytes),
+    producing the same JSON as CameraEvent.to_json().
+    """
+    fixed = dumps(
+        {"sensor_id": sensor_id, "tipo_sensor": SENSOR_TYPE_CAMERA, "interseccion": intersection}
+    )
+    prefix = fixed[:-1].encode().replace(b"%", b"%%")
+    return prefix + b',"volumen":%d,"velocidad_promedio":%.1f,"timestamp":"%s"}'
+
+
 def run_camera_sensor(
-    sensors: list[dict[str, str]],
+    sensors: Sequence[dict[str, str]],
     interval_sec: float,
     pub_port: int,
+    context: zmq.Context | None = None,
+    bind_addr: str | None = None,
+    cpus: tuple[int, int] | None = None,
 ) -> None:
     """
     Main loop: generate camera events for one or more sensors and publish
@@ -96,10 +162,19 @@ def run_camera_sensor(
         sensors: List of sensor dicts with 'sensor_id' and 'interseccion'.
         interval_sec: Seconds between full cycles of event generation.
         pub_port: ZMQ PUB port to bind on.
+        context: Shared ZMQ context (single-process PC1); created if None.
+        bind_addr: Address to bind on instead of tcp://*:{pub_port},
+            e.g. an inproc:// endpoint when running next to the broker.
+        cpus: (main_cpu, io_cpu) to pin this thread and the ZMQ IO thread
+            to when the context is created here (see new_context()).
     """
-    context = zmq.Context()
+    # A context passed in by the launcher is shared, so it is not ours to term
+    owns_context = context is None
+    if owns_context:
+        context = new_context(cpus)
     publisher = context.socket(zmq.PUB)
-    bind_addr = f"tcp://*:{pub_port}"
+    if bind_addr is None:
+        bind_addr = f"tcp://*:{pub_port}"
     publisher.bind(bind_addr)
 
     sensor_ids = [s["sensor_id"] for s in sensors]
@@ -116,28 +191,82 @@ def run_camera_sensor(
     # Spread events evenly within each cycle
     per_sensor_delay = interval_sec / max(len(sensors), 1)
 
+    # Per-event lines only at DEBUG; INFO gets a progress line every N events
+    log_debug = logger.isEnabledFor(logging.DEBUG)
+    published = 0
+    behind = 0
+
+    # Two direct send() calls per event (see common.zmq_utils)
+    send = publisher.send
+    stopping = _shutdown.is_set
+    wait = _shutdown.wait
+
+    readings = _reading_stream()
+
+    # now_iso() already returns the same str object for a whole second, so
+    # its UTF-8 encoding is redone only when that object changes
+    last_ts = ""
+    ts_bytes = b""
+
+    # Constant part of each sensor's JSON is serialized once, up front
+    templates = [
+        (
+            s["sensor_id"],
+            s["interseccion"],
+            build_payload_template(s["sensor_id"], s["interseccion"]),
+        )
+        for s in sensors
+    ]
+
+    # Sleep to absolute monotonic deadlines so send/log time does not drift
+    # the cycle; if we fall more than a full cycle behind, resynchronize
+    # instead of bursting to catch up
+    monotonic = time.monotonic
+    deadline = monotonic()
+
     try:
-        while _running:
-            for sensor_def in sensors:
-                if not _running:
+        while not stopping():
+            for sensor_id, intersection, template in templates:
+                if stopping():
                     break
-                event = generate_camera_event(sensor_def["sensor_id"], sensor_def["interseccion"])
-                message = f"{TOPIC_CAMERA} {event.to_json()}"
-                publisher.send_string(message)
-                logger.info(
-                    "[%s @ %s] volumen=%d, velocidad=%.1f km/h",
-                    event.sensor_id,
-                    event.interseccion,
-                    event.volumen,
-                    event.velocidad_promedio,
-                )
-                time.sleep(per_sensor_delay)
+                volumen, velocidad = next(readings)
+                ts = now_iso()
+                if ts is not last_ts:
+                    last_ts = ts
+                    ts_bytes = ts.encode()
+                payload = template % (volumen, velocidad, ts_bytes)
+                send(TOPIC_CAMERA_BYTES, zmq.SNDMORE)
+                send(payload)
+                published += 1
+                if log_debug:
+                    logger.debug(
+                        "[%s @ %s] volumen=%d, velocidad=%.1f km/h",
+                        sensor_id,
+                        intersection,
+                        volumen,
+                        velocidad,
+                    )
+                if published % LOG_EVERY_N_EVENTS == 0:
+                    logger.info("%d events published", published)
+                deadline += per_sensor_delay
+                sleep_for = deadline - monotonic()
+                if sleep_for > 0:
+                    # Bounded slices so Ctrl+C is handled on Windows (see inductive_sensor)
+                    while sleep_for > 0 and not wait(min(sleep_for, 1.0)):
+                        sleep_for = deadline - monotonic()
+                else:
+                    behind += 1
+                    if behind % LOG_EVERY_N_EVENTS == 0:
+                        logger.info("%d sends behind schedule so far", behind)
+                    if sleep_for < -interval_sec:
+                        deadline = monotonic()
     except KeyboardInterrupt:
         logger.info("Camera sensor process interrupted.")
     finally:
-        logger.info("Camera sensor process shutting down.")
+        logger.info("Camera sensor process shutting down. Events published: %d", published)
         publisher.close()
-        context.term()
+        if owns_context:
+            context.term()
 
 
 # ---------------------------------------------------------------------------
@@ -172,7 +301,21 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=None,
         help="ZMQ PUB port (default: from config)",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--pin-cpus",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("MAIN_CPU", "IO_CPU"),
+        help="Pin the publishing thread and the ZMQ IO thread to these CPUs (Linux only)",
+    )
+    args = parser.parse_args(argv)
+    if args.pin_cpus is not None:
+        try:
+            validate_cpus(tuple(args.pin_cpus))
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -194,6 +337,7 @@ def main(argv: list[str] | None = None) -> None:
         sensors=sensors,
         interval_sec=args.interval,
         pub_port=pub_port,
+        cpus=tuple(args.pin_cpus) if args.pin_cpus else None,
     )
 
 
@@ -23,18 +23,29 @@ import argparse
 import logging
 import random
 import signal
+import threading
 import time
+from collections.abc import Iterator, Sequence
 
 import zmq
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, the random module is the fallback
+    np = None
+
 from common.config_loader import get_config
 from common.constants import (
     GPS_SPEED_MAX,
     GPS_SPEED_MIN,
+    LOG_EVERY_N_EVENTS,
+    READING_BATCH_SIZE,
     SENSOR_DEFAULT_INTERVAL_SEC,
-    TOPIC_GPS,
+    SENSOR_TYPE_GPS,
+    TOPIC_GPS_BYTES,
 )
-from common.models import GPSEvent
+from common.models import GPSEvent, dumps, get_congestion_level, now_iso
+from common.zmq_utils import new_context, validate_cpus
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -49,24 +60,70 @@ logger = logging.getLogger("GPSSensor")
 # ---------------------------------------------------------------------------
 # Graceful shutdown
 # ---------------------------------------------------------------------------
-_running = True
+# An Event rather than a flag so the once-per-cycle sleep wakes immediately
+_shutdown = threading.Event()
 
 
 def _signal_handler(sig, frame):
-    global _running
     logger.info("Shutdown signal received, stopping sensor...")
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _signal_handler)
 signal.signal(signal.SIGTERM, _signal_handler)
 
 
+def stop() -> None:
+    """Stop the sensor loop (used when running as a thread inside start_pc1)."""
+    _shutdown.set()
+
+
 # ---------------------------------------------------------------------------
 # Sensor logic
 # ---------------------------------------------------------------------------
 
 
+# Every speed the simulator reports (0.1 km/h steps) with its congestion
+# level, and the same pair pre-serialized as the JSON fragment that goes
+# into the payload; both are indexed by _speed_index_stream(). The whole
+# speed domain is classified once here, so publishing never classifies a
+# speed at all, batched or not
+_SPEED_LEVELS: tuple[tuple[float, str], ...] = tuple(
+    (tenths / 10, get_congestion_level(tenths / 10))
+    for tenths in range(GPS_SPEED_MIN * 10, GPS_SPEED_MAX * 10 + 1)
+)
+_SPEED_FRAGMENTS: tuple[bytes, ...] = tuple(
+    b'"nivel_congestion":"%s","velocidad_promedio":%.1f' % (level.encode(), velocidad)
+    for velocidad, level in _SPEED_LEVELS
+)
+
+
+# Per-process generator, as in camera_sensor
+_random = random.Random().random
+
+
+def _random_speed() -> float:
+    """Random velocidad_promedio for one GPS reading."""
+    return round(GPS_SPEED_MIN + (GPS_SPEED_MAX - GPS_SPEED_MIN) * _random(), 1)
+
+
+def _speed_index_stream(batch_size: int = READING_BATCH_SIZE) -> Iterator[int]:
+    """
+    Endless stream of random indexes into _SPEED_LEVELS / _SPEED_FRAGMENTS.
+
+    With numpy available, indexes are drawn a batch at a time and converted
+    to plain ints with tolist(), as in the camera sensor's _reading_stream().
+    Without numpy it falls back to the module's _random().
+    """
+    n = len(_SPEED_FRAGMENTS)
+    if np is None:
+        while True:
+            yield int(_random() * n)
+    rng = np.random.default_rng()
+    while True:
+        yield from rng.integers(0, n, size=batch_size).tolist()
+
+
 def generate_gps_event(sensor_id: str, intersection: str) -> GPSEvent:
     """
     Generate a random GPS event simulating traffic density.
@@ -74,7 +131,7 @@ def generate_gps_event(sensor_id: str, intersection: str) -> GPSEvent:
     The congestion level is automatically derived from velocidad_promedio
     by the GPSEvent.__post_init__ method.
     """
-    velocidad = round(random.uniform(GPS_SPEED_MIN, GPS_SPEED_MAX), 1)
+    velocidad = _random_speed()
     return GPSEvent(
         sensor_id=sensor_id,
         interseccion=intersection,
@@ -82,10 +139,30 @@ def generate_gps_event(sensor_id: str, intersection: str) -> GPSEvent:
     )
 
 
+def build_payload_template(sensor_id: str, intersection: str) -> bytes:
+    """
+    Build the serialized GPSEvent for one sensor as a bytes %-template.
+
+    sensor_id, tipo_sensor and interseccion never change for a sensor, so
+    they are JSON-encoded once here. Each event only fills in a
+    _SPEED_FRAGMENTS entry (nivel_congestion and velocidad_promedio) and the
+    timestamp via template % (bytes, bytes), producing the same JSON as
+    GPSEvent.to_json().
+    """
+    fixed = dumps(
+        {"sensor_id": sensor_id, "tipo_sensor": SENSOR_TYPE_GPS, "interseccion": intersection}
+    )
+    prefix = fixed[:-1].encode().replace(b"%", b"%%")
+    return prefix + b',%s,"timestamp":"%s"}'
+
+
 def run_gps_sensor(
-    sensors: list[dict[str, str]],
+    sensors: Sequence[dict[str, str]],
     interval_sec: float,
     pub_port: int,
+    context: zmq.Context | None = None,
+    bind_addr: str | None = None,
+    cpus: tuple[int, int] | None = None,
 ) -> None:
     """
     Main loop: generate GPS events for one or more sensors and publish
@@ -95,10 +172,19 @@ def run_gps_sensor(
         sensors: List of sensor dicts with 'sensor_id' and 'interseccion'.
         interval_sec: Seconds between full cycles of event generation.
         pub_port: ZMQ PUB port to bind on.
+        context: Shared ZMQ context (single-process PC1); created if None.
+        bind_addr: Address to bind on instead of tcp://*:{pub_port},
+            e.g. an inproc:// endpoint when running next to the broker.
+        cpus: (main_cpu, io_cpu) to pin this thread and the ZMQ IO thread
+            to when the context is created here (see new_context()).
     """
-    context = zmq.Context()
+    # A context passed in by the launcher is shared, so it is not ours to term
+    owns_context = context is None
+    if owns_context:
+        context = new_context(cpus)
     publisher = context.socket(zmq.PUB)
-    bind_addr = f"tcp://*:{pub_port}"
+    if bind_addr is None:
+        bind_addr = f"tcp://*:{pub_port}"
     publisher.bind(bind_addr)
 
     sensor_ids = [s["sensor_id"] for s in sensors]
@@ -112,31 +198,87 @@ def run_gps_sensor(
     # Small delay so subscribers can connect (ZMQ slow-joiner problem)
     time.sleep(0.5)
 
-    # Spread events evenly within each cycle
-    per_sensor_delay = interval_sec / max(len(sensors), 1)
+    # Per-event lines only at DEBUG; INFO gets a progress line every N events
+    log_debug = logger.isEnabledFor(logging.DEBUG)
+    published = 0
+    behind = 0
+
+    # Two direct send() calls per event (see common.zmq_utils).
+    # Everything the loop touches per event is bound to a local up front, so
+    # it is read with LOAD_FAST instead of a global or attribute lookup
+    send = publisher.send
+    topic = TOPIC_GPS_BYTES
+    sndmore = zmq.SNDMORE
+    log_every = LOG_EVERY_N_EVENTS
+    stopping = _shutdown.is_set
+    wait = _shutdown.wait
+
+    # Payloads are filled straight into per-sensor templates instead of
+    # building a GPSEvent and serializing it: a random speed index picks a
+    # pre-serialized speed/congestion fragment, so no float is rounded,
+    # classified or formatted per event. now_iso() returns the same object
+    # within a second, so its encoding is redone only when it changes
+    next_speed = _speed_index_stream().__next__
+    iso_now = now_iso
+    fragments = _SPEED_FRAGMENTS
+    last_ts = ""
+    ts_bytes = b""
+    templates = [
+        (
+            s["sensor_id"],
+            s["interseccion"],
+            build_payload_template(s["sensor_id"], s["interseccion"]),
+        )
+        for s in sensors
+    ]
+
+    # Each cycle publishes every sensor's event back to back, so libzmq can
+    # coalesce them into a few TCP segments, then sleeps once to an absolute
+    # monotonic deadline; if we fall more than a full cycle behind,
+    # resynchronize instead of bursting to catch up
+    monotonic = time.monotonic
+    deadline = monotonic()
 
     try:
-        while _running:
-            for sensor_def in sensors:
-                if not _running:
-                    break
-                event = generate_gps_event(sensor_def["sensor_id"], sensor_def["interseccion"])
-                message = f"{TOPIC_GPS} {event.to_json()}"
-                publisher.send_string(message)
-                logger.info(
-                    "[%s @ %s] velocidad=%.1f km/h, congestion=%s",
-                    event.sensor_id,
-                    event.interseccion,
-                    event.velocidad_promedio,
-                    event.nivel_congestion,
-                )
-                time.sleep(per_sensor_delay)
+        while not stopping():
+            for sensor_id, intersection, template in templates:
+                speed = next_speed()
+                ts = iso_now()
+                if ts is not last_ts:
+                    last_ts = ts
+                    ts_bytes = ts.encode()
+                send(topic, sndmore)
+                send(template % (fragments[speed], ts_bytes))
+                published += 1
+                if log_debug:
+                    velocidad, nivel = _SPEED_LEVELS[speed]
+                    logger.debug(
+                        "[%s @ %s] velocidad=%.1f km/h, congestion=%s",
+                        sensor_id,
+                        intersection,
+                        velocidad,
+                        nivel,
+                    )
+                if published % log_every == 0:
+                    logger.info("%d events published", published)
+            deadline += interval_sec
+            sleep_for = deadline - monotonic()
+            if sleep_for > 0:
+                # Bounded slices so Ctrl+C is handled on Windows (see inductive_sensor)
+                while sleep_for > 0 and not wait(min(sleep_for, 1.0)):
+                    sleep_for = deadline - monotonic()
+            else:
+                behind += 1
+                logger.info("Cycle overran its interval (%d so far)", behind)
+                if sleep_for < -interval_sec:
+                    deadline = monotonic()
     except KeyboardInterrupt:
         logger.info("GPS sensor process interrupted.")
     finally:
-        logger.info("GPS sensor process shutting down.")
+        logger.info("GPS sensor process shutting down. Events published: %d", published)
         publisher.close()
-        context.term()
+        if owns_context:
+            context.term()
 
 
 # ---------------------------------------------------------------------------
@@ -171,7 +313,21 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=None,
         help="ZMQ PUB port (default: from config)",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--pin-cpus",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("MAIN_CPU", "IO_CPU"),
+        help="Pin the publishing thread and the ZMQ IO thread to these CPUs (Linux only)",
+    )
+    args = parser.parse_args(argv)
+    if args.pin_cpus is not None:
+        try:
+            validate_cpus(tuple(args.pin_cpus))
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -193,6 +349,7 @@ def main(argv: list[str] | None = None) -> None:
         sensors=sensors,
         interval_sec=args.interval,
         pub_port=pub_port,
+        cpus=tuple(args.pin_cpus) if args.pin_cpus else None,
     )
 
 
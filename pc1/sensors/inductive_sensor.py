@@ -20,19 +20,29 @@ import argparse
 import logging
 import random
 import signal
+import threading
 import time
-from datetime import UTC, datetime, timedelta
+from collections.abc import Iterator, Sequence
 
 import zmq
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, the random module is the fallback
+    np = None
+
 from common.config_loader import get_config
 from common.constants import (
     INDUCTIVE_COUNT_MAX,
     INDUCTIVE_COUNT_MIN,
     INDUCTIVE_INTERVAL_SEC,
-    TOPIC_INDUCTIVE,
+    LOG_EVERY_N_EVENTS,
+    READING_BATCH_SIZE,
+    SENSOR_TYPE_INDUCTIVE,
+    TOPIC_INDUCTIVE_BYTES,
 )
-from common.models import InductiveEvent
+from common.models import InductiveEvent, dumps, iso_from_epoch
+from common.zmq_utils import new_context, validate_cpus
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -47,33 +57,83 @@ logger = logging.getLogger("InductiveSensor")
 # ---------------------------------------------------------------------------
 # Graceful shutdown
 # ---------------------------------------------------------------------------
-_running = True
+# An Event rather than a flag so the once-per-cycle sleep wakes immediately
+_shutdown = threading.Event()
 
 
 def _signal_handler(sig, frame):
-    global _running
     logger.info("Shutdown signal received, stopping sensor...")
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _signal_handler)
 signal.signal(signal.SIGTERM, _signal_handler)
 
 
+def stop() -> None:
+    """Stop the sensor loop (used when running as a thread inside start_pc1)."""
+    _shutdown.set()
+
+
 # ---------------------------------------------------------------------------
 # Sensor logic
 # ---------------------------------------------------------------------------
 
 
+# Per-process generator, as in camera_sensor
+_random = random.Random().random
+
+
+def _random_count() -> int:
+    """Random vehiculos_contados for one inductive loop reading."""
+    return INDUCTIVE_COUNT_MIN + int(_random() * (INDUCTIVE_COUNT_MAX - INDUCTIVE_COUNT_MIN + 1))
+
+
+def _count_stream(batch_size: int = READING_BATCH_SIZE) -> Iterator[int]:
+    """
+    Endless stream of vehiculos_contados readings.
+
+    With numpy available, counts are drawn a batch at a time and converted
+    to plain ints with tolist(), as in the camera sensor's _reading_stream().
+    Without numpy it falls back to _random_count().
+    """
+    if np is None:
+        while True:
+            yield _random_count()
+    rng = np.random.default_rng()
+    while True:
+        yield from rng.integers(
+            INDUCTIVE_COUNT_MIN, INDUCTIVE_COUNT_MAX, size=batch_size, endpoint=True
+        ).tolist()
+
+
+# (end second, interval, ts_inicio, ts_fin) of the last measurement window.
+# Replaced as a whole tuple so concurrent readers never see a mismatched set.
+_window_cache: tuple[int, int, str, str] = (-1, 0, "", "")
+
+
+def _window_iso(fin: int, interval_sec: int) -> tuple[str, str]:
+    """
+    ISO 8601 (start, end) of the interval_sec window ending at epoch second fin.
+
+    Every loop in a cycle reports the same window, so both strings are
+    formatted once per second and reused for the remaining events.
+    """
+    global _window_cache
+    cached_fin, cached_interval, ts_inicio, ts_fin = _window_cache
+    if fin != cached_fin or interval_sec != cached_interval:
+        ts_inicio = iso_from_epoch(fin - interval_sec)
+        ts_fin = iso_from_epoch(fin)
+        _window_cache = (fin, interval_sec, ts_inicio, ts_fin)
+    return ts_inicio, ts_fin
+
+
 def generate_inductive_event(
     sensor_id: str, intersection: str, interval_sec: int
 ) -> InductiveEvent:
     """Generate a random inductive loop event simulating vehicle count."""
-    vehiculos = random.randint(INDUCTIVE_COUNT_MIN, INDUCTIVE_COUNT_MAX)
-    fin_dt = datetime.now(UTC)
-    inicio_dt = fin_dt - timedelta(seconds=interval_sec)
-    ts_inicio = inicio_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-    ts_fin = fin_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    vehiculos = _random_count()
+    ts_inicio, ts_fin = _window_iso(int(time.time()), interval_sec)
 
     return InductiveEvent(
         sensor_id=sensor_id,
@@ -85,10 +145,40 @@ def generate_inductive_event(
     )
 
 
+def build_payload_template(sensor_id: str, intersection: str, interval_sec: int) -> bytes:
+    """
+    Build the serialized InductiveEvent for one sensor as a bytes %-template.
+
+    sensor_id, tipo_sensor, interseccion and intervalo_segundos never change
+    for a sensor, so they are JSON-encoded once here. Each event only fills
+    in (vehiculos_contados, timestamp_inicio, timestamp_fin) via
+    template % (int, bytes, bytes), producing the same JSON as
+    InductiveEvent.to_json().
+    """
+    fixed = dumps(
+        {
+            "sensor_id": sensor_id,
+            "tipo_sensor": SENSOR_TYPE_INDUCTIVE,
+            "interseccion": intersection,
+        }
+    )
+    prefix = fixed[:-1].encode().replace(b"%", b"%%")
+    interval = dumps(interval_sec).encode()
+    return (
+        prefix
+        + b',"vehiculos_contados":%d,"intervalo_segundos":'
+        + interval
+        + b',"timestamp_inicio":"%s","timestamp_fin":"%s"}'
+    )
+
+
 def run_inductive_sensor(
-    sensors: list[dict[str, str]],
+    sensors: Sequence[dict[str, str]],
     interval_sec: int,
     pub_port: int,
+    context: zmq.Context | None = None,
+    bind_addr: str | None = None,
+    cpus: tuple[int, int] | None = None,
 ) -> None:
     """
     Main loop: generate inductive loop events for one or more sensors
@@ -98,10 +188,19 @@ def run_inductive_sensor(
         sensors: List of sensor dicts with 'sensor_id' and 'interseccion'.
         interval_sec: Measurement interval in seconds (default 30).
         pub_port: ZMQ PUB port to bind on.
+        context: Shared ZMQ context (single-process PC1); created if None.
+        bind_addr: Address to bind on instead of tcp://*:{pub_port},
+            e.g. an inproc:// endpoint when running next to the broker.
+        cpus: (main_cpu, io_cpu) to pin this thread and the ZMQ IO thread
+            to when the context is created here (see new_context()).
     """
-    context = zmq.Context()
+    # A context passed in by the launcher is shared, so it is not ours to term
+    owns_context = context is None
+    if owns_context:
+        context = new_context(cpus)
     publisher = context.socket(zmq.PUB)
-    bind_addr = f"tcp://*:{pub_port}"
+    if bind_addr is None:
+        bind_addr = f"tcp://*:{pub_port}"
     publisher.bind(bind_addr)
 
     sensor_ids = [s["sensor_id"] for s in sensors]
@@ -115,35 +214,87 @@ def run_inductive_sensor(
     # Small delay so subscribers can connect (ZMQ slow-joiner problem)
     time.sleep(0.5)
 
-    # Spread events evenly within each cycle
-    per_sensor_delay = interval_sec / max(len(sensors), 1)
+    # Per-event lines only at DEBUG; INFO gets a progress line every N events
+    log_debug = logger.isEnabledFor(logging.DEBUG)
+    published = 0
+    behind = 0
+
+    # Two direct send() calls per event (see common.zmq_utils).
+    # Everything the loop touches per event is bound to a local up front, so
+    # it is read with LOAD_FAST instead of a global or attribute lookup
+    send = publisher.send
+    topic = TOPIC_INDUCTIVE_BYTES
+    sndmore = zmq.SNDMORE
+    log_every = LOG_EVERY_N_EVENTS
+    stopping = _shutdown.is_set
+    wait = _shutdown.wait
+
+    # Payloads are filled straight into per-sensor templates instead of
+    # building an InductiveEvent and serializing it. A cycle is published
+    # back to back, so every loop in it reports the same measurement window:
+    # it is looked up once per cycle and re-encoded only when _window_iso()
+    # hands back a new pair
+    next_count = _count_stream().__next__
+    now = time.time
+    last_fin = ""
+    inicio_bytes = fin_bytes = b""
+    templates = [
+        (
+            s["sensor_id"],
+            s["interseccion"],
+            build_payload_template(s["sensor_id"], s["interseccion"], interval_sec),
+        )
+        for s in sensors
+    ]
+
+    # Each cycle publishes every sensor's event back to back, so libzmq can
+    # coalesce them into a few TCP segments, then sleeps once to an absolute
+    # monotonic deadline; if we fall more than a full cycle behind,
+    # resynchronize instead of bursting to catch up
+    monotonic = time.monotonic
+    deadline = monotonic()
 
     try:
-        while _running:
-            for sensor_def in sensors:
-                if not _running:
-                    break
-                event = generate_inductive_event(
-                    sensor_def["sensor_id"],
-                    sensor_def["interseccion"],
-                    interval_sec,
-                )
-                message = f"{TOPIC_INDUCTIVE} {event.to_json()}"
-                publisher.send_string(message)
-                logger.info(
-                    "[%s @ %s] vehiculos_contados=%d, intervalo=%ds",
-                    event.sensor_id,
-                    event.interseccion,
-                    event.vehiculos_contados,
-                    event.intervalo_segundos,
-                )
-                time.sleep(per_sensor_delay)
+        while not stopping():
+            ts_inicio, ts_fin = _window_iso(int(now()), interval_sec)
+            if ts_fin is not last_fin:
+                last_fin = ts_fin
+                inicio_bytes = ts_inicio.encode()
+                fin_bytes = ts_fin.encode()
+            for sensor_id, intersection, template in templates:
+                vehiculos = next_count()
+                send(topic, sndmore)
+                send(template % (vehiculos, inicio_bytes, fin_bytes))
+                published += 1
+                if log_debug:
+                    logger.debug(
+                        "[%s @ %s] vehiculos_contados=%d, intervalo=%ds",
+                        sensor_id,
+                        intersection,
+                        vehiculos,
+                        interval_sec,
+                    )
+                if published % log_every == 0:
+                    logger.info("%d events published", published)
+            deadline += interval_sec
+            sleep_for = deadline - monotonic()
+            if sleep_for > 0:
+                # Wait in slices of at most 1s: on Windows a lock wait cannot be
+                # interrupted, so Ctrl+C would otherwise sit out the whole cycle
+                while sleep_for > 0 and not wait(min(sleep_for, 1.0)):
+                    sleep_for = deadline - monotonic()
+            else:
+                behind += 1
+                logger.info("Cycle overran its interval (%d so far)", behind)
+                if sleep_for < -interval_sec:
+                    deadline = monotonic()
     except KeyboardInterrupt:
         logger.info("Inductive sensor process interrupted.")
     finally:
-        logger.info("Inductive sensor process shutting down.")
+        logger.info("Inductive sensor process shutting down. Events published: %d", published)
         publisher.close()
-        context.term()
+        if owns_context:
+            context.term()
 
 
 # ---------------------------------------------------------------------------
@@ -178,7 +329,21 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=None,
         help="ZMQ PUB port (default: from config)",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--pin-cpus",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("MAIN_CPU", "IO_CPU"),
+        help="Pin the publishing thread and the ZMQ IO thread to these CPUs (Linux only)",
+    )
+    args = parser.parse_args(argv)
+    if args.pin_cpus is not None:
+        try:
+            validate_cpus(tuple(args.pin_cpus))
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -200,6 +365,7 @@ def main(argv: list[str] | None = None) -> None:
         sensors=sensors,
         interval_sec=args.interval,
         pub_port=pub_port,
+        cpus=tuple(args.pin_cpus) if args.pin_cpus else None,
     )
 
 
@@ -2,7 +2,7 @@
 start_pc1.py - Entrypoint for PC1 (Sensors + Broker).
 
 Launches all PC1 processes as subprocesses:
-  1. Broker (standard or threaded mode)
+  1. Broker (standard, threaded or proxy mode)
   2. Camera sensor process (all cameras from config)
   3. Inductive loop sensor process (all inductive loops from config)
   4. GPS sensor process (all GPS sensors from config)
@@ -10,21 +10,41 @@ Launches all PC1 processes as subprocesses:
 The broker starts first and waits briefly before sensors start publishing,
 to ensure ZMQ connections are established.
 
+With --inproc, the broker and sensors instead run as threads of this
+process sharing one ZMQ context, and sensor -> broker traffic uses
+inproc:// endpoints rather than TCP loopback.
+
+With --async-sensors, the three per-type sensor processes are replaced by a
+single asyncio process (pc1.sensors.all_sensors_async) publishing every
+topic from one PUB socket, and the broker reads it over one connection.
+Combined with --inproc, those sensor coroutines run on this process's main
+thread instead, next to the broker thread, over one inproc endpoint.
+
 Usage:
-    python pc1/start_pc1.py [--broker-mode standard|threaded] [--interval 10]
+    python pc1/start_pc1.py [--broker-mode standard|threaded|proxy] [--interval 10]
+                            [--inproc] [--async-sensors]
 
 Environment variables:
-    BROKER_MODE: "standard" or "threaded" (default: standard)
+    BROKER_MODE: "standard", "threaded" or "proxy" (default: standard)
     SENSOR_INTERVAL: sensor event interval in seconds (default: from config)
+    PC1_INPROC: "1" to run in single-process inproc mode (default: off)
+    PC1_ASYNC_SENSORS: "1" to run all sensors in one asyncio process (default: off)
 """
 
 import argparse
+import contextlib
 import logging
 import os
+import re
 import signal
 import subprocess
 import sys
+import threading
 import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import zmq
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -50,10 +70,11 @@ def _shutdown(signum=None, frame=None):
             logger.info("Terminating PID %d (%s)", proc.pid, proc.args)
             proc.terminate()
 
-    # Wait for graceful shutdown, then force-kill
+    # Wait for graceful shutdown (one shared deadline), then force-kill
+    deadline = time.monotonic() + 5
     for proc in _processes:
         try:
-            proc.wait(timeout=5)
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
         except subprocess.TimeoutExpired:
             logger.warning("Force-killing PID %d", proc.pid)
             proc.kill()
@@ -65,15 +86,59 @@ def _shutdown(signum=None, frame=None):
 signal.signal(signal.SIGINT, _shutdown)
 signal.signal(signal.SIGTERM, _shutdown)
 
+# Without os.waitid (e.g. macOS before Python 3.13) a SIGCHLD handler wakes
+# the monitor instead; only platforms lacking both fall back to polling
+_child_exited = threading.Event()
+
+
+def _on_sigchld(signum=None, frame=None):
+    _child_exited.set()
+
+
+if not hasattr(os, "waitid") and hasattr(signal, "SIGCHLD"):
+    signal.signal(signal.SIGCHLD, _on_sigchld)
+
+
+def _wait_for_child_exit() -> None:
+    """
+    Block until any child process exits, without reaping it.
+
+    WNOWAIT leaves the child waitable so Popen.poll() still collects its
+    return code. Without os.waitid it waits for SIGCHLD, and where that is
+    missing too, for a 2s poll interval.
+    """
+    if not hasattr(os, "waitid"):
+        if hasattr(signal, "SIGCHLD"):
+            _child_exited.wait()
+            # Cleared before the caller polls, so a later exit wakes us again
+            _child_exited.clear()
+        else:
+            time.sleep(2)
+        return
+    # ChildProcessError: every child has already been reaped
+    with contextlib.suppress(ChildProcessError):
+        os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOWAIT)
+
+
+# Where child output goes: inherited from the launcher (default), discarded
+# (--quiet) or one append-only file per child under --log-dir; set by main()
+_log_dir: str | None = None
+_quiet = False
+
 
 def _launch(cmd: list[str], name: str) -> subprocess.Popen:
     """Launch a subprocess and register it for cleanup."""
     logger.info("Starting %s: %s", name, " ".join(cmd))
-    proc = subprocess.Popen(
-        cmd,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-    )
+    if _quiet:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    elif _log_dir is not None:
+        slug = re.sub(r"\W+", "_", name.lower()).strip("_")
+        # The child keeps its own copy of the descriptor once launched
+        with open(os.path.join(_log_dir, f"{slug}.log"), "ab", buffering=0) as log_file:
+            proc = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT)
+    else:
+        # Inherit the launcher's stdout/stderr descriptors
+        proc = subprocess.Popen(cmd)
     _processes.append(proc)
     logger.info("%s started (PID %d)", name, proc.pid)
     return proc
@@ -88,7 +153,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="PC1 Launcher: Sensors + Broker")
     parser.add_argument(
         "--broker-mode",
-        choices=["standard", "threaded"],
+        choices=["standard", "threaded", "proxy"],
         default=os.environ.get("BROKER_MODE", "standard"),
         help="Broker mode (default: standard, env: BROKER_MODE)",
     )
@@ -104,12 +169,206 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=int(os.environ.get("SENSOR_COUNT", "0")),
         help="Number of sensors per type (0 = all from config, env: SENSOR_COUNT)",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--inproc",
+        action="store_true",
+        default=os.environ.get("PC1_INPROC", "") == "1",
+        help="Run broker and sensors in one process over inproc:// (env: PC1_INPROC=1)",
+    )
+    parser.add_argument(
+        "--async-sensors",
+        action="store_true",
+        default=os.environ.get("PC1_ASYNC_SENSORS", "") == "1",
+        help="Run all sensor types in one asyncio process on one PUB socket "
+        "(env: PC1_ASYNC_SENSORS=1)",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--quiet",
+        action="store_true",
+        default=os.environ.get("PC1_QUIET", "") == "1",
+        help="Discard child process output (env: PC1_QUIET=1)",
+    )
+    output.add_argument(
+        "--log-dir",
+        default=os.environ.get("PC1_LOG_DIR") or None,
+        help="Write each child's output to <log-dir>/<name>.log (env: PC1_LOG_DIR)",
+    )
+    args = parser.parse_args(argv)
+    if args.inproc and args.broker_mode == "threaded":
+        parser.error("--inproc supports the standard and proxy broker modes only")
+    return args
+
+
+# ---------------------------------------------------------------------------
+# Single-process mode (inproc transport)
+# ---------------------------------------------------------------------------
+
+
+def run_inproc(args: argparse.Namespace) -> None:
+    """
+    Run the broker and every sensor type as threads sharing one ZMQ context.
+
+    Sensors bind on inproc:// endpoints and the broker connects to them, so
+    events never touch the kernel TCP stack. Sensors are started first so
+    their endpoints are bound before the broker connects.
+    """
+    if args.async_sensors:
+        run_inproc_async(args)
+        return
+
+    # Imported here so the subprocess launcher does not pull in (and install
+    # signal handlers from) modules it never runs in-process
+    from common.config_loader import get_config
+    from common.constants import (
+        INPROC_SENSOR_CAMERA,
+        INPROC_SENSOR_GPS,
+        INPROC_SENSOR_INDUCTIVE,
+    )
+    from common.zmq_utils import new_context
+    from pc1 import broker
+    from pc1.sensors import camera_sensor, gps_sensor, inductive_sensor
+
+    config = get_config()
+    context = new_context()
+
+    count = args.sensor_count if args.sensor_count > 0 else None
+
+    sensor_specs = [
+        (camera_sensor, camera_sensor.run_camera_sensor, config.cameras, INPROC_SENSOR_CAMERA),
+        (
+            inductive_sensor,
+            inductive_sensor.run_inductive_sensor,
+            config.inductive_loops,
+            INPROC_SENSOR_INDUCTIVE,
+        ),
+        (gps_sensor, gps_sensor.run_gps_sensor, config.gps_sensors, INPROC_SENSOR_GPS),
+    ]
+
+    threads = []
+    for module, run, sensors, bind_addr in sensor_specs:
+        # Default interval comes from each sensor's own CLI (it differs per type)
+        interval = args.interval if args.interval > 0 else module.parse_args([]).interval
+        if module is inductive_sensor:
+            # intervalo_segundos is an int, as the sensor's own --interval parses it
+            interval = int(interval)
+        thread = threading.Thread(
+            target=run,
+            kwargs={
+                "sensors": sensors[:count],
+                "interval_sec": interval,
+                "pub_port": 0,
+                "context": context,
+                "bind_addr": bind_addr,
+            },
+            name=module.__name__.rsplit(".", 1)[-1],
+        )
+        thread.start()
+        threads.append(thread)
+
+    broker_thread = _start_broker_thread(args, context, unified=False)
+    threads.append(broker_thread)
+
+    modules = (broker, camera_sensor, inductive_sensor, gps_sensor)
+
+    def _stop_all(signum=None, frame=None):
+        logger.info("Shutting down in-process PC1 components...")
+        for module in modules:
+            module.stop()
+
+    # The imported modules installed their own handlers; route signals here
+    signal.signal(signal.SIGINT, _stop_all)
+    signal.signal(signal.SIGTERM, _stop_all)
+
+    logger.info("All PC1 components running in-process (%d threads).", len(threads))
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=1.0)
+    except KeyboardInterrupt:
+        _stop_all()
+        for t in threads:
+            t.join()
+    finally:
+        context.term()
+        logger.info("All PC1 components stopped.")
+
+
+def run_inproc_async(args: argparse.Namespace) -> None:
+    """
+    Run every sensor type as coroutines of one asyncio loop next to the broker.
+
+    The event loop runs on the main thread and publishes all topics from one
+    PUB socket bound on INPROC_SENSOR_ALL; the broker thread reads it over a
+    single inproc connection. Both share one ZMQ context (the asyncio side
+    shadows it). Signals cancel the sensor coroutines, then stop the broker.
+    """
+    from common.config_loader import get_config
+    from common.constants import (
+        INDUCTIVE_INTERVAL_SEC,
+        INPROC_SENSOR_ALL,
+        SENSOR_DEFAULT_INTERVAL_SEC,
+    )
+    from common.zmq_utils import new_context
+    from pc1 import broker
+    from pc1.sensors import all_sensors_async
+
+    config = get_config()
+    context = new_context()
+
+    count = args.sensor_count if args.sensor_count > 0 else None
+
+    # inproc allows connect-before-bind, so the broker can start first
+    broker_thread = _start_broker_thread(args, context, unified=True)
+
+    logger.info("All PC1 components running in-process (asyncio sensors + broker thread).")
+    try:
+        all_sensors_async.run_all_sensors(
+            cameras=config.cameras[:count],
+            inductive_loops=config.inductive_loops[:count],
+            gps_sensors=config.gps_sensors[:count],
+            camera_interval=args.interval or SENSOR_DEFAULT_INTERVAL_SEC,
+            inductive_interval=args.interval or INDUCTIVE_INTERVAL_SEC,
+            gps_interval=args.interval or SENSOR_DEFAULT_INTERVAL_SEC,
+            pub_port=0,
+            context=context,
+            bind_addr=INPROC_SENSOR_ALL,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.stop()
+        broker_thread.join()
+        context.term()
+        logger.info("All PC1 components stopped.")
+
+
+def _start_broker_thread(
+    args: argparse.Namespace, context: "zmq.Context", unified: bool
+) -> threading.Thread:
+    """Start the standard or proxy broker on a thread, reading sensors over inproc."""
+    from pc1 import broker
+
+    run_broker = (
+        broker.run_broker_proxy if args.broker_mode == "proxy" else broker.run_broker_standard
+    )
+    broker_thread = threading.Thread(
+        target=run_broker,
+        kwargs={"context": context, "inproc": True, "unified": unified},
+        name="broker",
+    )
+    broker_thread.start()
+    return broker_thread
 
 
 def main(argv: list[str] | None = None) -> None:
+    global _log_dir, _quiet
     args = parse_args(argv)
     python = sys.executable
+    _quiet = args.quiet
+    if args.log_dir and not _quiet:
+        os.makedirs(args.log_dir, exist_ok=True)
+        _log_dir = args.log_dir
 
     logger.info("=" * 60)
     logger.info("PC1 LAUNCHER - Sensors & Broker")
@@ -120,8 +379,14 @@ def main(argv: list[str] | None = None) -> None:
     )
     logger.info("=" * 60)
 
+    if args.inproc:
+        run_inproc(args)
+        return
+
     # 1. Start broker first
     broker_cmd = [python, "-m", "pc1.broker", "--mode", args.broker_mode]
+    if args.async_sensors:
+        broker_cmd.append("--unified-sensors")
     _launch(broker_cmd, "Broker")
 
     # Give broker time to bind its sockets
@@ -136,34 +401,55 @@ def main(argv: list[str] | None = None) -> None:
     if args.sensor_count > 0:
         count_args = ["--count", str(args.sensor_count)]
 
-    # Camera sensors
-    camera_cmd = [python, "-m", "pc1.sensors.camera_sensor", "--all", *interval_args, *count_args]
-    _launch(camera_cmd, "Camera Sensors")
-
-    # Inductive loop sensors
-    inductive_cmd = [
-        python,
-        "-m",
-        "pc1.sensors.inductive_sensor",
-        "--all",
-        *interval_args,
-        *count_args,
-    ]
-    _launch(inductive_cmd, "Inductive Sensors")
-
-    # GPS sensors
-    gps_cmd = [python, "-m", "pc1.sensors.gps_sensor", "--all", *interval_args, *count_args]
-    _launch(gps_cmd, "GPS Sensors")
+    if args.async_sensors:
+        # One asyncio process, one PUB socket for every sensor type
+        sensors_cmd = [
+            python,
+            "-m",
+            "pc1.sensors.all_sensors_async",
+            *interval_args,
+            *count_args,
+        ]
+        _launch(sensors_cmd, "All Sensors (asyncio)")
+    else:
+        # Camera sensors
+        camera_cmd = [
+            python,
+            "-m",
+            "pc1.sensors.camera_sensor",
+            "--all",
+            *interval_args,
+            *count_args,
+        ]
+        _launch(camera_cmd, "Camera Sensors")
+
+        # Inductive loop sensors
+        inductive_cmd = [
+            python,
+            "-m",
+            "pc1.sensors.inductive_sensor",
+            "--all",
+            *interval_args,
+            *count_args,
+        ]
+        _launch(inductive_cmd, "Inductive Sensors")
+
+        # GPS sensors
+        gps_cmd = [python, "-m", "pc1.sensors.gps_sensor", "--all", *interval_args, *count_args]
+        _launch(gps_cmd, "GPS Sensors")
 
     logger.info("All PC1 processes launched (%d total).", len(_processes))
 
     # 3. Monitor processes - restart crashed ones or exit if all die
+    exited: set[int] = set()
     try:
         while True:
-            time.sleep(2)
+            # Wakes as soon as a child exits instead of polling on a timer
+            _wait_for_child_exit()
             for proc in _processes:
                 retcode = proc.poll()
-                if retcode is not None:
+                if retcode is not None and proc.pid not in exited:
+                    exited.add(proc.pid)
                     logger.warning(
                         "Process PID %d (%s) exited with code %d",
                         proc.pid,
@@ -171,7 +457,7 @@ def main(argv: list[str] | None = None) -> None:
                         retcode,
                     )
             # Check if all processes have died
-            if all(p.poll() is not None for p in _processes):
+            if len(exited) == len(_processes):
                 logger.error("All PC1 processes have exited. Shutting down.")
                 break
     except KeyboardInterrupt:
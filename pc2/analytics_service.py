@@ -24,9 +24,9 @@ Usage:
     python -m pc2.analytics_service
 """
 
-import json
 import logging
 import signal
+import sys
 import threading
 from collections.abc import Callable
 
@@ -45,6 +45,7 @@ from common.constants import (
     DECISION_GREEN_WAVE,
     DECISION_NO_ACTION,
     HEALTH_CHECK_RESPONSE,
+    LOG_EVERY_N_EVENTS,
     SEMAPHORE_GREEN,
     SEMAPHORE_RED,
     SENSOR_TYPE_CAMERA,
@@ -64,8 +65,10 @@ from common.models import (
     MonitoringQuery,
     MonitoringResponse,
     SemaphoreCommand,
+    dumpb,
     from_json,
     now_iso,
+    to_json_bytes,
 )
 from pc2.health_checker import FailoverState, HealthChecker
 
@@ -217,7 +220,7 @@ def evaluate_traffic_rules(
 # ---------------------------------------------------------------------------
 
 
-def make_sensor_event_envelope(event_data: dict, topic: str) -> str:
+def make_sensor_event_envelope(event_data: dict, topic: str) -> bytes:
     """Create a DB write envelope for a sensor event."""
     # Determine tipo_sensor from topic
     tipo_sensor_map = {
@@ -240,7 +243,7 @@ def make_sensor_event_envelope(event_data: dict, topic: str) -> str:
             "timestamp": timestamp,
         },
     }
-    return json.dumps(envelope, ensure_ascii=False)
+    return dumpb(envelope)
 
 
 def make_congestion_envelope(
@@ -248,7 +251,7 @@ def make_congestion_envelope(
     traffic_state: str,
     decision: str,
     sensor_snapshot: dict,
-) -> str:
+) -> bytes:
     """Create a DB write envelope for a congestion record."""
     details_parts = []
     if "Q" in sensor_snapshot:
@@ -269,7 +272,7 @@ def make_congestion_envelope(
             "timestamp": now_iso(),
         },
     }
-    return json.dumps(envelope, ensure_ascii=False)
+    return dumpb(envelope)
 
 
 def make_semaphore_state_envelope(
@@ -278,7 +281,7 @@ def make_semaphore_state_envelope(
     state_ew: str,
     reason: str,
     cycle_duration_sec: int,
-) -> str:
+) -> bytes:
     """Create a DB write envelope for a semaphore state change."""
     envelope = {
         "type": "semaphore_state",
@@ -291,7 +294,7 @@ def make_semaphore_state_envelope(
             "timestamp": now_iso(),
         },
     }
-    return json.dumps(envelope, ensure_ascii=False)
+    return dumpb(envelope)
 
 
 def make_priority_action_envelope(
@@ -299,7 +302,7 @@ def make_priority_action_envelope(
     target: str,
     reason: str,
     affected_intersections: list[str],
-) -> str:
+) -> bytes:
     """Create a DB write envelope for a priority action."""
     envelope = {
         "type": "priority_action",
@@ -312,7 +315,7 @@ def make_priority_action_envelope(
             "timestamp": now_iso(),
         },
     }
-    return json.dumps(envelope, ensure_ascii=False)
+    return dumpb(envelope)
 
 
 # ---------------------------------------------------------------------------
@@ -326,7 +329,7 @@ def handle_monitoring_query(
     local_db: TrafficDB,
     config,
     semaphore_push: zmq.Socket,
-    send_to_primary: Callable[[str], None] | None,
+    send_to_primary: Callable[[bytes], None] | None,
     db_replica_push: zmq.Socket,
     failover_state: FailoverState | None = None,
 ) -> MonitoringResponse:
@@ -442,7 +445,7 @@ def _handle_force_green_wave(
     intersection_data: dict[str, dict],
     config,
     semaphore_push: zmq.Socket,
-    send_to_primary: Callable[[str], None] | None,
+    send_to_primary: Callable[[bytes], None] | None,
     db_replica_push: zmq.Socket,
     failover_state: FailoverState | None = None,
 ) -> MonitoringResponse:
@@ -485,7 +488,7 @@ def _handle_force_green_wave(
             reason=reason,
             duration_override_sec=green_wave_duration,
         )
-        semaphore_push.send_string(cmd.to_json())
+        semaphore_push.send(to_json_bytes(cmd))
 
         # Update in-memory state
         if intersection in intersection_data:
@@ -522,7 +525,7 @@ def _handle_force_semaphore(
     query: MonitoringQuery,
     config,
     semaphore_push: zmq.Socket,
-    send_to_primary: Callable[[str], None] | None,
+    send_to_primary: Callable[[bytes], None] | None,
     db_replica_push: zmq.Socket,
     failover_state: FailoverState | None = None,
 ) -> MonitoringResponse:
@@ -543,7 +546,7 @@ def _handle_force_semaphore(
         new_state=new_state,
         reason=reason,
     )
-    semaphore_push.send_string(cmd.to_json())
+    semaphore_push.send(to_json_bytes(cmd))
 
     # Determine resulting state for DB record
     result_ns = SEMAPHORE_GREEN if new_state == SEMAPHORE_GREEN else SEMAPHORE_RED
@@ -608,9 +611,9 @@ def _handle_system_status(
 
 
 def push_to_dbs(
-    send_to_primary: Callable[[str], None] | None,
+    send_to_primary: Callable[[bytes], None] | None,
     db_replica_push: zmq.Socket,
-    envelope_json: str,
+    envelope_json: bytes,
     failover_state: FailoverState | None = None,
 ) -> None:
     """
@@ -627,7 +630,7 @@ def push_to_dbs(
     """
     if send_to_primary is not None and (failover_state is None or failover_state.is_pc3_alive()):
         send_to_primary(envelope_json)
-    db_replica_push.send_string(envelope_json)
+    db_replica_push.send(envelope_json)
 
 
 # ---------------------------------------------------------------------------
@@ -699,7 +702,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
         with _primary_push_lock:
             return _db_primary_push[0]
 
-    def _send_to_primary(envelope_json: str) -> None:
+    def _send_to_primary(envelope_json: bytes) -> None:
         """Thread-safe send to primary DB PUSH socket.
 
         Holds the lock for the entire send so the socket can't be closed
@@ -709,7 +712,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
             sock = _db_primary_push[0]
             if sock is not None:
                 try:
-                    sock.send_string(envelope_json, zmq.NOBLOCK)
+                    sock.send(envelope_json, zmq.NOBLOCK)
                 except zmq.Again:
                     logger.warning("[PUSH] Primary DB send dropped (HWM full)")
                 except zmq.ZMQError as e:
@@ -766,8 +769,11 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
 
     logger.info("Analytics service started. Waiting for events...")
 
+    topics_by_frame = {topic.encode(): topic for topic in ALL_SENSOR_TOPICS}
     event_count = 0
     decision_count = 0
+    # Per-event decision lines only at DEBUG; INFO gets a progress line every N events
+    log_debug = logger.isEnabledFor(logging.DEBUG)
 
     try:
         while _running:
@@ -775,11 +781,17 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
 
             # --- Handle sensor events ---
             if sensor_sub in socks and socks[sensor_sub] == zmq.POLLIN:
-                message = sensor_sub.recv_string()
+                frames = sensor_sub.recv_multipart()
                 try:
-                    topic, payload = message.split(" ", 1)
+                    topic_frame, payload = frames
+                    # Map the topic frame straight to the interned TOPIC_* constant
+                    topic = topics_by_frame.get(topic_frame) or sys.intern(topic_frame.decode())
                     event_data = from_json(payload)
                     event_count += 1
+                    if event_count % LOG_EVERY_N_EVENTS == 0:
+                        logger.info(
+                            "%d events processed, %d decisions", event_count, decision_count
+                        )
 
                     # Update per-intersection state
                     intersection = update_intersection_from_event(
@@ -800,7 +812,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                     timestamp = event_data.get("timestamp") or event_data.get(
                         "timestamp_fin", now_iso()
                     )
-                    local_db.insert_sensor_event(
+                    local_db.enqueue_sensor_event(
                         sensor_id=event_data.get("sensor_id", "unknown"),
                         tipo_sensor=tipo_sensor,
                         interseccion=event_data.get("interseccion", "unknown"),
@@ -821,17 +833,19 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                         }
 
                         # Log decision
-                        logger.info(
-                            "[EVENT #%d] %s @ %s -> state=%s, decision=%s (Q=%d, Vp=%.1f, D=%d)",
-                            event_count,
-                            event_data.get("sensor_id", "?"),
-                            intersection,
-                            traffic_state,
-                            decision,
-                            sensor_snapshot["Q"],
-                            sensor_snapshot["Vp"],
-                            sensor_snapshot["D"],
-                        )
+                        if log_debug:
+                            logger.debug(
+                                "[EVENT #%d] %s @ %s -> state=%s, decision=%s "
+                                "(Q=%d, Vp=%.1f, D=%d)",
+                                event_count,
+                                event_data.get("sensor_id", "?"),
+                                intersection,
+                                traffic_state,
+                                decision,
+                                sensor_snapshot["Q"],
+                                sensor_snapshot["Vp"],
+                                sensor_snapshot["D"],
+                            )
 
                         # If congestion detected, send semaphore command
                         if decision == DECISION_EXTEND_GREEN:
@@ -845,7 +859,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                                 f"Vp={sensor_snapshot['Vp']}, D={sensor_snapshot['D']})",
                                 duration_override_sec=total_cycle,
                             )
-                            semaphore_push.send_string(cmd.to_json())
+                            semaphore_push.send(to_json_bytes(cmd))
                             decision_count += 1
 
                             # Push semaphore state to DBs
@@ -875,7 +889,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                         )
 
                         # Also insert congestion record in local DB
-                        local_db.insert_congestion_record(
+                        local_db.enqueue_congestion_record(
                             interseccion=intersection,
                             traffic_state=traffic_state,
                             decision=decision,
@@ -886,13 +900,13 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                         )
 
                 except ValueError:
-                    logger.error("[ERROR] Could not parse message: %s", message[:200])
+                    logger.error("[ERROR] Could not parse message: %r", frames[:2])
                 except Exception as e:
                     logger.error("[ERROR] Failed to process sensor event: %s", e)
 
             # --- Handle monitoring queries ---
             if monitoring_rep in socks and socks[monitoring_rep] == zmq.POLLIN:
-                query_msg = monitoring_rep.recv_string()
+                query_msg = monitoring_rep.recv()
                 try:
                     query_data = from_json(query_msg)
                     query = MonitoringQuery.from_dict(query_data)
@@ -910,7 +924,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                         failover_state,
                     )
 
-                    monitoring_rep.send_string(response.to_json())
+                    monitoring_rep.send(response.to_json_bytes())
                     logger.info(
                         "[QUERY] Response: status=%s, message=%s",
                         response.status,
@@ -923,7 +937,7 @@ def run_analytics_service(replica_db_path: str = "/data/traffic_replica.db") ->
                         status="ERROR",
                         message=f"Internal error: {e}",
                     )
-                    monitoring_rep.send_string(error_resp.to_json())
+                    monitoring_rep.send(error_resp.to_json_bytes())
 
     except KeyboardInterrupt:
         logger.info("Analytics service interrupted.")
@@ -31,7 +31,9 @@ import signal
 import zmq
 
 from common.config_loader import get_config
+from common.constants import LOG_EVERY_N_EVENTS
 from common.db_utils import TrafficDB
+from common.models import from_json
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -81,14 +83,14 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
     data = envelope.get("data", {})
 
     if record_type == "sensor_event":
-        db.insert_sensor_event(
+        db.enqueue_sensor_event(
             sensor_id=data["sensor_id"],
             tipo_sensor=data["tipo_sensor"],
             interseccion=data["interseccion"],
             event_data=data.get("event_data", {}),
             timestamp=data["timestamp"],
         )
-        logger.info(
+        logger.debug(
             "[INSERT sensor_event] %s @ %s (%s)",
             data["sensor_id"],
             data["interseccion"],
@@ -96,7 +98,7 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
         )
 
     elif record_type == "congestion_record":
-        db.insert_congestion_record(
+        db.enqueue_congestion_record(
             interseccion=data["interseccion"],
             traffic_state=data["traffic_state"],
             decision=data["decision"],
@@ -104,7 +106,7 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
             sensor_data=data.get("sensor_data"),
             timestamp=data["timestamp"],
         )
-        logger.info(
+        logger.debug(
             "[INSERT congestion_record] %s state=%s decision=%s",
             data["interseccion"],
             data["traffic_state"],
@@ -112,7 +114,7 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
         )
 
     elif record_type == "semaphore_state":
-        db.insert_semaphore_state(
+        db.enqueue_semaphore_state(
             interseccion=data["interseccion"],
             state_ns=data["state_ns"],
             state_ew=data["state_ew"],
@@ -120,7 +122,7 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
             cycle_duration_sec=data.get("cycle_duration_sec", 15),
             timestamp=data["timestamp"],
         )
-        logger.info(
+        logger.debug(
             "[INSERT semaphore_state] %s NS=%s EW=%s",
             data["interseccion"],
             data["state_ns"],
@@ -136,7 +138,7 @@ def process_envelope(db: TrafficDB, envelope: dict) -> None:
             affected_intersections=data.get("affected_intersections", []),
             timestamp=data["timestamp"],
         )
-        logger.info(
+        logger.debug(
             "[INSERT priority_action] %s target=%s",
             data["action_type"],
             data["target"],
@@ -172,11 +174,14 @@ def run_db_replica(db_path: str = DEFAULT_DB_PATH) -> None:
     try:
         while _running:
             if pull_socket.poll(timeout=1000):
-                message = pull_socket.recv_string()
+                message = pull_socket.recv()
                 try:
-                    envelope = json.loads(message)
+                    envelope = from_json(message)
                     process_envelope(db, envelope)
                     record_count += 1
+                    # Per-record lines are DEBUG; INFO gets a line every N records
+                    if record_count % LOG_EVERY_N_EVENTS == 0:
+                        logger.info("%d records inserted", record_count)
                 except json.JSONDecodeError:
                     logger.error("[ERROR] Invalid JSON received: %s", message[:200])
                 except KeyError as e:
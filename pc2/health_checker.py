@@ -51,6 +51,9 @@ class FailoverState:
     Optional callbacks are invoked exactly once per state transition.
     """
 
+    # Read on every envelope the analytics loop routes, like the slotted models
+    __slots__ = ("_lock", "_on_failover", "_on_recovery", "_pc3_alive")
+
     def __init__(
         self,
         on_failover: Callable[[], None] | None = None,
@@ -160,6 +163,10 @@ class HealthChecker(threading.Thread):
 
         req: zmq.Socket | None = None
 
+        # Checks are scheduled on absolute monotonic deadlines so the PING
+        # round trip (up to timeout_ms on failure) does not stretch the period
+        next_check = time.monotonic()
+
         try:
             while self._running():
                 # (Re)create REQ socket if needed (Lazy Pirate reset)
@@ -186,10 +193,15 @@ class HealthChecker(threading.Thread):
                         self._state.set_failover()
 
                 # Wait before next check
-                # Use short sleeps so we can react to _running going False
-                deadline = time.monotonic() + self._interval
-                while self._running() and time.monotonic() < deadline:
-                    time.sleep(0.25)
+                # Use short sleeps so we can react to _running going False,
+                # the last one trimmed so we wake on the deadline, not after it
+                next_check += self._interval
+                remaining = next_check - time.monotonic()
+                if remaining < -self._interval:
+                    next_check = time.monotonic()  # Too far behind: resynchronize
+                while remaining > 0 and self._running():
+                    time.sleep(min(remaining, 0.25))
+                    remaining = next_check - time.monotonic()
 
         except Exception:
             logger.exception("Health checker crashed")
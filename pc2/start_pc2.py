@@ -17,11 +17,14 @@ Environment variables:
 """
 
 import argparse
+import contextlib
 import logging
 import os
+import re
 import signal
 import subprocess
 import sys
+import threading
 import time
 
 # ---------------------------------------------------------------------------
@@ -48,10 +51,11 @@ def _shutdown(signum=None, frame=None):
             logger.info("Terminating PID %d (%s)", proc.pid, proc.args)
             proc.terminate()
 
-    # Wait for graceful shutdown, then force-kill
+    # Wait for graceful shutdown (one shared deadline), then force-kill
+    deadline = time.monotonic() + 5
     for proc in _processes:
         try:
-            proc.wait(timeout=5)
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
         except subprocess.TimeoutExpired:
             logger.warning("Force-killing PID %d", proc.pid)
             proc.kill()
@@ -63,15 +67,59 @@ def _shutdown(signum=None, frame=None):
 signal.signal(signal.SIGINT, _shutdown)
 signal.signal(signal.SIGTERM, _shutdown)
 
+# Without os.waitid (e.g. macOS before Python 3.13) a SIGCHLD handler wakes
+# the monitor instead; only platforms lacking both fall back to polling
+_child_exited = threading.Event()
+
+
+def _on_sigchld(signum=None, frame=None):
+    _child_exited.set()
+
+
+if not hasattr(os, "waitid") and hasattr(signal, "SIGCHLD"):
+    signal.signal(signal.SIGCHLD, _on_sigchld)
+
+
+def _wait_for_child_exit() -> None:
+    """
+    Block until any child process exits, without reaping it.
+
+    WNOWAIT leaves the child waitable so Popen.poll() still collects its
+    return code. Without os.waitid it waits for SIGCHLD, and where that is
+    missing too, for a 2s poll interval.
+    """
+    if not hasattr(os, "waitid"):
+        if hasattr(signal, "SIGCHLD"):
+            _child_exited.wait()
+            # Cleared before the caller polls, so a later exit wakes us again
+            _child_exited.clear()
+        else:
+            time.sleep(2)
+        return
+    # ChildProcessError: every child has already been reaped
+    with contextlib.suppress(ChildProcessError):
+        os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOWAIT)
+
+
+# Where child output goes: inherited from the launcher (default), discarded
+# (--quiet) or one append-only file per child under --log-dir; set by main()
+_log_dir: str | None = None
+_quiet = False
+
 
 def _launch(cmd: list[str], name: str) -> subprocess.Popen:
     """Launch a subprocess and register it for cleanup."""
     logger.info("Starting %s: %s", name, " ".join(cmd))
-    proc = subprocess.Popen(
-        cmd,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-    )
+    if _quiet:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    elif _log_dir is not None:
+        slug = re.sub(r"\W+", "_", name.lower()).strip("_")
+        # The child keeps its own copy of the descriptor once launched
+        with open(os.path.join(_log_dir, f"{slug}.log"), "ab", buffering=0) as log_file:
+            proc = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT)
+    else:
+        # Inherit the launcher's stdout/stderr descriptors
+        proc = subprocess.Popen(cmd)
     _processes.append(proc)
     logger.info("%s started (PID %d)", name, proc.pid)
     return proc
@@ -89,12 +137,29 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=os.environ.get("REPLICA_DB_PATH", "/data/traffic_replica.db"),
         help="Path to replica SQLite database (default: /data/traffic_replica.db)",
     )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--quiet",
+        action="store_true",
+        default=os.environ.get("PC2_QUIET", "") == "1",
+        help="Discard child process output (env: PC2_QUIET=1)",
+    )
+    output.add_argument(
+        "--log-dir",
+        default=os.environ.get("PC2_LOG_DIR") or None,
+        help="Write each child's output to <log-dir>/<name>.log (env: PC2_LOG_DIR)",
+    )
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> None:
+    global _log_dir, _quiet
     args = parse_args(argv)
     python = sys.executable
+    _quiet = args.quiet
+    if args.log_dir and not _quiet:
+        os.makedirs(args.log_dir, exist_ok=True)
+        _log_dir = args.log_dir
 
     logger.info("=" * 60)
     logger.info("PC2 LAUNCHER - Analytics, Semaphore Control & DB Replica")
@@ -129,12 +194,15 @@ def main(argv: list[str] | None = None) -> None:
     )
 
     # 4. Monitor processes
+    exited: set[int] = set()
     try:
         while True:
-            time.sleep(2)
+            # Wakes as soon as a child exits instead of polling on a timer
+            _wait_for_child_exit()
             for proc in _processes:
                 retcode = proc.poll()
-                if retcode is not None:
+                if retcode is not None and proc.pid not in exited:
+                    exited.add(proc.pid)
                     logger.warning(
                         "Process PID %d (%s) exited with code %d",
                         proc.pid,
@@ -142,7 +210,7 @@ def main(argv: list[str] | None = None) -> None:
                         retcode,
                     )
             # Check if all processes have died
-            if all(p.poll() is not None for p in _processes):
+            if len(exited) == len(_processes):
                 logger.error("All PC2 processes have exited. Shutting down.")
                 break
     except KeyboardInterrupt:
@@ -37,7 +37,7 @@ import zmq
 
 from common.config_loader import get_config
 from common.constants import SEMAPHORE_GREEN, SEMAPHORE_RED
-from common.models import SemaphoreCommand, SemaphoreState, now_iso
+from common.models import SemaphoreCommand, SemaphoreState, from_json, now_iso
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -198,9 +198,9 @@ def run_traffic_light_control() -> None:
     try:
         while _running:
             if pull_socket.poll(timeout=1000):
-                message = pull_socket.recv_string()
+                message = pull_socket.recv()
                 try:
-                    data = json.loads(message)
+                    data = from_json(message)
                     command = SemaphoreCommand.from_dict(data)
                     result = apply_command(states, command, config)
                     if result:
@@ -12,8 +12,6 @@ Tests:
 """
 
 import json
-import os
-import tempfile
 import time
 
 import zmq
@@ -58,10 +56,8 @@ def _get_config() -> CityConfig:
 
 
 def _make_db() -> TrafficDB:
-    """Create a temporary database for testing."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    return TrafficDB(path)
+    """Create an in-memory database for testing."""
+    return TrafficDB(":memory:")
 
 
 # =============================================================================
@@ -532,6 +528,7 @@ class TestDBReplicaProcessing:
             actions = db.query_priority_actions()
             assert len(actions) == 1
             assert actions[0]["action_type"] == "GREEN_WAVE"
+            assert actions[0]["affected_intersections"] == ["INT-B1", "INT-B2"]
         finally:
             db.close()
 
@@ -566,8 +563,7 @@ class TestAnalyticsZMQIntegration:
 
         # Semaphore PULL (simulating traffic_light_control)
         sem_pull = context.socket(zmq.PULL)
-        sem_port = 16562
-        sem_pull.bind(f"tcp://127.0.0.1:{sem_port}")
+        sem_port = sem_pull.bind_to_random_port("tcp://127.0.0.1")
 
         # Semaphore PUSH (simulating analytics sending command)
         sem_push = context.socket(zmq.PUSH)
@@ -607,8 +603,7 @@ class TestAnalyticsZMQIntegration:
 
         # DB PULL (simulating db_replica)
         db_pull = context.socket(zmq.PULL)
-        db_port = 16564
-        db_pull.bind(f"tcp://127.0.0.1:{db_port}")
+        db_port = db_pull.bind_to_random_port("tcp://127.0.0.1")
 
         # DB PUSH (simulating analytics)
         db_push = context.socket(zmq.PUSH)
@@ -625,7 +620,7 @@ class TestAnalyticsZMQIntegration:
             "timestamp": "2026-01-01T10:00:00Z",
         }
         envelope_json = make_sensor_event_envelope(event, TOPIC_CAMERA)
-        db_push.send_string(envelope_json)
+        db_push.send(envelope_json)
 
         # Receive and verify
         db_pull.setsockopt(zmq.RCVTIMEO, 2000)
@@ -649,8 +644,7 @@ class TestAnalyticsZMQIntegration:
 
         # REP socket (simulating analytics)
         rep = context.socket(zmq.REP)
-        rep_port = 16561
-        rep.bind(f"tcp://127.0.0.1:{rep_port}")
+        rep_port = rep.bind_to_random_port("tcp://127.0.0.1")
 
         # REQ socket (simulating monitoring on PC3)
         req = context.socket(zmq.REQ)
@@ -697,9 +691,7 @@ class TestGreenWaveDBPersistence:
     """Tests for green wave priority action DB records."""
 
     def _make_db(self):
-        fd, path = tempfile.mkstemp(suffix=".db")
-        os.close(fd)
-        return TrafficDB(path)
+        return TrafficDB(":memory:")
 
     def test_priority_action_persists_to_db(self):
         """A priority_action envelope should be insertable and queryable."""
@@ -66,6 +66,12 @@ class TestCameraEvent:
         assert event.sensor_id == "CAM-B2"
         assert event.volumen == 5
 
+    def test_from_dict_ignores_unknown_keys(self):
+        raw = {"sensor_id": "CAM-B2", "volumen": 5, "extra": "ignored"}
+        event = CameraEvent.from_dict(raw)
+        assert event.volumen == 5
+        assert not hasattr(event, "extra")
+
 
 class TestInductiveEvent:
     def test_creation(self):
@@ -101,6 +107,63 @@ class TestCongestionLevel:
         assert get_congestion_level(40) == CONGESTION_NORMAL  # edge: not > 40
         assert get_congestion_level(41) == CONGESTION_BAJA
 
+    def test_fractional_speeds_around_boundaries(self):
+        # GPS speeds carry one decimal; pin the < 10 and > 40 edges for floats
+        assert get_congestion_level(9.9) == CONGESTION_ALTA
+        assert get_congestion_level(10.0) == CONGESTION_NORMAL
+        assert get_congestion_level(40.0) == CONGESTION_NORMAL
+        assert get_congestion_level(40.1) == CONGESTION_BAJA
+        assert get_congestion_level(0.0) == CONGESTION_ALTA
+
+    def test_nan_speed_is_normal(self):
+        # A bad reading must not trigger congestion or green-wave handling
+        assert get_congestion_level(float("nan")) == CONGESTION_NORMAL
+
+
+class TestNowIso:
+    def test_matches_strftime_format(self):
+        from datetime import UTC, datetime
+
+        from common.models import now_iso
+
+        before = datetime.now(UTC).replace(microsecond=0)
+        stamp = datetime.strptime(now_iso(), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
+        after = datetime.now(UTC)
+        assert before <= stamp <= after
+
+    def test_formats_once_per_second(self, monkeypatch):
+        from common import models
+
+        clock = iter([1767261600.1, 1767261600.9, 1767261601.0])
+        monkeypatch.setattr(models.time, "time", lambda: next(clock))
+        first = models.now_iso()
+        assert models.now_iso() is first  # Same second: the cached string is reused
+        assert models.now_iso() == "2026-01-01T10:00:01Z"
+
+    def test_iso_from_epoch(self):
+        from common.models import iso_from_epoch
+
+        assert iso_from_epoch(0) == "1970-01-01T00:00:00Z"
+        assert iso_from_epoch(1767261600.9) == "2026-01-01T10:00:00Z"
+
+
+class TestIntegerCodes:
+    def test_names_match_string_labels(self):
+        from common.constants import (
+            DECISION_EXTEND_GREEN,
+            STATUS_FAILOVER,
+            TRAFFIC_CONGESTION,
+            Decision,
+            SemaphoreLight,
+            Status,
+            TrafficState,
+        )
+
+        assert TrafficState[TRAFFIC_CONGESTION] is TrafficState.CONGESTION
+        assert Decision.EXTEND_GREEN.name == DECISION_EXTEND_GREEN
+        assert SemaphoreLight[SEMAPHORE_GREEN].name == SEMAPHORE_GREEN
+        assert Status[STATUS_FAILOVER] == 1
+
 
 class TestSemaphoreCommand:
     def test_serialization(self):
@@ -127,6 +190,12 @@ class TestMonitoringModels:
         data = json.loads(resp.to_json())
         assert data["status"] == "OK"
 
+    def test_response_bytes_match_text(self):
+        resp = MonitoringResponse(command="SYSTEM_STATUS", data={1: "x", "when": 2.5})
+        raw = resp.to_json_bytes()
+        assert isinstance(raw, bytes)
+        assert json.loads(raw) == json.loads(resp.to_json())
+
 
 class TestAnalyticsDecision:
     def test_creation(self):
@@ -146,6 +215,42 @@ class TestSemaphoreState:
         assert state.state_ew == SEMAPHORE_GREEN
 
 
+class TestModelSlots:
+    """All models are slotted dataclasses: no per-instance __dict__."""
+
+    def test_models_have_no_instance_dict(self):
+        import pytest
+
+        instances = [
+            CameraEvent(
+                sensor_id="CAM-A1", interseccion="INT-A1", volumen=5, velocidad_promedio=30
+            ),
+            InductiveEvent(sensor_id="ESP-A1", interseccion="INT-A1", vehiculos_contados=3),
+            GPSEvent(sensor_id="GPS-A1", interseccion="INT-A1", velocidad_promedio=25),
+            SemaphoreCommand(interseccion="INT-A1", new_state=SEMAPHORE_GREEN),
+            MonitoringQuery(command="status"),
+            MonitoringResponse(),
+            AnalyticsDecision(interseccion="INT-A1", traffic_state="NORMAL", decision="NO_ACTION"),
+            SemaphoreState(interseccion="INT-A1"),
+        ]
+        for instance in instances:
+            assert not hasattr(instance, "__dict__"), type(instance).__name__
+            with pytest.raises(AttributeError):
+                instance.not_a_field = 1
+
+    def test_stdlib_fallback_matches_orjson(self, monkeypatch):
+        """Without orjson, to_json() writes the same compact JSON, in field order."""
+        from common import models
+
+        event = CameraEvent(
+            sensor_id="CAM-Ñ1", interseccion="INT-A1", volumen=5, velocidad_promedio=30.5
+        )
+        expected = event.to_json()
+        monkeypatch.setattr(models, "orjson", None)
+        assert event.to_json() == expected
+        assert models.to_json_bytes(event) == expected.encode()
+
+
 # =============================================================================
 # Config Tests
 # =============================================================================
@@ -168,6 +273,18 @@ class TestCityConfig:
         assert len(config.gps_sensors) == 8
         assert len(config.get_all_sensors()) == 24
 
+    def test_sensors_at_intersection(self):
+        config = CityConfig()
+        ids = {s["sensor_id"] for s in config.get_sensors_at_intersection("INT-A1")}
+        assert ids == {"CAM-A1", "GPS-A1"}
+        assert config.get_sensors_at_intersection("INT-Z9") == ()
+
+    def test_sensors_at_intersection_identity_stable(self):
+        config = CityConfig()
+        for intersection in config.intersections:
+            first = config.get_sensors_at_intersection(intersection)
+            assert config.get_sensors_at_intersection(intersection) is first
+
     def test_semaphores_count(self):
         config = CityConfig()
         assert len(config.semaphores) == 16
@@ -197,10 +314,12 @@ class TestCityConfig:
 
 class TestTrafficDB:
     def _make_db(self) -> TrafficDB:
-        """Create a temporary database for testing."""
-        fd, path = tempfile.mkstemp(suffix=".db")
-        os.close(fd)
-        return TrafficDB(path)
+        """Create an in-memory database for testing."""
+        return TrafficDB(":memory:")
+
+    def _make_file_db(self, tmp_path) -> TrafficDB:
+        """Create a disk-backed database, for tests that reopen it or check WAL."""
+        return TrafficDB(str(tmp_path / "traffic.db"))
 
     def test_insert_and_query_sensor_event(self):
         db = self._make_db()
@@ -216,6 +335,23 @@ class TestTrafficDB:
         finally:
             db.close()
 
+    def test_event_data_parsed_lazily(self):
+        db = self._make_db()
+        try:
+            db.insert_sensor_event(
+                "CAM-A1", "camara", "INT-A1", {"volumen": 10}, "2026-01-01T10:00:00Z"
+            )
+            event_data = db.query_events_by_intersection("INT-A1")[0]["event_data"]
+            assert event_data["volumen"] == 10
+            assert event_data.get("missing", 0) == 0
+            assert isinstance(event_data.raw, bytes)  # Stored as a BLOB, no TEXT re-encode
+
+            # Serialized responses still carry the original JSON text
+            resp = MonitoringResponse(status="OK", command="Q", data={"e": event_data})
+            assert json.loads(json.loads(resp.to_json())["data"]["e"]) == {"volumen": 10}
+        finally:
+            db.close()
+
     def test_insert_and_query_congestion(self):
         db = self._make_db()
         try:
@@ -246,6 +382,21 @@ class TestTrafficDB:
         finally:
             db.close()
 
+    def test_query_all_semaphore_states_returns_latest_per_intersection(self):
+        db = self._make_db()
+        try:
+            db.insert_semaphore_state("INT-A1", "RED", "GREEN", "", 15, "2026-01-01T10:00:00Z")
+            db.insert_semaphore_state("INT-A1", "GREEN", "RED", "", 25, "2026-01-01T10:01:00Z")
+            db.insert_semaphore_state("INT-B2", "RED", "GREEN", "", 15, "2026-01-01T10:00:30Z")
+
+            states = db.query_all_semaphore_states()
+            assert [s["interseccion"] for s in states] == ["INT-A1", "INT-B2"]
+            assert states[0]["state_ns"] == "GREEN"
+            assert states[0]["cycle_duration_sec"] == 25
+            assert "rn" not in states[0]
+        finally:
+            db.close()
+
     def test_query_by_time_range(self):
         db = self._make_db()
         try:
@@ -258,6 +409,26 @@ class TestTrafficDB:
         finally:
             db.close()
 
+    def test_iter_events_streams_in_batches(self):
+        db = self._make_db()
+        try:
+            for i in range(10):
+                db.enqueue_sensor_event(
+                    "CAM-A1", "camara", "INT-A1", {"i": i}, f"2026-01-01T10:00:0{i}Z"
+                )
+
+            stream = db.iter_events_by_time_range(
+                "2026-01-01T10:00:00Z", "2026-01-01T10:00:09Z", batch_size=3
+            )
+            first = next(stream)
+            assert first["event_data"]["i"] == 9  # Newest first
+
+            # Writes between batches do not disturb the open stream
+            db.insert_sensor_event("CAM-A1", "camara", "INT-A1", {}, "2026-01-01T09:00:00Z")
+            assert [e["event_data"]["i"] for e in stream] == list(range(8, -1, -1))
+        finally:
+            db.close()
+
     def test_system_summary(self):
         db = self._make_db()
         try:
@@ -278,6 +449,27 @@ class TestTrafficDB:
         finally:
             db.close()
 
+    def test_system_summary_seeds_counters_for_existing_db(self, tmp_path):
+        """A database created before the stats table gets counters from its rows."""
+        db = self._make_file_db(tmp_path)
+        try:
+            db.insert_sensor_event("CAM-A1", "camara", "INT-A1", {}, "2026-01-01T10:00:00Z")
+            db.insert_semaphore_state("INT-A1", "GREEN", "RED", "", 15, "2026-01-01T10:00:00Z")
+            db.conn.execute("DROP TABLE stats")
+            db.conn.execute("PRAGMA user_version = 0")
+            db.conn.commit()
+        finally:
+            db.close()
+
+        reopened = TrafficDB(db.db_path)
+        try:
+            reopened.insert_sensor_event("CAM-A1", "camara", "INT-A1", {}, "2026-01-01T10:00:01Z")
+            summary = reopened.get_system_summary()
+            assert summary["total_sensor_events"] == 2
+            assert summary["total_semaphore_changes"] == 1
+        finally:
+            reopened.close()
+
     def test_event_count_in_interval(self):
         db = self._make_db()
         try:
@@ -295,6 +487,77 @@ class TestTrafficDB:
         finally:
             db.close()
 
+    def test_enqueued_events_visible_to_queries(self):
+        """Queries flush queued rows first, so enqueued events are read back."""
+        db = self._make_db()
+        try:
+            db.enqueue_sensor_event("CAM-A1", "camara", "INT-A1", {}, "2026-01-01T10:00:00Z")
+            db.enqueue_semaphore_state("INT-A1", "GREEN", "RED", "", 15, "2026-01-01T10:00:00Z")
+            db.enqueue_congestion_record(
+                "INT-A1", "CONGESTION", "EXTEND_GREEN", "", {"Q": 12}, "2026-01-01T10:00:00Z"
+            )
+
+            assert len(db.query_events_by_intersection("INT-A1")) == 1
+            assert db.query_semaphore_state("INT-A1")["state_ns"] == "GREEN"
+            assert len(db.query_congestion_history(interseccion="INT-A1")) == 1
+        finally:
+            db.close()
+
+    def test_enqueue_flushes_when_batch_full(self, tmp_path):
+        """Reaching FLUSH_MAX_ROWS writes the batch without an explicit flush."""
+        from common.db_utils import FLUSH_MAX_ROWS
+
+        db = self._make_file_db(tmp_path)
+        try:
+            for i in range(FLUSH_MAX_ROWS):
+                db.enqueue_sensor_event(
+                    "CAM-A1", "camara", "INT-A1", {"i": i}, "2026-01-01T10:00:00Z"
+                )
+            other = TrafficDB(db.db_path)
+            try:
+                count = other.get_event_count_in_interval(
+                    "2026-01-01T10:00:00Z", "2026-01-01T10:00:00Z"
+                )
+                assert count == FLUSH_MAX_ROWS
+            finally:
+                other.close()
+        finally:
+            db.close()
+
+    def test_schema_skipped_when_version_current(self, tmp_path):
+        from common.db_utils import SCHEMA_VERSION
+
+        db = self._make_file_db(tmp_path)
+        try:
+            assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            db.conn.execute("DROP INDEX idx_priority_actions_timestamp")
+            db.conn.commit()
+        finally:
+            db.close()
+
+        # Same version on reopen: the schema script is not re-run
+        reopened = TrafficDB(db.db_path)
+        try:
+            indexes = {
+                row[0]
+                for row in reopened.conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='index'"
+                )
+            }
+            assert "idx_priority_actions_timestamp" not in indexes
+        finally:
+            reopened.close()
+
+    def test_connection_pragmas_applied(self, tmp_path):
+        db = self._make_file_db(tmp_path)
+        try:
+            assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert db.conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert db.conn.execute("PRAGMA mmap_size").fetchone()[0] == 268435456
+        finally:
+            db.close()
+
 
 # =============================================================================
 # Test Area 2: Config Validation / Edge Cases
@@ -321,6 +584,23 @@ class TestConfigValidation:
         with pytest.raises(KeyError):
             config.get_port("nonexistent_port_name")
 
+    def test_get_config_reuses_instance_until_file_changes(self):
+        """get_config should memoize per path and re-parse after the file is modified."""
+        import shutil
+
+        from common.config_loader import DEFAULT_CONFIG_PATH, get_config
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "city_config.json")
+            shutil.copy(DEFAULT_CONFIG_PATH, path)
+
+            first = get_config(path)
+            assert get_config(path) is first
+
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert get_config(path) is not first
+
     def test_zmq_address_format(self):
         """zmq_address should produce correct tcp:// format."""
         config = CityConfig()
@@ -345,9 +625,7 @@ class TestDBEdgeCases:
     """Tests for db_utils.py edge cases."""
 
     def _make_db(self) -> TrafficDB:
-        fd, path = tempfile.mkstemp(suffix=".db")
-        os.close(fd)
-        return TrafficDB(path)
+        return TrafficDB(":memory:")
 
     def test_event_count_empty_range(self):
         """Equal start and end should return 0 or events at that exact time."""
@@ -11,6 +11,7 @@ Tests:
 import json
 import threading
 import time
+from itertools import pairwise
 
 import zmq
 
@@ -34,6 +35,10 @@ class TestFailoverState:
         state = FailoverState()
         assert state.is_pc3_alive() is True
 
+    def test_state_is_slotted(self):
+        """Like the event models, the state keeps no per-instance __dict__."""
+        assert not hasattr(FailoverState(), "__dict__")
+
     def test_set_failover(self):
         """After set_failover, PC3 should be reported as down."""
         state = FailoverState()
@@ -121,13 +126,11 @@ class TestPushToDbsFailover:
     def test_push_to_both_when_alive(self):
         """Both primary and replica should receive the message when PC3 is alive."""
         context = zmq.Context()
-        port_primary = 18601
-        port_replica = 18602
 
         pull_primary = context.socket(zmq.PULL)
-        pull_primary.bind(f"tcp://127.0.0.1:{port_primary}")
+        port_primary = pull_primary.bind_to_random_port("tcp://127.0.0.1")
         pull_replica = context.socket(zmq.PULL)
-        pull_replica.bind(f"tcp://127.0.0.1:{port_replica}")
+        port_replica = pull_replica.bind_to_random_port("tcp://127.0.0.1")
 
         push_primary = context.socket(zmq.PUSH)
         push_primary.connect(f"tcp://127.0.0.1:{port_primary}")
@@ -137,11 +140,11 @@ class TestPushToDbsFailover:
         time.sleep(0.3)
 
         state = FailoverState()  # alive by default
-        envelope = json.dumps({"type": "sensor_event", "data": {"test": True}})
+        envelope = json.dumps({"type": "sensor_event", "data": {"test": True}}).encode()
 
         # Wrap primary socket in a callable (matches new push_to_dbs API)
         def send_primary(msg):
-            push_primary.send_string(msg)
+            push_primary.send(msg)
 
         push_to_dbs(send_primary, push_replica, envelope, state)
 
@@ -161,10 +164,9 @@ class TestPushToDbsFailover:
     def test_push_only_to_replica_during_failover(self):
         """Only replica should receive the message when PC3 is down."""
         context = zmq.Context()
-        port_replica = 18603
 
         pull_replica = context.socket(zmq.PULL)
-        pull_replica.bind(f"tcp://127.0.0.1:{port_replica}")
+        port_replica = pull_replica.bind_to_random_port("tcp://127.0.0.1")
 
         push_replica = context.socket(zmq.PUSH)
         push_replica.connect(f"tcp://127.0.0.1:{port_replica}")
@@ -174,7 +176,7 @@ class TestPushToDbsFailover:
         state = FailoverState()
         state.set_failover()
 
-        envelope = json.dumps({"type": "sensor_event", "data": {"test": True}})
+        envelope = json.dumps({"type": "sensor_event", "data": {"test": True}}).encode()
 
         # primary is None during failover (socket was closed)
         push_to_dbs(None, push_replica, envelope, state)
@@ -190,17 +192,16 @@ class TestPushToDbsFailover:
     def test_push_no_primary_when_primary_is_none(self):
         """When primary push socket is None, should not raise."""
         context = zmq.Context()
-        port_replica = 18604
 
         pull_replica = context.socket(zmq.PULL)
-        pull_replica.bind(f"tcp://127.0.0.1:{port_replica}")
+        port_replica = pull_replica.bind_to_random_port("tcp://127.0.0.1")
 
         push_replica = context.socket(zmq.PUSH)
         push_replica.connect(f"tcp://127.0.0.1:{port_replica}")
 
         time.sleep(0.3)
 
-        envelope = json.dumps({"type": "test", "data": {}})
+        envelope = json.dumps({"type": "test", "data": {}}).encode()
         # No failover state, primary is None -- should not crash
         push_to_dbs(None, push_replica, envelope)
 
@@ -224,13 +225,12 @@ class TestHealthChecker:
     def test_ping_pong_success(self):
         """Health checker should detect PC3 as alive when REP responds."""
         context = zmq.Context()
-        port = 18610
         state = FailoverState()
         stop = [False]  # mutable container for closure
 
         # Mock PC3 health check REP
         rep = context.socket(zmq.REP)
-        rep.bind(f"tcp://127.0.0.1:{port}")
+        port = rep.bind_to_random_port("tcp://127.0.0.1")
 
         # Patch config to use our test port and localhost
         class MockConfig:
@@ -268,6 +268,52 @@ class TestHealthChecker:
         rep.close()
         context.term()
 
+    def test_ping_period_excludes_reply_time(self):
+        """A slow PONG should not stretch the interval between PINGs."""
+        context = zmq.Context()
+        state = FailoverState()
+        stop = [False]
+
+        rep = context.socket(zmq.REP)
+        port = rep.bind_to_random_port("tcp://127.0.0.1")
+        rep.setsockopt(zmq.RCVTIMEO, 3000)
+
+        class MockConfig:
+            health_check_interval_sec = 1
+            health_check_timeout_ms = 1000
+            health_check_max_retries = 3
+            pc3_host = "127.0.0.1"
+
+            def zmq_address(self, host, port_name):
+                return f"tcp://{host}:{port}"
+
+            def get_port(self, name):
+                return port
+
+        checker = HealthChecker(
+            context=context,
+            state=state,
+            config=MockConfig(),
+            running=lambda: not stop[0],
+        )
+        checker.start()
+
+        arrivals = []
+        for _ in range(3):
+            rep.recv_string()
+            arrivals.append(time.monotonic())
+            time.sleep(0.4)  # Slow reply, well under the timeout
+            rep.send_string(HEALTH_CHECK_RESPONSE)
+
+        # Without deadline scheduling each gap would be ~1.4s
+        gaps = [b - a for a, b in pairwise(arrivals)]
+        assert all(0.8 < gap < 1.25 for gap in gaps), gaps
+
+        stop[0] = True
+        checker.join(timeout=5)
+        rep.close()
+        context.term()
+
     def test_failover_after_retries_exhausted(self):
         """Health checker should trigger failover after max retries with no response."""
         context = zmq.Context()
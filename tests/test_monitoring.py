@@ -11,8 +11,6 @@ Tests:
 
 import inspect
 import json
-import os
-import tempfile
 import time
 from unittest.mock import MagicMock, patch
 
@@ -45,10 +43,8 @@ from pc3.db_primary import process_envelope
 
 
 def _make_db() -> TrafficDB:
-    """Create a temporary database for testing."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    return TrafficDB(path)
+    """Create an in-memory database for testing."""
+    return TrafficDB(":memory:")
 
 
 # =============================================================================
@@ -428,11 +424,10 @@ class TestHealthCheck:
     def test_health_check_ping_pong(self):
         """Health check REP should respond PONG to PING."""
         context = zmq.Context()
-        port = 17565
 
         # REP socket (simulating db_primary health check thread)
         rep = context.socket(zmq.REP)
-        rep.bind(f"tcp://127.0.0.1:{port}")
+        port = rep.bind_to_random_port("tcp://127.0.0.1")
 
         # REQ socket (simulating PC2 health checker)
         req = context.socket(zmq.REQ)
@@ -475,11 +470,10 @@ class TestMonitoringZMQIntegration:
         responds via REP, monitoring receives the response.
         """
         context = zmq.Context()
-        port = 17561
 
         # REP socket (simulating analytics service on PC2)
         rep = context.socket(zmq.REP)
-        rep.bind(f"tcp://127.0.0.1:{port}")
+        port = rep.bind_to_random_port("tcp://127.0.0.1")
 
         # REQ socket (simulating monitoring on PC3)
         req = context.socket(zmq.REQ)
@@ -531,10 +525,9 @@ class TestMonitoringZMQIntegration:
         Round-trip for FORCE_GREEN_WAVE: monitoring sends, analytics responds.
         """
         context = zmq.Context()
-        port = 17562
 
         rep = context.socket(zmq.REP)
-        rep.bind(f"tcp://127.0.0.1:{port}")
+        port = rep.bind_to_random_port("tcp://127.0.0.1")
 
         req = context.socket(zmq.REQ)
         req.connect(f"tcp://127.0.0.1:{port}")
@@ -585,11 +578,10 @@ class TestMonitoringZMQIntegration:
         Simulate analytics PUSH -> db_primary PULL for envelope delivery.
         """
         context = zmq.Context()
-        port = 17563
 
         # PULL socket (simulating db_primary)
         pull = context.socket(zmq.PULL)
-        pull.bind(f"tcp://127.0.0.1:{port}")
+        port = pull.bind_to_random_port("tcp://127.0.0.1")
 
         # PUSH socket (simulating analytics)
         push = context.socket(zmq.PUSH)
@@ -688,20 +680,20 @@ class TestSendQueryErrorHandling:
         from common.monitoring_commands import send_query
 
         mock_socket = MagicMock()
-        mock_socket.recv_string.side_effect = zmq.Again()
+        mock_socket.recv.side_effect = zmq.Again()
 
         query = MonitoringQuery(command=CMD_SYSTEM_STATUS)
         result = send_query(mock_socket, query)
 
         assert result is None
-        mock_socket.send_string.assert_called_once()
+        mock_socket.send.assert_called_once()
 
     def test_send_query_exception_returns_none(self):
         """send_query should return None on generic Exception."""
         from common.monitoring_commands import send_query
 
         mock_socket = MagicMock()
-        mock_socket.send_string.side_effect = Exception("connection lost")
+        mock_socket.send.side_effect = Exception("connection lost")
 
         query = MonitoringQuery(command=CMD_SYSTEM_STATUS)
         result = send_query(mock_socket, query)
@@ -718,7 +710,7 @@ class TestSendQueryErrorHandling:
             message="all good",
         )
         mock_socket = MagicMock()
-        mock_socket.recv_string.return_value = resp.to_json()
+        mock_socket.recv.return_value = resp.to_json_bytes()
 
         query = MonitoringQuery(command=CMD_SYSTEM_STATUS)
         result = send_query(mock_socket, query)
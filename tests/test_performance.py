@@ -8,6 +8,7 @@ graph generation with sample data. All tests run without Docker.
 
 import json
 import os
+import signal
 import time
 from unittest.mock import patch
 
@@ -437,6 +438,38 @@ class TestLauncherArgParsing:
         args = parse_args(["--broker-mode", "threaded"])
         assert args.broker_mode == "threaded"
 
+    def test_start_pc1_inproc_flag(self):
+        """--inproc should enable single-process mode."""
+        from pc1.start_pc1 import parse_args
+
+        args = parse_args(["--inproc", "--broker-mode", "proxy"])
+        assert args.inproc is True
+
+    def test_start_pc1_inproc_rejects_threaded(self):
+        """The threaded broker has no inproc variant, so the combination is refused."""
+        from pc1.start_pc1 import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(["--inproc", "--broker-mode", "threaded"])
+
+    def test_start_pc1_async_sensors_flag(self):
+        """--async-sensors should be accepted alone and combined with --inproc."""
+        from pc1.start_pc1 import parse_args
+
+        assert parse_args(["--async-sensors"]).async_sensors is True
+        args = parse_args(["--async-sensors", "--inproc"])
+        assert args.async_sensors is True
+        assert args.inproc is True
+
+    def test_start_pc1_output_flags(self):
+        """--quiet and --log-dir should parse, but not together."""
+        from pc1.start_pc1 import parse_args
+
+        assert parse_args(["--quiet"]).quiet is True
+        assert parse_args(["--log-dir", "logs"]).log_dir == "logs"
+        with pytest.raises(SystemExit):
+            parse_args(["--quiet", "--log-dir", "logs"])
+
     def test_start_pc1_interval_cli(self):
         """--interval 5 should set interval to 5.0."""
         from pc1.start_pc1 import parse_args
@@ -490,3 +523,62 @@ class TestLauncherArgParsing:
 
         args = parse_args(["--db-path", "./my_primary.db"])
         assert args.db_path == "./my_primary.db"
+
+
+# =============================================================================
+# Tests for launcher child-process monitoring
+# =============================================================================
+
+
+class TestLauncherChildMonitoring:
+    """Tests for how the launchers start and watch their child processes."""
+
+    @pytest.mark.skipif(not hasattr(os, "waitid"), reason="os.waitid not available")
+    def test_wait_for_child_exit_leaves_return_code(self):
+        """The monitor should wake on child exit and leave it for Popen.poll()."""
+        import subprocess
+        import sys
+
+        from pc1.start_pc1 import _wait_for_child_exit
+
+        proc = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+        start = time.monotonic()
+        _wait_for_child_exit()
+        assert time.monotonic() - start < 1.5  # Did not sit out a poll interval
+        assert proc.poll() == 3
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGCHLD"), reason="SIGCHLD not available")
+    def test_wait_for_child_exit_without_waitid_uses_sigchld(self, monkeypatch):
+        """Without os.waitid, the monitor should wake on SIGCHLD instead of polling."""
+        import subprocess
+        import sys
+
+        from pc1 import start_pc1
+
+        monkeypatch.delattr(os, "waitid")
+        previous = signal.signal(signal.SIGCHLD, start_pc1._on_sigchld)
+        try:
+            start_pc1._child_exited.clear()
+            proc = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+            start = time.monotonic()
+            start_pc1._wait_for_child_exit()
+            assert time.monotonic() - start < 1.5  # Did not sit out a poll interval
+            assert not start_pc1._child_exited.is_set()
+            assert proc.wait(timeout=5) == 3
+        finally:
+            signal.signal(signal.SIGCHLD, previous)
+
+    def test_launch_writes_child_output_to_log_dir(self, tmp_path, monkeypatch):
+        """With --log-dir, each child's stdout and stderr go to <log-dir>/<name>.log."""
+        import sys
+
+        from pc2 import start_pc2
+
+        monkeypatch.setattr(start_pc2, "_log_dir", str(tmp_path))
+        monkeypatch.setattr(start_pc2, "_processes", [])
+        cmd = [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"]
+        proc = start_pc2._launch(cmd, "DB Replica")
+        assert proc.wait(timeout=10) == 0
+
+        lines = (tmp_path / "db_replica.log").read_text().split()
+        assert sorted(lines) == ["err", "out"]
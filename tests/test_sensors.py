@@ -5,10 +5,16 @@ Tests sensor event generation logic (without ZMQ networking) and
 validates that generated events conform to the expected data models.
 """
 
+import asyncio
 import json
-import time
+import os
+import threading
+from functools import partial
+from itertools import islice
 
+import pytest
 import zmq
+import zmq.asyncio
 
 from common.constants import (
     CAMERA_SPEED_MAX,
@@ -26,13 +32,60 @@ from common.constants import (
     SENSOR_TYPE_GPS,
     SENSOR_TYPE_INDUCTIVE,
     TOPIC_CAMERA,
+    TOPIC_CAMERA_BYTES,
     TOPIC_GPS,
+    TOPIC_GPS_BYTES,
+    TOPIC_INDUCTIVE,
+    ZMQ_HWM,
+    ZMQ_LINGER_MS,
+    ZMQ_TCP_KEEPALIVE,
+    ZMQ_TCP_KEEPALIVE_IDLE_SEC,
 )
-from common.models import GPSEvent
+from common.models import GPSEvent, to_json_bytes
+from common.zmq_utils import new_context, validate_cpus
 from pc1.sensors.camera_sensor import generate_camera_event
 from pc1.sensors.gps_sensor import generate_gps_event
 from pc1.sensors.inductive_sensor import generate_inductive_event
 
+# Smallest and largest values random.random() can return
+RANDOM_EXTREMES = (0.0, 1 - 2**-53)
+
+
+@pytest.fixture(scope="module")
+def zmq_ctx():
+    """
+    One ZMQ context shared by this module's plain PUB/SUB tests.
+
+    Its sockets default to LINGER=0 and are left to destroy(), which closes
+    them all at module teardown without waiting on undelivered messages, so
+    the tests need no close() calls and a failed one cannot hang teardown.
+    """
+    context = zmq.Context()
+    context.setsockopt(zmq.LINGER, 0)
+    yield context
+    context.destroy(linger=0)
+
+
+def _await_subscription(xpub: zmq.Socket, topic: bytes) -> None:
+    """
+    Block until a SUB's subscription to topic has reached this XPUB.
+
+    Past that point the publisher's filter includes the subscriber, so the
+    next send is delivered; no sleep is needed to outwait the slow joiner.
+    """
+    xpub.setsockopt(zmq.RCVTIMEO, 2000)
+    assert xpub.recv() == b"\x01" + topic
+
+
+def _make_sub(context: zmq.Context, endpoint: str, topic: bytes) -> zmq.Socket:
+    """SUB socket connected to endpoint, subscribed to topic, with a 2s receive timeout."""
+    sub = context.socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVTIMEO, 2000)
+    sub.setsockopt(zmq.SUBSCRIBE, topic)
+    sub.connect(endpoint)
+    return sub
+
+
 # =============================================================================
 # Camera Sensor Tests
 # =============================================================================
@@ -48,12 +101,20 @@ class TestCameraSensor:
         assert event.interseccion == "INT-A1"
         assert event.tipo_sensor == SENSOR_TYPE_CAMERA
 
-    def test_generate_event_value_ranges(self):
-        """Camera event values should be within configured ranges."""
-        for _ in range(50):
-            event = generate_camera_event("CAM-B2", "INT-B2")
-            assert CAMERA_VOLUME_MIN <= event.volumen <= CAMERA_VOLUME_MAX
-            assert CAMERA_SPEED_MIN <= event.velocidad_promedio <= CAMERA_SPEED_MAX
+    def test_generate_event_value_ranges(self, monkeypatch):
+        """Camera event values should be within configured ranges, ends included."""
+        from pc1.sensors import camera_sensor
+
+        generate = partial(generate_camera_event, "CAM-B2", "INT-B2")
+        events = [generate() for _ in range(5)]
+        assert all(CAMERA_VOLUME_MIN <= e.volumen <= CAMERA_VOLUME_MAX for e in events)
+        assert all(CAMERA_SPEED_MIN <= e.velocidad_promedio <= CAMERA_SPEED_MAX for e in events)
+
+        low, high = RANDOM_EXTREMES
+        monkeypatch.setattr(camera_sensor, "_random", lambda: low)
+        assert camera_sensor._random_readings() == (CAMERA_VOLUME_MIN, CAMERA_SPEED_MIN)
+        monkeypatch.setattr(camera_sensor, "_random", lambda: high)
+        assert camera_sensor._random_readings() == (CAMERA_VOLUME_MAX, CAMERA_SPEED_MAX)
 
     def test_generate_event_has_timestamp(self):
         """Camera event should have a non-empty timestamp."""
@@ -73,6 +134,15 @@ class TestCameraSensor:
         assert "velocidad_promedio" in data
         assert "timestamp" in data
 
+    def test_payload_template_matches_to_json(self):
+        """The precomputed payload template should produce the same bytes as to_json()."""
+        from pc1.sensors.camera_sensor import build_payload_template
+
+        event = generate_camera_event("CAM-%1", 'INT-"Ñ1"')
+        template = build_payload_template(event.sensor_id, event.interseccion)
+        payload = template % (event.volumen, event.velocidad_promedio, event.timestamp.encode())
+        assert payload == event.to_json().encode()
+
     def test_generate_event_randomness(self):
         """Multiple events should produce different values."""
         events = [generate_camera_event("CAM-A1", "INT-A1") for _ in range(20)]
@@ -80,6 +150,19 @@ class TestCameraSensor:
         # With 20 samples from range 0-20, we should get more than 1 distinct value
         assert len(volumes) > 1
 
+    def test_reading_stream_ranges(self):
+        """Batched readings should be plain numbers within the camera ranges."""
+        from pc1.sensors.camera_sensor import _reading_stream
+
+        # 10k draws over many small batches, checked as a whole: min/max bound
+        # the range, and reach both volume ends (a miss is ~1e-200)
+        volumes, speeds = zip(*islice(_reading_stream(batch_size=16), 10_000), strict=True)
+        assert {type(v) for v in volumes} == {int}
+        assert {type(v) for v in speeds} == {float}
+        assert (min(volumes), max(volumes)) == (CAMERA_VOLUME_MIN, CAMERA_VOLUME_MAX)
+        assert CAMERA_SPEED_MIN <= min(speeds) <= max(speeds) <= CAMERA_SPEED_MAX
+        assert all(round(v, 1) == v for v in speeds)
+
 
 # =============================================================================
 # Inductive Sensor Tests
@@ -97,11 +180,21 @@ class TestInductiveSensor:
         assert event.tipo_sensor == SENSOR_TYPE_INDUCTIVE
         assert event.intervalo_segundos == 30
 
-    def test_generate_event_value_ranges(self):
-        """Inductive event vehicle count should be within configured ranges."""
-        for _ in range(50):
-            event = generate_inductive_event("ESP-B3", "INT-B3", 30)
-            assert INDUCTIVE_COUNT_MIN <= event.vehiculos_contados <= INDUCTIVE_COUNT_MAX
+    def test_generate_event_value_ranges(self, monkeypatch):
+        """Inductive event vehicle count should be within configured ranges, ends included."""
+        from pc1.sensors import inductive_sensor
+
+        generate = partial(generate_inductive_event, "ESP-B3", "INT-B3", 30)
+        events = [generate() for _ in range(5)]
+        assert all(
+            INDUCTIVE_COUNT_MIN <= e.vehiculos_contados <= INDUCTIVE_COUNT_MAX for e in events
+        )
+
+        low, high = RANDOM_EXTREMES
+        monkeypatch.setattr(inductive_sensor, "_random", lambda: low)
+        assert inductive_sensor._random_count() == INDUCTIVE_COUNT_MIN
+        monkeypatch.setattr(inductive_sensor, "_random", lambda: high)
+        assert inductive_sensor._random_count() == INDUCTIVE_COUNT_MAX
 
     def test_generate_event_timestamps(self):
         """Inductive event should have both start and end timestamps."""
@@ -128,6 +221,39 @@ class TestInductiveSensor:
         event = generate_inductive_event("ESP-A2", "INT-A2", 15)
         assert event.intervalo_segundos == 15
 
+    def test_count_stream_range(self):
+        """Batched counts should be plain ints within the inductive range."""
+        from pc1.sensors.inductive_sensor import _count_stream
+
+        # 10k draws over many small batches stay in range and reach both ends
+        counts = list(islice(_count_stream(batch_size=16), 10_000))
+        assert {type(c) for c in counts} == {int}
+        assert (min(counts), max(counts)) == (INDUCTIVE_COUNT_MIN, INDUCTIVE_COUNT_MAX)
+
+    def test_window_timestamps_cached_per_second(self):
+        """Events in the same second should share the window strings."""
+        from pc1.sensors.inductive_sensor import _window_iso
+
+        start, end = _window_iso(1_700_000_000, 30)
+        assert (start, end) == ("2023-11-14T22:12:50Z", "2023-11-14T22:13:20Z")
+        assert _window_iso(1_700_000_000, 30)[1] is end
+        # A new second or interval invalidates the cache
+        assert _window_iso(1_700_000_001, 30)[1] == "2023-11-14T22:13:21Z"
+        assert _window_iso(1_700_000_001, 10)[0] == "2023-11-14T22:13:11Z"
+
+    def test_payload_template_matches_to_json(self):
+        """The precomputed payload template should produce the same bytes as to_json()."""
+        from pc1.sensors.inductive_sensor import build_payload_template
+
+        event = generate_inductive_event("ESP-%1", 'INT-"Ñ2"', 30)
+        template = build_payload_template(event.sensor_id, event.interseccion, 30)
+        payload = template % (
+            event.vehiculos_contados,
+            event.timestamp_inicio.encode(),
+            event.timestamp_fin.encode(),
+        )
+        assert payload == event.to_json().encode()
+
 
 # =============================================================================
 # GPS Sensor Tests
@@ -144,11 +270,32 @@ class TestGPSSensor:
         assert event.interseccion == "INT-A1"
         assert event.tipo_sensor == SENSOR_TYPE_GPS
 
-    def test_generate_event_value_ranges(self):
-        """GPS event speed should be within configured ranges."""
-        for _ in range(50):
-            event = generate_gps_event("GPS-B2", "INT-B2")
-            assert GPS_SPEED_MIN <= event.velocidad_promedio <= GPS_SPEED_MAX
+    def test_generate_event_value_ranges(self, monkeypatch):
+        """GPS event speed should be within configured ranges, ends included."""
+        from pc1.sensors import gps_sensor
+
+        generate = partial(generate_gps_event, "GPS-B2", "INT-B2")
+        events = [generate() for _ in range(5)]
+        assert all(GPS_SPEED_MIN <= e.velocidad_promedio <= GPS_SPEED_MAX for e in events)
+
+        low, high = RANDOM_EXTREMES
+        monkeypatch.setattr(gps_sensor, "_random", lambda: low)
+        assert gps_sensor._random_speed() == GPS_SPEED_MIN
+        monkeypatch.setattr(gps_sensor, "_random", lambda: high)
+        assert gps_sensor._random_speed() == GPS_SPEED_MAX
+
+    def test_speed_table_classifies_boundaries(self):
+        """Every pre-serialized speed carries the congestion level GPSEvent would compute."""
+        from pc1.sensors.gps_sensor import _SPEED_LEVELS
+
+        levels = dict(_SPEED_LEVELS)
+        assert levels[9.9] == CONGESTION_ALTA
+        assert levels[10.0] == CONGESTION_NORMAL
+        assert levels[40.0] == CONGESTION_NORMAL
+        assert levels[40.1] == CONGESTION_BAJA
+        for velocidad, nivel in _SPEED_LEVELS:
+            event = GPSEvent(sensor_id="GPS-X", velocidad_promedio=velocidad)
+            assert event.nivel_congestion == nivel
 
     def test_congestion_auto_calculation(self):
         """GPS event should auto-calculate congestion level from speed."""
@@ -181,6 +328,31 @@ class TestGPSSensor:
         assert event.timestamp
         assert "T" in event.timestamp
 
+    def test_payload_template_matches_to_json(self):
+        """The precomputed payload template should produce the same bytes as to_json()."""
+        from pc1.sensors.gps_sensor import _SPEED_FRAGMENTS, _SPEED_LEVELS, build_payload_template
+
+        template = build_payload_template("GPS-%1", 'INT-"Ñ1"')
+        for speed in (5.0, 10.0, 25.5, 40.0, 54.9):
+            index = round((speed - GPS_SPEED_MIN) * 10)
+            assert _SPEED_LEVELS[index][0] == speed
+            event = GPSEvent(sensor_id="GPS-%1", interseccion='INT-"Ñ1"', velocidad_promedio=speed)
+            payload = template % (_SPEED_FRAGMENTS[index], event.timestamp.encode())
+            assert payload == event.to_json().encode()
+
+    def test_speed_stream_range(self):
+        """Batched speed indexes should cover only the GPS speed range."""
+        from pc1.sensors.gps_sensor import _SPEED_LEVELS, _speed_index_stream
+
+        assert _SPEED_LEVELS[0][0] == GPS_SPEED_MIN
+        assert _SPEED_LEVELS[-1][0] == GPS_SPEED_MAX
+
+        # 10k draws over many small batches index only the table and reach its
+        # first and last speeds (a miss is ~1e-8)
+        indexes = list(islice(_speed_index_stream(batch_size=16), 10_000))
+        assert {type(i) for i in indexes} == {int}
+        assert (min(indexes), max(indexes)) == (0, len(_SPEED_LEVELS) - 1)
+
 
 # =============================================================================
 # ZMQ Integration Tests (Sensor -> Broker)
@@ -190,105 +362,211 @@ class TestGPSSensor:
 class TestSensorZMQPublish:
     """Integration tests verifying sensors can publish via ZMQ PUB/SUB."""
 
-    def test_camera_pub_sub(self):
-        """Camera sensor should publish events that a SUB socket can receive."""
-        context = zmq.Context()
-        port = 15555  # Use high port for testing
-
-        # PUB socket (simulating sensor)
+    def test_new_context_applies_socket_defaults(self):
+        """Sockets from new_context() should inherit the tuned HWM, linger and keepalive."""
+        context = new_context()
         pub = context.socket(zmq.PUB)
-        pub.bind(f"tcp://127.0.0.1:{port}")
+        try:
+            assert pub.getsockopt(zmq.SNDHWM) == ZMQ_HWM
+            assert pub.getsockopt(zmq.RCVHWM) == ZMQ_HWM
+            assert pub.getsockopt(zmq.LINGER) == ZMQ_LINGER_MS
+            assert pub.getsockopt(zmq.TCP_KEEPALIVE) == ZMQ_TCP_KEEPALIVE
+            assert pub.getsockopt(zmq.TCP_KEEPALIVE_IDLE) == ZMQ_TCP_KEEPALIVE_IDLE_SEC
+        finally:
+            pub.close()
+            context.term()
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+    def test_new_context_pins_cpus(self):
+        """With cpus, the calling thread is pinned and the context still works."""
+        original = os.sched_getaffinity(0)
+        cpu = min(original)
+        try:
+            context = new_context((cpu, cpu))
+            pub = context.socket(zmq.PUB)  # Starts the IO thread on the pinned CPU
+            assert os.sched_getaffinity(0) == {cpu}
+            pub.close()
+            context.term()
+        finally:
+            os.sched_setaffinity(0, original)
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+    def test_pin_cpus_rejects_unavailable_cpu(self):
+        """A CPU outside the allowed set is refused before libzmq can abort on it."""
+        from pc1.sensors.gps_sensor import parse_args
+
+        unavailable = max(os.sched_getaffinity(0)) + 1
+        with pytest.raises(ValueError, match="not available"):
+            validate_cpus((0, unavailable))
+        with pytest.raises(SystemExit):
+            parse_args(["--all", "--pin-cpus", "0", str(unavailable)])
+
+    def test_pub_send_never_blocks_on_full_queue(self):
+        """A PUB past SNDHWM drops for a stalled subscriber instead of blocking the sensor."""
+        context = new_context()
+        pub = context.socket(zmq.PUB)
+        pub.setsockopt(zmq.SNDHWM, 10)
+        pub.bind("inproc://test_pub_full_queue")
+        sub = context.socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, 10)
+        sub.setsockopt(zmq.SUBSCRIBE, b"")
+        sub.connect("inproc://test_pub_full_queue")
+        try:
+            # Never read while sending: a send that would block raises zmq.Again
+            blocked = 0
+            for _ in range(1000):
+                try:
+                    pub.send(TOPIC_GPS_BYTES, zmq.SNDMORE | zmq.NOBLOCK)
+                    pub.send(b"{}", zmq.NOBLOCK)
+                except zmq.Again:
+                    blocked += 1
+            assert blocked == 0
+            # The queue really was full: the subscriber's copies past SNDHWM were dropped
+            received = 0
+            while sub.poll(timeout=0):
+                sub.recv_multipart()
+                received += 1
+            assert 0 < received < 1000
+        finally:
+            sub.close()
+            pub.close()
+            context.term()
+
+    def test_slow_subscriber_keeps_every_sensors_event(self):
+        """Without CONFLATE, a lagging SUB still gets every sensor's event, not just the last."""
+        context = new_context()
+        pub = context.socket(zmq.XPUB)
+        pub.bind("inproc://test_no_conflate")
+        sub = context.socket(zmq.SUB)
+        sub.connect("inproc://test_no_conflate")
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_GPS)
+        try:
+            assert sub.getsockopt(zmq.CONFLATE) == 0
+            _await_subscription(pub, TOPIC_GPS_BYTES)
+
+            # One PUB carries many sensors; a last-value-only queue would keep GPS-99 alone
+            sensor_ids = [f"GPS-{i}" for i in range(100)]
+            for sensor_id in sensor_ids:
+                pub.send(TOPIC_GPS_BYTES, zmq.SNDMORE)
+                pub.send(to_json_bytes(generate_gps_event(sensor_id, "INT-A1")))
+
+            sub.setsockopt(zmq.RCVTIMEO, 2000)
+            received = [json.loads(sub.recv_multipart()[1])["sensor_id"] for _ in sensor_ids]
+            assert received == sensor_ids
+        finally:
+            sub.close()
+            pub.close()
+            context.term()
+
+    def test_camera_pub_sub(self, zmq_ctx):
+        """Camera sensor should publish events that a SUB socket can receive over TCP."""
+        # The one TCP round trip here; the other PUB/SUB tests use inproc
+
+        # XPUB socket (simulating sensor; it also reports subscriptions),
+        # on an ephemeral port so parallel runs cannot collide
+        pub = zmq_ctx.socket(zmq.XPUB)
+        port = pub.bind_to_random_port("tcp://127.0.0.1")
 
         # SUB socket (simulating broker)
-        sub = context.socket(zmq.SUB)
-        sub.connect(f"tcp://127.0.0.1:{port}")
-        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        sub = _make_sub(zmq_ctx, f"tcp://127.0.0.1:{port}", TOPIC_CAMERA_BYTES)
 
-        time.sleep(0.3)  # Allow connection
+        _await_subscription(pub, TOPIC_CAMERA_BYTES)
 
         # Publish a camera event
         event = generate_camera_event("CAM-TEST", "INT-TEST")
-        message = f"{TOPIC_CAMERA} {event.to_json()}"
-        pub.send_string(message)
+        pub.send_multipart([TOPIC_CAMERA_BYTES, to_json_bytes(event)])
 
-        # Receive with timeout
-        sub.setsockopt(zmq.RCVTIMEO, 2000)
-        received = sub.recv_string()
+        topic, payload = sub.recv_multipart()
 
-        assert received.startswith(TOPIC_CAMERA)
-        payload = received.split(" ", 1)[1]
+        assert topic == TOPIC_CAMERA_BYTES
         data = json.loads(payload)
         assert data["sensor_id"] == "CAM-TEST"
         assert data["tipo_sensor"] == SENSOR_TYPE_CAMERA
 
-        pub.close()
-        sub.close()
-        context.term()
+    @pytest.mark.parametrize("count", [1, 1000])
+    def test_camera_pub_sub_burst(self, zmq_ctx, count):
+        """A burst sent back to back, fire-and-forget, arrives complete and in order."""
+        # One endpoint per case: the previous case's XPUB keeps its inproc
+        # name bound until the zmq_ctx fixture is torn down
+        endpoint = f"inproc://test_camera_burst_{count}"
+        pub = zmq_ctx.socket(zmq.XPUB)
+        pub.setsockopt(zmq.SNDHWM, ZMQ_HWM)
+        pub.bind(endpoint)
+        sub = zmq_ctx.socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, ZMQ_HWM)
+        sub.connect(endpoint)
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        _await_subscription(pub, TOPIC_CAMERA_BYTES)
 
-    def test_gps_pub_sub(self):
-        """GPS sensor should publish events that a SUB socket can receive."""
-        context = zmq.Context()
-        port = 15557
+        # No per-message wait: every send is queued before anything is read,
+        # as a sensor publishes a whole cycle
+        payloads = [
+            to_json_bytes(generate_camera_event(f"CAM-{i}", "INT-A1")) for i in range(count)
+        ]
+        for payload in payloads:
+            pub.send(TOPIC_CAMERA_BYTES, zmq.SNDMORE)
+            pub.send(payload)
 
-        pub = context.socket(zmq.PUB)
-        pub.bind(f"tcp://127.0.0.1:{port}")
+        sub.setsockopt(zmq.RCVTIMEO, 2000)
+        received = [sub.recv_multipart() for _ in range(count)]
+        assert received == [[TOPIC_CAMERA_BYTES, payload] for payload in payloads]
 
-        sub = context.socket(zmq.SUB)
-        sub.connect(f"tcp://127.0.0.1:{port}")
-        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_GPS)
+    def test_gps_pub_sub(self, zmq_ctx):
+        """GPS sensor should publish events that a SUB socket can receive."""
+        pub = zmq_ctx.socket(zmq.XPUB)
+        pub.bind("inproc://test_gps_pub_sub")
 
-        time.sleep(0.3)
+        sub = _make_sub(zmq_ctx, "inproc://test_gps_pub_sub", TOPIC_GPS_BYTES)
+
+        _await_subscription(pub, TOPIC_GPS_BYTES)
 
         event = generate_gps_event("GPS-TEST", "INT-TEST")
-        message = f"{TOPIC_GPS} {event.to_json()}"
-        pub.send_string(message)
+        pub.send_multipart([TOPIC_GPS_BYTES, to_json_bytes(event)])
 
-        sub.setsockopt(zmq.RCVTIMEO, 2000)
-        received = sub.recv_string()
+        topic, payload = sub.recv_multipart()
 
-        assert received.startswith(TOPIC_GPS)
-        payload = received.split(" ", 1)[1]
+        assert topic == TOPIC_GPS_BYTES
         data = json.loads(payload)
         assert data["sensor_id"] == "GPS-TEST"
         assert "nivel_congestion" in data
 
-        pub.close()
-        sub.close()
-        context.term()
-
-    def test_topic_filtering(self):
+    def test_topic_filtering(self, zmq_ctx):
         """SUB socket should only receive messages matching its topic filter."""
-        context = zmq.Context()
-        port = 15558
-
-        pub = context.socket(zmq.PUB)
-        pub.bind(f"tcp://127.0.0.1:{port}")
+        pub = zmq_ctx.socket(zmq.XPUB)
+        pub.bind("inproc://test_topic_filtering")
 
         # Subscribe only to camera topic
-        sub = context.socket(zmq.SUB)
-        sub.connect(f"tcp://127.0.0.1:{port}")
-        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        sub = _make_sub(zmq_ctx, "inproc://test_topic_filtering", TOPIC_CAMERA_BYTES)
 
-        time.sleep(0.3)
+        _await_subscription(pub, TOPIC_CAMERA_BYTES)
 
         # Send GPS event (should be filtered out)
         gps_event = generate_gps_event("GPS-X", "INT-X")
-        pub.send_string(f"{TOPIC_GPS} {gps_event.to_json()}")
+        pub.send_multipart([TOPIC_GPS_BYTES, to_json_bytes(gps_event)])
 
         # Send camera event (should be received)
         cam_event = generate_camera_event("CAM-X", "INT-X")
-        pub.send_string(f"{TOPIC_CAMERA} {cam_event.to_json()}")
+        pub.send_multipart([TOPIC_CAMERA_BYTES, to_json_bytes(cam_event)])
 
-        sub.setsockopt(zmq.RCVTIMEO, 2000)
-        received = sub.recv_string()
+        topic, payload = sub.recv_multipart()
 
         # Should only get the camera event
-        assert received.startswith(TOPIC_CAMERA)
-        assert "CAM-X" in received
+        assert topic == TOPIC_CAMERA_BYTES
+        assert b"CAM-X" in payload
 
-        pub.close()
-        sub.close()
-        context.term()
+    def test_topic_filter_ignores_payload_frame(self, zmq_ctx):
+        """Subscriptions match the topic frame only, never the JSON frame after it."""
+        pub = zmq_ctx.socket(zmq.PUB)
+        pub.bind("inproc://test_topic_frame_only")
+        sub = _make_sub(zmq_ctx, "inproc://test_topic_frame_only", TOPIC_CAMERA_BYTES)
+
+        # A GPS payload that starts with the camera topic must not match
+        pub.send_multipart([TOPIC_GPS_BYTES, TOPIC_CAMERA_BYTES + b' {"sensor_id":"GPS-X"}'])
+        pub.send_multipart([TOPIC_CAMERA_BYTES, b'{"sensor_id":"CAM-X"}'])
+
+        topic, payload = sub.recv_multipart()
+        assert topic == TOPIC_CAMERA_BYTES
+        assert json.loads(payload)["sensor_id"] == "CAM-X"
 
 
 # =============================================================================
@@ -297,60 +575,94 @@ class TestSensorZMQPublish:
 
 
 class TestBrokerForwarding:
-    """Test that broker pattern (SUB -> PUB) correctly forwards messages."""
+    """
+    Test that broker pattern (SUB -> PUB) correctly forwards messages.
 
-    def test_sub_pub_forwarding(self):
-        """Messages from PUB->SUB->PUB->SUB chain should arrive intact."""
-        context = zmq.Context()
-        sensor_port = 15560
-        broker_port = 15561
+    The broker is a byte pipe: it relays the [topic, json] frames it
+    receives unchanged and never decodes or re-serializes the payload.
+    """
 
+    def test_sub_pub_forwarding(self, zmq_ctx):
+        """Messages from PUB->SUB->PUB->SUB chain should arrive intact."""
         # Sensor PUB
-        sensor_pub = context.socket(zmq.PUB)
-        sensor_pub.bind(f"tcp://127.0.0.1:{sensor_port}")
+        sensor_pub = zmq_ctx.socket(zmq.XPUB)
+        sensor_pub.bind("inproc://test_fwd_sensor")
 
         # Broker SUB (from sensor)
-        broker_sub = context.socket(zmq.SUB)
-        broker_sub.connect(f"tcp://127.0.0.1:{sensor_port}")
-        broker_sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        broker_sub = _make_sub(zmq_ctx, "inproc://test_fwd_sensor", TOPIC_CAMERA_BYTES)
 
         # Broker PUB (to analytics)
-        broker_pub = context.socket(zmq.PUB)
-        broker_pub.bind(f"tcp://127.0.0.1:{broker_port}")
+        broker_pub = zmq_ctx.socket(zmq.XPUB)
+        broker_pub.bind("inproc://test_fwd_broker")
 
         # Analytics SUB (from broker)
-        analytics_sub = context.socket(zmq.SUB)
-        analytics_sub.connect(f"tcp://127.0.0.1:{broker_port}")
-        analytics_sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        analytics_sub = _make_sub(zmq_ctx, "inproc://test_fwd_broker", TOPIC_CAMERA_BYTES)
 
-        time.sleep(0.5)  # Allow all connections
+        _await_subscription(sensor_pub, TOPIC_CAMERA_BYTES)
+        _await_subscription(broker_pub, TOPIC_CAMERA_BYTES)
 
         # Sensor publishes
         event = generate_camera_event("CAM-FWD", "INT-FWD")
-        original_msg = f"{TOPIC_CAMERA} {event.to_json()}"
-        sensor_pub.send_string(original_msg)
+        original_frames = [TOPIC_CAMERA_BYTES, to_json_bytes(event)]
+        sensor_pub.send_multipart(original_frames)
 
         # Broker receives and forwards
-        broker_sub.setsockopt(zmq.RCVTIMEO, 2000)
-        received_at_broker = broker_sub.recv_string()
-        broker_pub.send_string(received_at_broker)
+        received_at_broker = broker_sub.recv_multipart()
+        broker_pub.send_multipart(received_at_broker)
 
         # Analytics receives
-        analytics_sub.setsockopt(zmq.RCVTIMEO, 2000)
-        received_at_analytics = analytics_sub.recv_string()
+        received_at_analytics = analytics_sub.recv_multipart()
 
         # Verify message integrity
-        assert received_at_analytics == original_msg
-        payload = received_at_analytics.split(" ", 1)[1]
-        data = json.loads(payload)
+        assert received_at_analytics == original_frames
+        data = json.loads(received_at_analytics[1])
         assert data["sensor_id"] == "CAM-FWD"
 
-        # Cleanup
-        sensor_pub.close()
-        broker_sub.close()
-        broker_pub.close()
-        analytics_sub.close()
-        context.term()
+    def test_broker_forwards_without_parsing(self, monkeypatch):
+        """The standard broker forwards opaque frames: no JSON is decoded on the way."""
+        import orjson
+
+        from common.constants import INPROC_SENSOR_CAMERA
+        from pc1 import broker
+
+        def no_parsing(*args, **kwargs):
+            raise AssertionError("the broker must not parse payloads")
+
+        monkeypatch.setattr(json, "loads", no_parsing)
+        monkeypatch.setattr(orjson, "loads", no_parsing)
+
+        class BrokerConfig:
+            def zmq_bind_address(self, port_name):
+                return "inproc://test_broker_no_parse"
+
+        monkeypatch.setattr(broker, "get_config", BrokerConfig)
+
+        context = new_context()
+        analytics_sub = _make_sub(context, "inproc://test_broker_no_parse", TOPIC_CAMERA_BYTES)
+        sensor_pub = context.socket(zmq.XPUB)
+        sensor_pub.bind(INPROC_SENSOR_CAMERA)
+
+        # Not valid JSON at all: it can only arrive if nothing parsed it
+        frames = [TOPIC_CAMERA_BYTES, b"\x00not json\xff"]
+
+        broker._shutdown.clear()
+        thread = threading.Thread(
+            target=broker.run_broker_standard, kwargs={"context": context, "inproc": True}
+        )
+        thread.start()
+        try:
+            _await_subscription(sensor_pub, TOPIC_CAMERA_BYTES)
+            sensor_pub.send_multipart(frames)
+            assert analytics_sub.recv_multipart() == frames
+        finally:
+            broker.stop()
+            sensor_pub.send_multipart(frames)  # Wakes the 1s poll so the loop sees the stop
+            thread.join(timeout=3)
+            broker._shutdown.clear()
+            sensor_pub.close()
+            analytics_sub.close()
+            context.term()
+        assert not thread.is_alive()
 
 
 # =============================================================================
@@ -382,6 +694,32 @@ class TestBrokerModeSelection:
         args = parse_args(["--mode", "threaded"])
         assert args.mode == "threaded"
 
+    def test_broker_mode_arg_proxy(self):
+        """--mode proxy should set mode to 'proxy'."""
+        from pc1.broker import parse_args
+
+        args = parse_args(["--mode", "proxy"])
+        assert args.mode == "proxy"
+
+    def test_broker_unified_sensors_flag(self):
+        """--unified-sensors should be off by default and settable."""
+        from pc1.broker import parse_args
+
+        assert parse_args([]).unified_sensors is False
+        assert parse_args(["--unified-sensors"]).unified_sensors is True
+
+    def test_unified_endpoints_share_one_address(self):
+        """Unified mode should read all three topics from one address."""
+        from pc1.broker import _sensor_endpoints
+
+        per_type = _sensor_endpoints(inproc=False)
+        unified = _sensor_endpoints(inproc=False, unified=True)
+        assert len(per_type) == 3
+        assert len(unified) == 1
+        assert sorted(next(iter(unified.values()))) == sorted(
+            topic for topics in per_type.values() for topic in topics
+        )
+
 
 class TestThreadedBrokerForwarding:
     """Test that the threaded broker's inproc PUSH/PULL pipeline forwards messages."""
@@ -401,22 +739,341 @@ class TestThreadedBrokerForwarding:
         push = context.socket(zmq.PUSH)
         push.connect(inproc_addr)
 
-        time.sleep(0.1)
-
         # Worker pushes a sensor message
-        test_msg = f"{TOPIC_CAMERA} " + json.dumps({"sensor_id": "CAM-T1", "test": True})
-        push.send_string(test_msg)
+        test_msg = [TOPIC_CAMERA_BYTES, json.dumps({"sensor_id": "CAM-T1", "test": True}).encode()]
+        push.send_multipart(test_msg)
 
         # Collector receives
         pull.setsockopt(zmq.RCVTIMEO, 2000)
-        received = pull.recv_string()
+        received = pull.recv_multipart()
 
         assert received == test_msg
-        topic, payload = received.split(" ", 1)
-        assert topic == TOPIC_CAMERA
+        topic, payload = received
+        assert topic.decode() == TOPIC_CAMERA
         data = json.loads(payload)
         assert data["sensor_id"] == "CAM-T1"
 
         push.close()
         pull.close()
         context.term()
+
+    def test_collector_proxy_forwards_and_terminates(self):
+        """The collector's libzmq proxy forwards PULL -> PUB and stops on TERMINATE."""
+        from pc1.broker_threaded import INPROC_ADDR, _collector_worker
+
+        context = zmq.Context()
+        control = context.socket(zmq.PAIR)
+        control.bind("inproc://test_collector_control")
+        control_client = context.socket(zmq.PAIR)
+        control_client.connect("inproc://test_collector_control")
+
+        # inproc allows connect before bind: both ends are attached, with the
+        # subscription already queued, by the time the collector binds and
+        # starts its proxy, so nothing has to be waited for
+        analytics_sub = _make_sub(context, "inproc://test_collector_out", TOPIC_GPS_BYTES)
+        push = context.socket(zmq.PUSH)
+        push.connect(INPROC_ADDR)
+
+        collector = threading.Thread(
+            target=_collector_worker,
+            args=(context, "inproc://test_collector_out", control),
+        )
+        collector.start()
+
+        frames = [TOPIC_GPS_BYTES, to_json_bytes(generate_gps_event("GPS-C", "INT-C"))]
+        push.send_multipart(frames)
+        assert analytics_sub.recv_multipart() == frames
+
+        control_client.send(b"TERMINATE")
+        collector.join(timeout=3)
+        assert not collector.is_alive()
+
+        for sock in (push, analytics_sub, control, control_client):
+            sock.close()
+        context.term()
+
+
+class TestInprocSensorTransport:
+    """Test sensors publishing over inproc:// on a shared context (start_pc1 --inproc)."""
+
+    def test_gps_sensor_publishes_over_inproc(self):
+        """A sensor thread bound on inproc should reach a SUB on the same context."""
+        from pc1.sensors import gps_sensor
+
+        context = new_context()
+        sub = context.socket(zmq.SUB)
+        sub.connect("inproc://test_sensor_gps")
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_GPS)
+        sub.setsockopt(zmq.RCVTIMEO, 3000)
+
+        gps_sensor._shutdown.clear()
+        thread = threading.Thread(
+            target=gps_sensor.run_gps_sensor,
+            kwargs={
+                "sensors": [{"sensor_id": "GPS-IP", "interseccion": "INT-A1"}],
+                "interval_sec": 0.05,
+                "pub_port": 0,
+                "context": context,
+                "bind_addr": "inproc://test_sensor_gps",
+            },
+        )
+        thread.start()
+        try:
+            topic, payload = sub.recv_multipart()
+        finally:
+            gps_sensor.stop()
+            thread.join(timeout=3)
+
+        assert topic == TOPIC_GPS_BYTES
+        assert json.loads(payload)["sensor_id"] == "GPS-IP"
+        assert not thread.is_alive()
+
+        # The sensor must leave the shared context open for its owner
+        sub.close()
+        context.term()
+
+    def test_camera_stop_wakes_sleeping_sensor(self):
+        """stop() should end a camera thread mid-sleep, not after its 30s delay."""
+        from pc1.sensors import camera_sensor
+
+        context = new_context()
+        sub = context.socket(zmq.SUB)
+        sub.connect("inproc://test_sensor_camera")
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+        sub.setsockopt(zmq.RCVTIMEO, 3000)
+
+        camera_sensor._shutdown.clear()
+        thread = threading.Thread(
+            target=camera_sensor.run_camera_sensor,
+            kwargs={
+                "sensors": [{"sensor_id": "CAM-IP", "interseccion": "INT-A1"}],
+                "interval_sec": 30,
+                "pub_port": 0,
+                "context": context,
+                "bind_addr": "inproc://test_sensor_camera",
+            },
+        )
+        thread.start()
+        try:
+            # The first event goes out at once; the sensor then sleeps for 30s
+            topic, _ = sub.recv_multipart()
+        finally:
+            camera_sensor.stop()
+            thread.join(timeout=3)
+
+        assert topic == TOPIC_CAMERA_BYTES
+        assert not thread.is_alive()
+        sub.close()
+        context.term()
+
+    def test_inductive_cycle_is_sent_back_to_back(self):
+        """Every sensor's event in a cycle should go out before the single cycle sleep."""
+        from pc1.sensors import inductive_sensor
+
+        context = new_context()
+        sub = context.socket(zmq.SUB)
+        sub.connect("inproc://test_sensor_inductive")
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_INDUCTIVE)
+        sub.setsockopt(zmq.RCVTIMEO, 3000)
+
+        sensors = [{"sensor_id": f"ESP-{i}", "interseccion": "INT-A1"} for i in range(3)]
+        inductive_sensor._shutdown.clear()
+        thread = threading.Thread(
+            target=inductive_sensor.run_inductive_sensor,
+            kwargs={
+                "sensors": sensors,
+                "interval_sec": 30,
+                "pub_port": 0,
+                "context": context,
+                "bind_addr": "inproc://test_sensor_inductive",
+            },
+        )
+        thread.start()
+        try:
+            # With a 30s cycle, all three only arrive within the timeout if
+            # they are not spread across the interval
+            received = [json.loads(sub.recv_multipart()[1]) for _ in sensors]
+        finally:
+            inductive_sensor.stop()
+            thread.join(timeout=3)
+
+        assert [e["sensor_id"] for e in received] == ["ESP-0", "ESP-1", "ESP-2"]
+        # The whole cycle reports one measurement window
+        assert len({(e["timestamp_inicio"], e["timestamp_fin"]) for e in received}) == 1
+        # stop() must wake the cycle sleep rather than wait out the interval
+        assert not thread.is_alive()
+
+        sub.close()
+        context.term()
+
+
+class TestAsyncAllSensors:
+    """Test the single-process asyncio sensor publisher."""
+
+    @pytest.mark.parametrize("loop", ["asyncio", "uvloop"])
+    def test_publish_loop_sends_topic_and_payload(self, loop):
+        """A sensor coroutine should publish [topic, json] frames on the shared socket."""
+        from pc1.sensors.all_sensors_async import _gps_payloads, _publish_loop
+
+        loop_factory = pytest.importorskip("uvloop").new_event_loop if loop == "uvloop" else None
+
+        async def scenario():
+            context = zmq.asyncio.Context()
+            pub = context.socket(zmq.PUB)
+            pub.bind("inproc://test_all_sensors")
+            sub = context.socket(zmq.SUB)
+            sub.connect("inproc://test_all_sensors")
+            sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_GPS)
+            await asyncio.sleep(0.05)
+
+            builders = _gps_payloads([{"sensor_id": "GPS-AS", "interseccion": "INT-A1"}])
+            task = asyncio.create_task(_publish_loop(pub, "gps", TOPIC_GPS_BYTES, builders, 0.01))
+            try:
+                return await asyncio.wait_for(sub.recv_multipart(), timeout=2)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                pub.close()
+                sub.close()
+                context.term()
+
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            topic, payload = runner.run(scenario())
+        assert topic == TOPIC_GPS_BYTES
+        assert json.loads(payload)["sensor_id"] == "GPS-AS"
+
+    def test_cached_encoder_reencodes_only_new_strings(self):
+        """Timestamps are encoded once per string object, not once per event."""
+        from pc1.sensors.all_sensors_async import _cached_encoder
+
+        encode = _cached_encoder()
+        first = encode("2026-01-01T00:00:00Z")
+        assert first == b"2026-01-01T00:00:00Z"
+        assert encode("2026-01-01T00:00:00Z") is first
+        assert encode("2026-01-01T00:00:01Z") == b"2026-01-01T00:00:01Z"
+
+    def test_inductive_payloads_report_int_interval(self):
+        """A float --interval override still publishes an int intervalo_segundos."""
+        from pc1.sensors.all_sensors_async import _inductive_payloads
+
+        (build,) = _inductive_payloads([{"sensor_id": "ESP-AS", "interseccion": "INT-AS"}], 5.0)
+        interval = json.loads(build())["intervalo_segundos"]
+        assert (type(interval), interval) == (int, 5)
+
+    def test_run_all_sensors_without_signal_handlers(self, monkeypatch):
+        """Where the loop has no add_signal_handler (Windows), the sensors still start."""
+        from pc1.sensors import all_sensors_async
+
+        def unsupported(self, sig, callback, *args):
+            raise NotImplementedError
+
+        monkeypatch.setattr(all_sensors_async, "uvloop", None)
+        probe = asyncio.new_event_loop()
+        probe.close()
+        monkeypatch.setattr(type(probe), "add_signal_handler", unsupported)
+
+        context = new_context()
+        try:
+            # No sensors: every publish loop returns at once, so the run ends by itself
+            all_sensors_async.run_all_sensors(
+                [], [], [], 1, 1, 1, 0, context=context, bind_addr="inproc://test_no_signals"
+            )
+        finally:
+            context.destroy(linger=0)
+
+    def test_run_all_publisher_gets_context_defaults(self, monkeypatch):
+        """On its own context, the shared PUB still gets new_context()'s socket defaults."""
+        from pc1.sensors.all_sensors_async import _run_all
+
+        seen = {}
+        socket = zmq.asyncio.Context.socket
+
+        def spy(self, *args, **kwargs):
+            sock = socket(self, *args, **kwargs)
+            seen.update(hwm=sock.get(zmq.SNDHWM), keepalive=sock.get(zmq.TCP_KEEPALIVE))
+            return sock
+
+        monkeypatch.setattr(zmq.asyncio.Context, "socket", spy)
+        # No sensors: every publish loop returns at once, so the run ends by itself
+        asyncio.run(_run_all([], [], [], 1, 1, 1, 0, None, "inproc://test_defaults"))
+        assert seen == {"hwm": ZMQ_HWM, "keepalive": ZMQ_TCP_KEEPALIVE}
+
+    def test_run_all_on_shared_context(self):
+        """On a caller's context, the sensors publish over inproc and leave it open."""
+        from pc1.sensors.all_sensors_async import _run_all
+
+        context = new_context()
+        sub = context.socket(zmq.SUB)
+        sub.connect("inproc://test_sensor_all")  # inproc allows connect before bind
+        sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_GPS)
+
+        gps = [{"sensor_id": "GPS-SC", "interseccion": "INT-A1"}]
+        run = _run_all([], [], gps, 1, 1, 0.05, 0, context, "inproc://test_sensor_all")
+
+        async def scenario():
+            task = asyncio.create_task(run)
+            try:
+                # Poll the sync SUB without blocking the loop the sensors run on
+                for _ in range(200):
+                    if sub.poll(timeout=0):
+                        return sub.recv_multipart()
+                    await asyncio.sleep(0.01)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        topic, payload = asyncio.run(scenario())
+        assert topic == TOPIC_GPS_BYTES
+        assert json.loads(payload)["sensor_id"] == "GPS-SC"
+
+        # The shared context must still be usable by its owner
+        context.socket(zmq.PUB).close()
+        sub.close()
+        context.term()
+
+
+class TestProxyBrokerForwarding:
+    """Test the libzmq steerable proxy used by the broker's proxy mode."""
+
+    def test_proxy_forwards_and_terminates(self):
+        """Frames pass through the proxy intact and TERMINATE stops it."""
+        context = zmq.Context()
+
+        sensor_pub = context.socket(zmq.XPUB)
+        sensor_pub.bind("inproc://test_proxy_sensor")
+        broker_sub = context.socket(zmq.SUB)
+        broker_sub.connect("inproc://test_proxy_sensor")
+        broker_sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+
+        broker_pub = context.socket(zmq.PUB)
+        broker_pub.bind("inproc://test_proxy_out")
+        analytics_sub = context.socket(zmq.SUB)
+        analytics_sub.connect("inproc://test_proxy_out")
+        analytics_sub.setsockopt_string(zmq.SUBSCRIBE, TOPIC_CAMERA)
+
+        control = context.socket(zmq.PAIR)
+        control.bind("inproc://test_proxy_control")
+        control_client = context.socket(zmq.PAIR)
+        control_client.connect("inproc://test_proxy_control")
+
+        proxy = threading.Thread(
+            target=zmq.proxy_steerable, args=(broker_sub, broker_pub, None, control)
+        )
+        proxy.start()
+        # The analytics SUB subscribed before the proxy thread started, so only
+        # the sensor side's subscription has to be waited for
+        _await_subscription(sensor_pub, TOPIC_CAMERA_BYTES)
+
+        frames = [TOPIC_CAMERA_BYTES, to_json_bytes(generate_camera_event("CAM-P", "INT-P"))]
+        sensor_pub.send_multipart(frames)
+
+        analytics_sub.setsockopt(zmq.RCVTIMEO, 2000)
+        assert analytics_sub.recv_multipart() == frames
+
+        control_client.send(b"TERMINATE")
+        proxy.join(timeout=3)
+        assert not proxy.is_alive()
+
+        for sock in (sensor_pub, broker_sub, broker_pub, analytics_sub, control, control_client):
+            sock.close()
+        context.term()